@@ -0,0 +1,287 @@
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import threading
+
+import google.auth.transport.requests
+import google.oauth2.credentials
+import requests
+from apiclient.discovery import build
+from cachetools import LRUCache
+from django.db import connection
+from google.auth.exceptions import GoogleAuthError
+
+logger = logging.getLogger(__name__)
+
+# the OAuth client registered with Google, and the access it requests
+CLIENT_SECRETS_FILE = "/home/james/.google/cp.json"
+SCOPES = [
+    "https://www.googleapis.com/auth/calendar",
+    "https://www.googleapis.com/auth/contacts",
+]
+
+# the Google APIs used by the site, and the version of each
+APIS = {
+    "calendar": "v3",
+    "people": "v1",
+}
+
+# the number of service objects each thread keeps before evicting
+# the least recently used one
+SERVICES_PER_THREAD = 64
+
+# the number of users whose live credentials are kept in memory
+CREDENTIALS_KEPT = 256
+
+# access tokens this close to expiry are refreshed in the background,
+# so requests rarely have to wait for Google's token endpoint
+REFRESH_AHEAD = datetime.timedelta(minutes=10)
+
+
+def fingerprint(credentials_json):
+    """Identify a set of stored credentials without keeping the secrets around."""
+    return hashlib.sha256(credentials_json.encode()).hexdigest()
+
+
+def load_credentials(credentials_json):
+    """Deserialize credentials stored in CustomUser.google_credentials."""
+    info = json.loads(credentials_json)
+    return google.oauth2.credentials.Credentials.from_authorized_user_info(info)
+
+
+@functools.lru_cache(maxsize=None)
+def client_config():
+    """Load the OAuth client secrets once per process."""
+    with open(CLIENT_SECRETS_FILE) as f:
+        return json.load(f)
+
+
+def build_service(api, credentials):
+    """Build a Google API service object without touching the network.
+
+    Args:
+        api (str): one of the keys of APIS
+        credentials (Credentials): the user's Google credentials
+
+    Notes:
+        The discovery documents for the Google APIs are bundled with
+        google-api-python-client. Requiring the static documents ensures that
+        building a service never fetches one from Google.
+
+    """
+
+    return build(
+        api,
+        APIS[api],
+        credentials=credentials,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+
+
+class CredentialManager:
+    """Keeps live Google credentials in memory and persists refreshed tokens.
+
+    Notes:
+        Credentials are kept per user, along with the fingerprints of every
+        stored form of them this process has seen or written. A user whose
+        stored credentials match one of those fingerprints gets the live
+        object, which may carry a newer token than the one stored.
+
+        Whenever the token of a live credentials object changes, whether
+        refreshed here or by the Google client during a request, the new
+        token is written back to CustomUser.google_credentials, so that
+        other processes and later requests do not refresh it again.
+
+    """
+
+    def __init__(self, maxsize=CREDENTIALS_KEPT):
+        self._entries = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._transport = None
+
+    def get(self, user):
+        """Get live credentials for the user.
+
+        Args:
+            user (CustomUser): the user whose credentials are needed
+
+        Returns:
+            credentials (Credentials): the user's credentials, or None if the
+                user has not linked a Google account
+
+        """
+
+        stored = user.google_credentials
+        if not stored:
+            return None
+
+        key = fingerprint(stored)
+        with self._lock:
+            entry = self._entries.get(user.id)
+            if entry is None or key not in entry.fingerprints:
+                entry = CredentialEntry(load_credentials(stored), key)
+                self._entries[user.id] = entry
+
+        credentials = entry.credentials
+
+        if credentials.token != entry.token:
+            self.persist(user, entry)
+
+        if not credentials.valid and credentials.refresh_token:
+            self.refresh(user, entry)
+        elif self.expiring(credentials):
+            self.refresh_in_background(user, entry)
+
+        return credentials
+
+    def forget(self, user_id):
+        """Discard the live credentials of a user, e.g. on logout."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def expiring(self, credentials):
+        if not credentials.expiry or not credentials.refresh_token:
+            return False
+        now = datetime.datetime.utcnow()
+        return now >= credentials.expiry - REFRESH_AHEAD
+
+    def refresh(self, user, entry):
+        """Refresh the access token and write it back to the database."""
+        seen = entry.credentials.token
+        with entry.lock:
+            # another thread may have refreshed the token while we waited
+            if entry.credentials.token == seen:
+                entry.credentials.refresh(self.transport())
+            self.persist(user, entry)
+
+    def refresh_in_background(self, user, entry):
+        with self._lock:
+            if user.id in self._refreshing:
+                return
+            self._refreshing.add(user.id)
+
+        def run():
+            try:
+                self.refresh(user, entry)
+            except GoogleAuthError:
+                logger.warning("Unable to refresh token for user %s", user.id, exc_info=True)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user.id)
+                connection.close()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def persist(self, user, entry):
+        """Write the current token back with a single column update.
+
+        Notes:
+            Nothing is written once the entry is no longer the user's, e.g.
+            when a background refresh finishes after the user disconnected
+            Google and the entry was forgotten. The check and the write are
+            made under the lock, so forget cannot come between them.
+
+        """
+        from accounts.models import CustomUser
+
+        stored = entry.credentials.to_json()
+
+        with self._lock:
+            if self._entries.get(user.id) is not entry:
+                return
+            CustomUser.objects.filter(pk=user.id).update(google_credentials=stored)
+            entry.token = entry.credentials.token
+            entry.fingerprints.add(fingerprint(stored))
+        user.google_credentials = stored
+
+    def transport(self):
+        # one pooled session for all token refreshes
+        if self._transport is None:
+            self._transport = google.auth.transport.requests.Request(
+                session=requests.Session()
+            )
+        return self._transport
+
+
+class CredentialEntry:
+    """A user's live credentials, with the token last written to the database."""
+
+    def __init__(self, credentials, key):
+        self.credentials = credentials
+        self.token = credentials.token
+        self.fingerprints = {key}
+        self.lock = threading.Lock()
+
+
+class ServiceFactory:
+    """Builds Google API service objects and keeps them for reuse.
+
+    Attributes:
+        maxsize (int): the number of services each thread keeps
+        hits (int): the number of requests served by an existing service
+        misses (int): the number of services built
+
+    Notes:
+        Services are keyed by API and user, and are rebuilt whenever the user's
+        live credentials are replaced, e.g. when a Google account is relinked.
+
+        A service object holds an httplib2 transport, which is not thread safe,
+        so each thread keeps its own cache of services.
+
+    """
+
+    def __init__(self, maxsize=SERVICES_PER_THREAD, manager=None):
+        self.maxsize = maxsize
+        self.manager = manager or credential_manager
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    @property
+    def services(self):
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = LRUCache(maxsize=self.maxsize)
+        return services
+
+    def get(self, api, user):
+        """Get a service object for the user.
+
+        Args:
+            api (str): one of the keys of APIS
+            user (CustomUser): the user whose credentials authorize the service
+
+        Returns:
+            service (Resource): a Google service object, or False if the user
+                has not linked a Google account
+
+        """
+
+        credentials = self.manager.get(user)
+        if credentials is None:
+            return False
+
+        key = (api, user.id)
+        entry = self.services.get(key)
+
+        if entry is None or entry[0] is not credentials:
+            self.misses += 1
+            service = build_service(api, credentials)
+            self.services[key] = (credentials, service)
+        else:
+            self.hits += 1
+            service = entry[1]
+
+        return service
+
+    def clear(self):
+        """Discard the services kept by the current thread."""
+        self.services.clear()
+
+
+credential_manager = CredentialManager()
+services = ServiceFactory()
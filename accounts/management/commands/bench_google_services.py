@@ -0,0 +1,58 @@
+import datetime
+import statistics
+import time
+
+import google.oauth2.credentials
+from django.core.management.base import BaseCommand
+
+from accounts.google import APIS, CredentialManager, ServiceFactory, build_service
+
+
+class Command(BaseCommand):
+    help = "Compare cold and warm build times for Google API service objects."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+
+        # building a service needs credentials, but never uses them
+        credentials = google.oauth2.credentials.Credentials(
+            token="benchmark",
+            refresh_token="benchmark",
+            client_id="benchmark",
+            client_secret="benchmark",
+            expiry=datetime.datetime.utcnow() + datetime.timedelta(days=1),
+        )
+        user = BenchmarkUser(credentials.to_json())
+
+        for api in APIS:
+            cold = []
+            for i in range(rounds):
+                start = time.perf_counter()
+                build_service(api, credentials)
+                cold.append(time.perf_counter() - start)
+
+            factory = ServiceFactory(manager=CredentialManager())
+            factory.get(api, user)
+            warm = []
+            for i in range(rounds):
+                start = time.perf_counter()
+                factory.get(api, user)
+                warm.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{api}: cold {statistics.median(cold) * 1000:.2f} ms, "
+                f"warm {statistics.median(warm) * 1000:.3f} ms "
+                f"(median of {rounds})"
+            )
+
+
+class BenchmarkUser:
+    """Stands in for a CustomUser, so the benchmark needs no database."""
+
+    id = 0
+
+    def __init__(self, google_credentials):
+        self.google_credentials = google_credentials
@@ -0,0 +1,182 @@
+import datetime
+import threading
+import time
+
+import google.oauth2.credentials
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.google import CredentialManager, ServiceFactory
+from accounts.models import CustomUser
+
+
+class User:
+    def __init__(self, id, google_credentials):
+        self.id = id
+        self.google_credentials = google_credentials
+
+
+def credentials_json(token, expires_in=datetime.timedelta(hours=1)):
+    credentials = google.oauth2.credentials.Credentials(
+        token=token,
+        refresh_token="refresh",
+        client_id="client",
+        client_secret="secret",
+        expiry=datetime.datetime.utcnow() + expires_in,
+    )
+    return credentials.to_json()
+
+
+@pytest.fixture
+def factory():
+    return ServiceFactory(manager=CredentialManager())
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Replace token refreshes with a counter that issues new tokens."""
+    refreshes = []
+
+    def refresh(self, request):
+        refreshes.append(self.token)
+        self.token = f"refreshed-{len(refreshes)}"
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    monkeypatch.setattr(google.oauth2.credentials.Credentials, "refresh", refresh)
+    return refreshes
+
+
+def test_no_credentials(factory):
+    assert factory.get("calendar", User(1, None)) is False
+
+
+def test_reuse(factory):
+    user = User(1, credentials_json("one"))
+    service = factory.get("calendar", user)
+    assert factory.get("calendar", user) is service
+    assert factory.get("people", user) is not service
+    assert (factory.hits, factory.misses) == (1, 2)
+
+
+def test_new_credentials_rebuild(factory):
+    user = User(1, credentials_json("one"))
+    service = factory.get("calendar", user)
+    user.google_credentials = credentials_json("two")
+    assert factory.get("calendar", user) is not service
+
+
+def test_eviction():
+    factory = ServiceFactory(maxsize=2, manager=CredentialManager())
+    for i in range(3):
+        factory.get("calendar", User(i, credentials_json("one")))
+    assert len(factory.services) == 2
+    assert ("calendar", 0) not in factory.services
+
+
+def test_credentials_reused():
+    manager = CredentialManager()
+    user = User(1, credentials_json("one"))
+    assert manager.get(user) is manager.get(user)
+
+
+@pytest.mark.django_db
+def test_expired_token_persisted(refreshes):
+    user = CustomUser.objects.create_user("Ollie", "ollie@gmail.com", "clawboy")
+    user.google_credentials = credentials_json("old", -datetime.timedelta(hours=1))
+    user.save()
+
+    manager = CredentialManager()
+    with CaptureQueriesContext(connection) as context:
+        credentials = manager.get(user)
+
+    assert refreshes == ["old"]
+    assert credentials.token == "refreshed-1"
+    assert len(context.captured_queries) == 1
+    assert "username" not in context.captured_queries[0]["sql"]
+
+    # a later request loads the written back token, and refreshes nothing
+    user = CustomUser.objects.get(pk=user.pk)
+    assert "refreshed-1" in user.google_credentials
+    assert manager.get(user) is credentials
+    assert refreshes == ["old"]
+
+
+@pytest.mark.django_db
+def test_client_refresh_persisted():
+    user = CustomUser.objects.create_user("Ollie", "ollie@gmail.com", "clawboy")
+    user.google_credentials = credentials_json("old")
+    user.save()
+
+    manager = CredentialManager()
+    credentials = manager.get(user)
+
+    # the Google client refreshes the token in the middle of a request
+    credentials.token = "refreshed-by-client"
+    manager.get(user)
+
+    user = CustomUser.objects.get(pk=user.pk)
+    assert "refreshed-by-client" in user.google_credentials
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_refresh(refreshes, monkeypatch):
+    user = CustomUser.objects.create_user("Ollie", "ollie@gmail.com", "clawboy")
+    user.google_credentials = credentials_json("old", -datetime.timedelta(hours=1))
+    user.save()
+
+    refresh = google.oauth2.credentials.Credentials.refresh
+
+    def slow_refresh(self, request):
+        time.sleep(0.2)
+        refresh(self, request)
+
+    monkeypatch.setattr(google.oauth2.credentials.Credentials, "refresh", slow_refresh)
+
+    # two requests find the same expired token, and one waits for the other
+    manager = CredentialManager()
+    barrier = threading.Barrier(2)
+
+    def get():
+        barrier.wait()
+        manager.get(CustomUser.objects.get(pk=user.pk))
+        connection.close()
+
+    threads = [threading.Thread(target=get) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert refreshes == ["old"]
+
+
+def test_expiring_refreshed_in_background(monkeypatch):
+    manager = CredentialManager()
+    scheduled = []
+    monkeypatch.setattr(
+        manager, "refresh_in_background", lambda user, entry: scheduled.append(user.id)
+    )
+    manager.get(User(1, credentials_json("one", datetime.timedelta(minutes=5))))
+    manager.get(User(2, credentials_json("two")))
+    assert scheduled == [1]
+
+
+@pytest.mark.django_db
+def test_refresh_after_forget_not_persisted(refreshes):
+    user = CustomUser.objects.create_user("Ollie", "ollie@gmail.com", "clawboy")
+    user.google_credentials = credentials_json("old", datetime.timedelta(minutes=5))
+    user.save()
+
+    manager = CredentialManager()
+    manager.refresh_in_background = lambda user, entry: None
+    manager.get(user)
+    entry = manager._entries[user.id]
+
+    # the user disconnects Google while a background refresh is running
+    CustomUser.objects.filter(pk=user.pk).update(google_credentials=None)
+    manager.forget(user.id)
+    manager.refresh(user, entry)
+
+    assert refreshes == ["old"]
+    assert CustomUser.objects.get(pk=user.pk).google_credentials is None
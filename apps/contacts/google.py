@@ -1,9 +1,6 @@
-import json
-
-import google.oauth2.credentials
-from apiclient.discovery import build
 from django.shortcuts import get_object_or_404
 
+from accounts.google import services
 from accounts.models import CustomUser
 
 
@@ -20,22 +17,13 @@ def build_service(contact):
         A contact is passed into this function to identify the
         user associated with that contact.  Then, with that information,
         the function can locate the user's Google credentials. Then the function
-        has the information it needs to build the Google service object
+        has the information it needs to build the Google service object,
+        or reuse one that was built for the same credentials earlier.
 
     """
 
     user = get_object_or_404(CustomUser, pk=contact.user.id)
-    credentials = user.google_credentials
-
-    if credentials:
-        credentials = json.loads(credentials)
-        credentials = google.oauth2.credentials.Credentials.from_authorized_user_info(
-            credentials
-        )
-        service = build("people", "v1", credentials=credentials)
-        return service
-    else:
-        return False
+    return services.get("people", user)
 
 
 def add_contact(contact):
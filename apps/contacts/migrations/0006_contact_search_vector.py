@@ -0,0 +1,65 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:12
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The search vector is maintained by a trigger, so that it is kept current
+# by every write, including bulk updates.
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION app_contact_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', app_search_text(NEW.name)), 'A')
+        || setweight(to_tsvector('simple', app_search_text(
+            concat_ws(' ', NEW.company, NEW.email, NEW.website)
+        )), 'B')
+        || setweight(to_tsvector('simple', app_search_text(
+            concat_ws(' ', NEW.address, NEW.phone1, NEW.phone2, NEW.phone3, NEW.notes)
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER app_contact_search_vector
+    BEFORE INSERT OR UPDATE OF name, company, email, website, address, phone1, phone2, phone3, notes ON app_contact
+    FOR EACH ROW EXECUTE FUNCTION app_contact_search_vector();
+
+UPDATE app_contact SET name = name;
+
+CREATE INDEX app_contact_search_vector_idx ON app_contact USING gin (search_vector);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS app_contact_search_vector_idx;
+DROP TRIGGER IF EXISTS app_contact_search_vector ON app_contact;
+DROP FUNCTION IF EXISTS app_contact_search_vector();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0001_search_text"),
+        ("contacts", "0005_rename_user_id_contact_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
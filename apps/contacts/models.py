@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from accounts.models import CustomUser
@@ -26,7 +27,9 @@ class Contact(models.Model):
         map (str): a url to google maps for the contact's address
         notes (str): comments about the contact
         google_id (str): if added to a Google account, the unique identifier for that Google contact
+        search_vector (tsvector): the searchable text, maintained by a database trigger
         fillable (list): a list of the above attributes that are fillable by a form
+        listed (list): the attributes shown in a folder's list of contacts
     """
 
     id = models.BigAutoField(primary_key=True)
@@ -47,6 +50,7 @@ class Contact(models.Model):
     map = models.CharField(max_length=255, blank=True, null=True)
     notes = models.CharField(max_length=255, blank=True, null=True)
     google_id = models.CharField(max_length=255, blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     fillable = [
         "folder_id",
@@ -65,6 +69,8 @@ class Contact(models.Model):
         "notes",
     ]
 
+    listed = ["id", "name"]
+
     def __str__(self):
         return f"{self.name} : {self.id}"
 
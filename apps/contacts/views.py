@@ -33,7 +33,8 @@ def index(request):
         contacts = Contact.objects.filter(
             user=request.user, folder_id__isnull=True)
 
-    contacts = contacts.order_by("name")
+    # the list only shows names, the selected contact is loaded in full
+    contacts = contacts.order_by("name").values(*Contact.listed)
 
     selected_contact_id = request.user.contacts_contact
 
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:11
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The search vector is maintained by a trigger, so that it is kept current
+# by every write, including bulk updates.
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION app_favorite_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', app_search_text(NEW.name)), 'A')
+        || setweight(to_tsvector('simple', app_search_text(NEW.url)), 'B')
+        || setweight(to_tsvector('simple', app_search_text(NEW.description)), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER app_favorite_search_vector
+    BEFORE INSERT OR UPDATE OF name, url, description ON app_favorite
+    FOR EACH ROW EXECUTE FUNCTION app_favorite_search_vector();
+
+UPDATE app_favorite SET name = name;
+
+CREATE INDEX app_favorite_search_vector_idx ON app_favorite USING gin (search_vector);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS app_favorite_search_vector_idx;
+DROP TRIGGER IF EXISTS app_favorite_search_vector ON app_favorite;
+DROP FUNCTION IF EXISTS app_favorite_search_vector();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0001_search_text"),
+        ("favorites", "0008_remove_favorite_login_remove_favorite_passkey_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="favorite",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from accounts.models import CustomUser
@@ -17,6 +18,8 @@ class Favorite(models.Model):
         selected (int): whether the favorite has been selected to be displayed
         home_rank (int): whether the favorite should be displayed on the home page, and
             if so, what rank it should have within its folder
+        search_vector (tsvector): the searchable text, maintained by a database trigger
+        listed (list): the attributes shown in a folder's list of favorites
     """
 
     id = models.BigAutoField(primary_key=True)
@@ -27,6 +30,9 @@ class Favorite(models.Model):
     description = models.CharField(max_length=255, blank=True, null=True)
     selected = models.IntegerField(blank=True, null=True)
     home_rank = models.IntegerField(blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    listed = ["id", "name", "url", "description", "home_rank"]
 
     def __str__(self):
         return f"{self.name}"
@@ -30,7 +30,7 @@ def index(request):
     else:
         favorites = Favorite.objects.filter(user=user, folder_id__isnull=True)
 
-    favorites = favorites.order_by("name")
+    favorites = favorites.order_by("name").values(*Favorite.listed)
 
     context = {
         "page": "favorites",
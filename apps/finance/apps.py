@@ -3,4 +3,4 @@ from django.apps import AppConfig
 
 class FinanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "finance"
+    name = "apps.finance"
@@ -3,6 +3,9 @@ from requests.exceptions import ConnectionError, Timeout, TooManyRedirects
 
 from config import settings_local
 
+# seconds allowed to connect to coinmarketcap, and to wait for a reply
+TIMEOUT = (3.05, 10)
+
 
 def collect(symbols):
     """Fetch the data for each asset from the coinmarketcap api.
@@ -23,10 +26,11 @@ def collect(symbols):
     }
 
     try:
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=TIMEOUT)
         result = response.json()["data"]
 
-    except (ConnectionError, Timeout, TooManyRedirects):
+    # an unknown symbol gets an error response without "data"
+    except (ConnectionError, Timeout, TooManyRedirects, KeyError, ValueError):
         result = None
 
     return result
@@ -0,0 +1,56 @@
+import re
+
+from django import forms
+from django.core.exceptions import ValidationError
+
+from .models import Position, WatchlistItem
+
+
+def clean_symbol(symbol):
+    symbol = symbol.strip().upper()
+    if not re.fullmatch(r"[A-Z0-9.\-]{1,20}", symbol):
+        raise ValidationError("Symbol must be letters, digits, dots or dashes.")
+    return symbol
+
+
+class WatchlistItemForm(forms.ModelForm):
+    class Meta:
+        model = WatchlistItem
+        fields = (
+            "symbol",
+            "name",
+            "exchange",
+        )
+
+    def clean_symbol(self):
+        return clean_symbol(self.cleaned_data["symbol"])
+
+    def clean_exchange(self):
+        return self.cleaned_data["exchange"].strip().upper()
+
+
+class PositionForm(forms.ModelForm):
+    class Meta:
+        model = Position
+        fields = (
+            "kind",
+            "symbol",
+            "quantity",
+            "cost",
+            "opened",
+        )
+
+    def clean_symbol(self):
+        return clean_symbol(self.cleaned_data["symbol"])
+
+    def clean_quantity(self):
+        quantity = self.cleaned_data["quantity"]
+        if quantity <= 0:
+            raise ValidationError("Quantity must be greater than zero.")
+        return quantity
+
+    def clean_cost(self):
+        cost = self.cleaned_data["cost"]
+        if cost < 0:
+            raise ValidationError("Cost must not be negative.")
+        return cost
@@ -0,0 +1,276 @@
+import array
+import bisect
+import sys
+import time
+
+from django.db import transaction
+
+from apps.finance.models import PriceChunk
+
+# the interval between prices at each resolution, in seconds, finest first
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# the span of time a chunk covers at each resolution: a day of minutes,
+# 64 days of hours or 1024 days of days, at most about 18 KB per chunk
+SPANS = {"1m": 86400, "1h": 64 * 86400, "1d": 1024 * 86400}
+
+# how long prices are kept at each resolution, in seconds, or None to keep
+# them for good
+RETENTION = {"1m": 400 * 86400, "1h": None, "1d": None}
+
+# the most prices per symbol a range query returns when it picks the resolution
+MAX_POINTS = 2000
+
+
+def pack(values, typecode):
+    """Pack numbers into little-endian bytes, e.g. "I" for offsets, "d" for prices."""
+    values = array.array(typecode, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack(data, typecode):
+    """Unpack bytes made by pack into an array."""
+    values = array.array(typecode)
+    values.frombytes(bytes(data))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def append(chunk, offset, price):
+    """Add a price to a chunk, replacing the last one if in the same interval.
+
+    Returns:
+        changed (bool): False if the price is older than the chunk's last one,
+            which leaves the chunk as it was
+
+    """
+
+    times = unpack(chunk.times, "I")
+    prices = unpack(chunk.prices, "d")
+    if times and offset < times[-1]:
+        return False
+    if times and offset == times[-1]:
+        prices[-1] = price
+    else:
+        times.append(offset)
+        prices.append(price)
+    chunk.times = pack(times, "I")
+    chunk.prices = pack(prices, "d")
+    return True
+
+
+def record(kind, records, when):
+    """Append the prices of a refresh to the history of their symbols.
+
+    Args:
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        records (list): quote records with a "symbol" and a "price"
+        when (datetime): when the quotes were fetched
+
+    Notes:
+        Each resolution keeps the last price seen in each of its intervals,
+        so the hourly and daily series are rolled up as the prices arrive
+        rather than by a later pass over the minutes.
+
+        A refresh reads and writes one chunk per symbol and resolution, in
+        a few queries per resolution whatever the number of symbols.
+
+    """
+
+    prices = {
+        record["symbol"]: float(record["price"])
+        for record in records
+        if record.get("price") is not None
+    }
+    if not prices:
+        return
+
+    now = int(when.timestamp())
+    with transaction.atomic():
+        for resolution, step in RESOLUTIONS.items():
+            start = now - now % SPANS[resolution]
+            offset = now - now % step - start
+
+            chunks = PriceChunk.objects.select_for_update().filter(
+                kind=kind, resolution=resolution, start=start, symbol__in=list(prices)
+            )
+            chunks = {chunk.symbol: chunk for chunk in chunks}
+
+            new = []
+            changed = []
+            for symbol, price in prices.items():
+                chunk = chunks.get(symbol)
+                if chunk is None:
+                    chunk = PriceChunk(
+                        kind=kind,
+                        symbol=symbol,
+                        resolution=resolution,
+                        start=start,
+                        times=b"",
+                        prices=b"",
+                    )
+                    append(chunk, offset, price)
+                    new.append(chunk)
+                elif append(chunk, offset, price):
+                    changed.append(chunk)
+
+            PriceChunk.objects.bulk_create(new)
+            PriceChunk.objects.bulk_update(changed, ["times", "prices"])
+
+
+def downsample(times, prices, step):
+    """Keep the last price of each interval.
+
+    Args:
+        times (sequence): seconds since the epoch, ascending
+        prices (sequence): the price at each time
+        step (int): the interval, in seconds
+
+    Returns:
+        times (array): the start of each interval with a price
+        prices (array): the last price in each interval
+
+    """
+
+    sampled_times = array.array("q")
+    sampled_prices = array.array("d")
+    for t, price in zip(times, prices):
+        bucket = t - t % step
+        if sampled_times and sampled_times[-1] == bucket:
+            sampled_prices[-1] = price
+        else:
+            sampled_times.append(bucket)
+            sampled_prices.append(price)
+    return sampled_times, sampled_prices
+
+
+def backfill(kind, symbol, times, prices):
+    """Store a symbol's past prices at every resolution, e.g. when importing them.
+
+    Args:
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        symbol (str): the ticker symbol
+        times (sequence): seconds since the epoch, ascending
+        prices (sequence): the price at each time
+
+    Returns:
+        count (int): the number of chunks created
+
+    Notes:
+        The prices must not overlap a chunk already stored for the symbol,
+        so backfill comes before the refresher starts recording it.
+
+    """
+
+    chunks = []
+    for resolution, step in RESOLUTIONS.items():
+        sampled_times, sampled_prices = downsample(times, prices, step)
+        span = SPANS[resolution]
+        i = 0
+        while i < len(sampled_times):
+            start = sampled_times[i] - sampled_times[i] % span
+            j = bisect.bisect_left(sampled_times, start + span, i)
+            chunks.append(
+                PriceChunk(
+                    kind=kind,
+                    symbol=symbol,
+                    resolution=resolution,
+                    start=start,
+                    times=pack((t - start for t in sampled_times[i:j]), "I"),
+                    prices=pack(sampled_prices[i:j], "d"),
+                )
+            )
+            i = j
+
+    PriceChunk.objects.bulk_create(chunks, batch_size=100)
+    return len(chunks)
+
+
+def pick(start, end):
+    """Pick the finest resolution that gives at most MAX_POINTS prices over a range."""
+    for resolution, step in RESOLUTIONS.items():
+        if (end - start) / step <= MAX_POINTS:
+            return resolution
+    return "1d"
+
+
+def query(kind, symbols, start, end, resolution=None):
+    """Read the prices of symbols over a range of time, for charting.
+
+    Args:
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        symbols (list): the ticker symbols
+        start (datetime): the start of the range
+        end (datetime): the end of the range, which is excluded
+        resolution (str): "1m", "1h" or "1d", or None to pick the finest
+            that gives at most MAX_POINTS prices per symbol
+
+    Returns:
+        resolution (str): the resolution of the prices
+        series (dict): (times, prices) arrays keyed by symbol, the times in
+            seconds since the epoch, for every symbol with prices in range
+
+    Raises:
+        ValueError: if the resolution is unknown
+
+    Notes:
+        Runs one query, which reads only the chunks overlapping the range
+        through the unique index on (kind, symbol, resolution, start). A
+        year of daily prices is one or two chunks per symbol.
+
+    """
+
+    start = int(start.timestamp())
+    end = int(end.timestamp())
+    resolution = resolution or pick(start, end)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution {resolution}.")
+
+    chunks = PriceChunk.objects.filter(
+        kind=kind,
+        symbol__in=list(symbols),
+        resolution=resolution,
+        start__gt=start - SPANS[resolution],
+        start__lt=end,
+    )
+    chunks = chunks.order_by("symbol", "start")
+
+    series = {}
+    for symbol, chunk_start, chunk_times, chunk_prices in chunks.values_list(
+        "symbol", "start", "times", "prices"
+    ):
+        offsets = unpack(chunk_times, "I")
+        first = bisect.bisect_left(offsets, start - chunk_start)
+        last = bisect.bisect_left(offsets, end - chunk_start)
+        if first == last:
+            continue
+
+        times, prices = series.setdefault(symbol, (array.array("q"), array.array("d")))
+        times.extend(chunk_start + offset for offset in offsets[first:last])
+        prices.extend(unpack(chunk_prices, "d")[first:last])
+
+    return resolution, series
+
+
+def prune(now=None):
+    """Delete the chunks whose prices are all past their resolution's retention.
+
+    Returns:
+        count (int): the number of chunks deleted
+
+    """
+
+    now = now if now is not None else time.time()
+    count = 0
+    for resolution, keep in RETENTION.items():
+        if keep is None:
+            continue
+        cutoff = now - keep - SPANS[resolution]
+        deleted, by_model = PriceChunk.objects.filter(
+            resolution=resolution, start__lt=cutoff
+        ).delete()
+        count += deleted
+    return count
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+
+from apps.finance import history
+from apps.finance.models import PriceChunk, Quote
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time range queries over a year of minute prices for many symbols."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbols", type=int, default=50)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        # the prices are stored in a transaction that is always rolled back
+        try:
+            with transaction.atomic():
+                self.run(options["symbols"], options["days"], options["rounds"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, count, days, rounds):
+        end = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        start = end - timedelta(days=days)
+        symbols = [f"BENCH{i}" for i in range(count)]
+        generator = random.Random(0)
+
+        began = time.perf_counter()
+        first = int(start.timestamp())
+        times = range(first, int(end.timestamp()), 60)
+        for symbol in symbols:
+            price = 100.0
+            prices = []
+            for t in times:
+                price *= 1 + generator.gauss(0, 0.0005)
+                prices.append(price)
+            history.backfill(Quote.SECURITY, symbol, times, prices)
+
+        stored = PriceChunk.objects.filter(symbol__in=symbols).aggregate(
+            chunks=Count("id"), size=Sum(Length("prices")) + Sum(Length("times"))
+        )
+        self.stdout.write(
+            f"stored {count} x {len(times)} minute prices in {stored['chunks']} "
+            f"chunks, {stored['size'] / 1e6:.0f} MB, "
+            f"in {time.perf_counter() - began:.1f} s"
+        )
+
+        self.stdout.write(f"{count} symbols, median of {rounds}:")
+        for label, since, resolution in [
+            ("the whole range, picked", start, None),
+            ("the last 90 days, picked", end - timedelta(days=90), None),
+            ("the last day, picked", end - timedelta(days=1), None),
+            ("the whole range, hourly", start, "1h"),
+        ]:
+            timings = []
+            for i in range(rounds):
+                began = time.perf_counter()
+                picked, series = history.query(
+                    Quote.SECURITY, symbols, since, end, resolution
+                )
+                timings.append(time.perf_counter() - began)
+            points = sum(len(times) for times, prices in series.values())
+            self.stdout.write(
+                f"  {label}: {statistics.median(timings) * 1000:.1f} ms, "
+                f"{points} prices at {picked}"
+            )
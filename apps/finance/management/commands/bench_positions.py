@@ -0,0 +1,78 @@
+import array
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.finance.valuation import DAY, Valuation, align
+
+
+class Command(BaseCommand):
+    help = "Time valuing many positions over years of daily prices."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--positions", type=int, default=1000)
+        parser.add_argument("--symbols", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=5 * 365)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        count = options["positions"]
+        days = options["days"]
+        rounds = options["rounds"]
+        generator = np.random.default_rng(0)
+
+        # daily prices for each symbol, as history.query returns them, with
+        # every seventh day missing, as for weekends
+        start = 1_600_000_000 - 1_600_000_000 % DAY
+        end = start + days * DAY
+        times = np.arange(start, end, DAY, dtype=np.int64)
+        kept = np.arange(days) % 7 != 6
+        walks = 100 * np.cumprod(
+            1 + generator.normal(0, 0.01, (days, options["symbols"])), axis=0
+        )
+        symbols = [f"BENCH{i}" for i in range(options["symbols"])]
+        series = {
+            symbol: (array.array("q", times[kept]), array.array("d", walks[kept, i]))
+            for i, symbol in enumerate(symbols)
+        }
+
+        columns = generator.integers(0, len(symbols), count)
+        quantities = generator.uniform(1, 100, count)
+        costs = quantities * generator.uniform(50, 150, count)
+
+        def align_and_value():
+            grid, prices = align(series, symbols, start, end)
+            return Valuation(quantities, costs, columns, prices[-1], prices[-2], prices)
+
+        # recomputed from prices already on the grid, e.g. after a refresh
+        grid, prices = align(series, symbols, start, end)
+
+        def value():
+            return Valuation(quantities, costs, columns, prices[-1], prices[-2], prices)
+
+        def value_in_loop():
+            # the value history only, one position and one day at a time
+            history = [0.0] * days
+            for quantity, column in zip(quantities, columns):
+                symbol_times, symbol_prices = series[symbols[column]]
+                for day, price in zip(symbol_times, symbol_prices):
+                    history[(day - start) // DAY] += quantity * price
+            return history
+
+        self.stdout.write(
+            f"{count} positions in {len(symbols)} symbols, {days} days, "
+            f"median of {rounds}:"
+        )
+        for label, function, repeat in [
+            ("aligned and valued", align_and_value, rounds),
+            ("valued", value, rounds),
+            ("python loop", value_in_loop, 1),
+        ]:
+            timings = []
+            for i in range(repeat):
+                began = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - began)
+            self.stdout.write(f"  {label}: {statistics.median(timings) * 1000:.1f} ms")
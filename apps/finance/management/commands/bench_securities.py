@@ -0,0 +1,54 @@
+import statistics
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+import apps.finance.securities_data as securities_data
+from apps.finance.stub import QuoteServer
+
+
+class Command(BaseCommand):
+    help = "Compare serial and concurrent quote fetching against a local stub."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delay", type=float, default=0.05)
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--counts", type=int, nargs="+", default=[1, 3, 9, 27, 81])
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+
+        with QuoteServer(delay=options["delay"]) as server:
+            self.stdout.write(
+                f"stub latency {options['delay'] * 1000:.0f} ms, "
+                f"{securities_data.WORKERS} workers, median of {rounds}:"
+            )
+            for count in options["counts"]:
+                assets = [
+                    {"symbol": f"S{i}", "exchange": "STUB", "name": f"Stub {i}"}
+                    for i in range(count)
+                ]
+                serial = self.time(rounds, self.serial, assets, server.url)
+                concurrent = self.time(
+                    rounds, securities_data.collect, assets, server.url
+                )
+                self.stdout.write(
+                    f"  {count:>3} symbols: serial {serial * 1000:7.1f} ms, "
+                    f"concurrent {concurrent * 1000:7.1f} ms"
+                )
+
+    def serial(self, assets, url):
+        # the way quotes were fetched before: one new connection per symbol,
+        # one after another
+        for asset in assets:
+            params = {"symbol": asset["symbol"], "token": ""}
+            requests.get(url, params=params).json()
+
+    def time(self, rounds, function, *args):
+        timings = []
+        for i in range(rounds):
+            start = time.perf_counter()
+            function(*args)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.finance import history, quotes
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch the quotes shown on the finance pages into the quote store "
+        "and price history, once, or repeatedly with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--every", type=float, default=settings.QUOTE_REFRESH_SECONDS
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            try:
+                counts = quotes.refresh()
+                history.prune()
+            except Exception as error:
+                # a failed refresh leaves the stored quotes as they were,
+                # and the next one tries again
+                if not options["loop"]:
+                    raise
+                self.stderr.write(f"refresh failed: {error}")
+            else:
+                elapsed = time.monotonic() - start
+                saved = ", ".join(f"{count} {kind}" for kind, count in counts.items())
+                self.stdout.write(f"saved {saved} quotes in {elapsed:.2f} s")
+
+            if not options["loop"]:
+                break
+            time.sleep(max(options["every"] - (time.monotonic() - start), 0))
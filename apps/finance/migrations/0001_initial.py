@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Quote",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("crypto", "Crypto"), ("security", "Security")],
+                        max_length=10,
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("data", models.JSONField()),
+                ("fetched", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "app_quote",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="quote",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "symbol"), name="app_quote_unique_symbol"
+            ),
+        ),
+    ]
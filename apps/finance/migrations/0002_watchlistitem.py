@@ -0,0 +1,49 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("finance", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WatchlistItem",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("crypto", "Crypto"), ("security", "Security")],
+                        max_length=10,
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("name", models.CharField(blank=True, default="", max_length=50)),
+                ("exchange", models.CharField(blank=True, default="", max_length=20)),
+                ("added", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "app_watchlist_item",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="watchlistitem",
+            constraint=models.UniqueConstraint(
+                fields=("user", "kind", "symbol"),
+                name="app_watchlist_item_unique_symbol",
+            ),
+        ),
+    ]
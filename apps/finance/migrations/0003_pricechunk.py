@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0002_watchlistitem"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceChunk",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("crypto", "Crypto"), ("security", "Security")],
+                        max_length=10,
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("resolution", models.CharField(max_length=2)),
+                ("start", models.BigIntegerField()),
+                ("times", models.BinaryField()),
+                ("prices", models.BinaryField()),
+            ],
+            options={
+                "db_table": "app_price_chunk",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="pricechunk",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "symbol", "resolution", "start"),
+                name="app_price_chunk_unique_start",
+            ),
+        ),
+    ]
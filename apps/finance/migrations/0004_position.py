@@ -0,0 +1,42 @@
+# Generated by Django 4.2.11 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("finance", "0003_pricechunk"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Position",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("crypto", "Crypto"), ("security", "Security")],
+                        max_length=10,
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("quantity", models.DecimalField(decimal_places=8, max_digits=24)),
+                ("cost", models.DecimalField(decimal_places=2, max_digits=20)),
+                ("opened", models.DateField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "app_position",
+            },
+        ),
+    ]
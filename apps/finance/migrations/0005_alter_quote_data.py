@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0004_position"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="quote",
+            name="data",
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -1,3 +1,151 @@
 from django.db import models
 
-# Create your models here.
+from accounts.models import CustomUser
+
+
+class Quote(models.Model):
+    """The latest quote for a symbol, shared by every user who views it.
+
+    Attributes:
+        id (int): the unique identifier for the quote
+        kind (str): "crypto" for coinmarketcap quotes, "security" for finnhub
+        symbol (str): the ticker symbol, e.g. "BTC" or "GME"
+        data (dict): the asset record shown on the finance pages, as built by
+            crypto_data.condense or securities_data.collect, or None if the
+            symbol has never been quoted
+        fetched (datetime): when the quote was fetched, or last tried
+
+    Notes:
+        Quotes are written by apps.finance.quotes.refresh, which the
+        refresh_quotes command runs on a schedule, and only read by views.
+
+    """
+
+    CRYPTO = "crypto"
+    SECURITY = "security"
+    KINDS = [(CRYPTO, "Crypto"), (SECURITY, "Security")]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    symbol = models.CharField(max_length=20)
+    data = models.JSONField(null=True)
+    fetched = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.kind} : {self.symbol}"
+
+    class Meta:
+        db_table = "app_quote"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "symbol"], name="app_quote_unique_symbol"
+            ),
+        ]
+
+
+class WatchlistItem(models.Model):
+    """An asset on a user's watchlist.
+
+    Attributes:
+        id (int): the unique identifier for the item
+        user (int): the user who watches the asset
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        symbol (str): the ticker symbol
+        name (str): the name shown for a security; crypto names come with
+            their quotes
+        exchange (str): the exchange a security trades on
+        added (datetime): when the asset was added
+
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=Quote.KINDS)
+    symbol = models.CharField(max_length=20)
+    name = models.CharField(max_length=50, blank=True, default="")
+    exchange = models.CharField(max_length=20, blank=True, default="")
+    added = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user_id} : {self.kind} : {self.symbol}"
+
+    class Meta:
+        db_table = "app_watchlist_item"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "kind", "symbol"],
+                name="app_watchlist_item_unique_symbol",
+            ),
+        ]
+
+
+class PriceChunk(models.Model):
+    """A run of a symbol's prices at one resolution, packed as binary arrays.
+
+    Attributes:
+        id (int): the unique identifier for the chunk
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        symbol (str): the ticker symbol
+        resolution (str): "1m", "1h" or "1d", the interval between prices
+        start (int): the start of the span the chunk covers, in seconds
+            since the epoch
+        times (bytes): each price's time, as seconds after the start
+        prices (bytes): the prices
+
+    Notes:
+        See apps.finance.history for how chunks are written and read.
+
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=Quote.KINDS)
+    symbol = models.CharField(max_length=20)
+    resolution = models.CharField(max_length=2)
+    start = models.BigIntegerField()
+    times = models.BinaryField()
+    prices = models.BinaryField()
+
+    def __str__(self):
+        return f"{self.kind} : {self.symbol} : {self.resolution} : {self.start}"
+
+    class Meta:
+        db_table = "app_price_chunk"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "symbol", "resolution", "start"],
+                name="app_price_chunk_unique_start",
+            ),
+        ]
+
+
+class Position(models.Model):
+    """A holding of an asset in a user's portfolio.
+
+    Attributes:
+        id (int): the unique identifier for the position
+        user (int): the user who holds the position
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        symbol (str): the ticker symbol
+        quantity (decimal): the units held
+        cost (decimal): the total paid for the units, the cost basis
+        opened (date): when the position was opened, if known
+
+    Notes:
+        Positions are valued together by apps.finance.portfolio, from the
+        stored quotes and price history.
+
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=Quote.KINDS)
+    symbol = models.CharField(max_length=20)
+    quantity = models.DecimalField(max_digits=24, decimal_places=8)
+    cost = models.DecimalField(max_digits=20, decimal_places=2)
+    opened = models.DateField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.user_id} : {self.kind} : {self.symbol}"
+
+    class Meta:
+        db_table = "app_position"
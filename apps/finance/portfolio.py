@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from apps.finance import history, quotes
+from apps.finance.models import Position, Quote
+from apps.finance.valuation import Valuation, align
+
+# the days of price history the portfolio is valued over
+HISTORY_DAYS = 5 * 365
+
+# the days read before the range, so that its first day has a price
+LOOKBACK_DAYS = 7
+
+# the figures attached to each position, from the valuation
+FIGURES = ["market_value", "gain", "returns", "daily_pnl", "weights"]
+
+
+def number(value):
+    return np.nan if value is None else float(value)
+
+
+def previous_close(kind, record):
+    """Get the previous close from a stored quote record.
+
+    Notes:
+        Coinmarketcap quotes have no close, so the price 24 hours ago is
+        worked out from the 24 hour change.
+
+    """
+
+    if kind == Quote.SECURITY:
+        return record.get("previous_close")
+    price = record.get("price")
+    change = record.get("percent_change_24h")
+    if price is None or change is None:
+        return None
+    return price / (1 + change / 100)
+
+
+def value(user, days=HISTORY_DAYS, now=None):
+    """Value a user's positions at the latest prices and over their price history.
+
+    Args:
+        user : a request customuser
+        days (int): the days of history the portfolio is valued over
+        now (datetime): the end of the history, by default now
+
+    Returns:
+        positions (list): a dict per position, with its id, kind, symbol,
+            quantity and cost, and its "price" and valuation figures, None
+            where a figure is unknown
+        valuation (Valuation): the valuation of all the positions
+
+    Notes:
+        Reads the positions, then the stored quotes and the daily price
+        history of each kind of asset, so the queries do not grow with the
+        number of positions, and no quote is fetched per position. The
+        positions are then valued together by apps.finance.valuation.
+
+    """
+
+    positions = list(
+        Position.objects.filter(user=user)
+        .order_by("kind", "symbol", "id")
+        .values("id", "kind", "symbol", "quantity", "cost", "opened")
+    )
+
+    # one price column per distinct symbol, shared by its positions
+    keys = sorted({(position["kind"], position["symbol"]) for position in positions})
+    column = {key: i for i, key in enumerate(keys)}
+
+    now = now or datetime.now(timezone.utc)
+    start = now - timedelta(days=days)
+    latest = np.full(len(keys), np.nan)
+    previous = np.full(len(keys), np.nan)
+    series = {}
+
+    for kind in (Quote.CRYPTO, Quote.SECURITY):
+        symbols = [symbol for key_kind, symbol in keys if key_kind == kind]
+        if not symbols:
+            continue
+
+        assets = [{"symbol": symbol, "name": "", "exchange": ""} for symbol in symbols]
+        records, fetched = quotes.load(kind, assets)
+        for symbol, record in records.items():
+            latest[column[kind, symbol]] = number(record.get("price"))
+            previous[column[kind, symbol]] = number(previous_close(kind, record))
+
+        since = start - timedelta(days=LOOKBACK_DAYS)
+        resolution, found = history.query(kind, symbols, since, now, "1d")
+        series.update({(kind, symbol): found[symbol] for symbol in found})
+
+    grid, prices = align(series, keys, int(start.timestamp()), int(now.timestamp()))
+
+    columns = [column[p["kind"], p["symbol"]] for p in positions]
+    valuation = Valuation(
+        quantities=np.array([float(p["quantity"]) for p in positions], dtype=float),
+        costs=np.array([float(p["cost"]) for p in positions], dtype=float),
+        columns=np.array(columns, dtype=int),
+        latest=latest,
+        previous=previous,
+        prices=prices,
+    )
+
+    for i, position in enumerate(positions):
+        position["price"] = latest[columns[i]]
+        for figure in FIGURES:
+            position[figure] = getattr(valuation, figure)[i]
+        for key in ["price", *FIGURES]:
+            position[key] = None if np.isnan(position[key]) else float(position[key])
+
+    return positions, valuation
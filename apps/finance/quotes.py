@@ -0,0 +1,303 @@
+from django.utils import timezone
+
+import apps.finance.crypto_data as crypto_data
+import apps.finance.securities_data as securities_data
+from apps.finance import history
+from apps.finance.models import Position, Quote, WatchlistItem
+from config import settings_local
+
+# the most symbols sent in one coinmarketcap request
+CRYPTO_BATCH = 100
+
+
+def defaults(kind):
+    """List the assets shown to a user who has not chosen their own.
+
+    Returns:
+        assets (list): dicts with the symbol, name and exchange of each asset
+
+    """
+
+    if kind == Quote.CRYPTO:
+        symbols = [s for s in settings_local.CRYPTO_SYMBOLS.split(",") if s]
+        return [{"symbol": s, "name": "", "exchange": ""} for s in symbols]
+    return [
+        {"symbol": a["symbol"], "name": a["name"], "exchange": a["exchange"]}
+        for a in securities_data.asset_list
+    ]
+
+
+def watchlist(user, kind):
+    """List the assets a user watches, or the default assets if none."""
+    items = WatchlistItem.objects.filter(user=user, kind=kind).order_by("symbol")
+    assets = list(items.values("symbol", "name", "exchange"))
+    return assets or defaults(kind)
+
+
+def watched(kind):
+    """List every asset of a kind that any user watches or holds, once per symbol.
+
+    Notes:
+        Users who watch the same symbol share its quote, so the assets
+        fetched depend on the number of distinct symbols, not of users.
+        The name and exchange of a symbol are those of its first watcher.
+
+        The symbols of portfolio positions are included, so that they are
+        valued at a current price even if nobody watches them, except those
+        that have never been quoted, which would fail a crypto batch.
+
+    """
+
+    assets = {asset["symbol"]: asset for asset in defaults(kind)}
+    items = WatchlistItem.objects.filter(kind=kind).order_by("id")
+    for item in items.values("symbol", "name", "exchange").iterator():
+        assets.setdefault(item["symbol"], item)
+
+    unquoted = Quote.objects.filter(kind=kind, data__isnull=True).values("symbol")
+    held = Position.objects.filter(kind=kind).exclude(symbol__in=unquoted)
+    for symbol in held.values_list("symbol", flat=True).distinct().iterator():
+        assets.setdefault(symbol, {"symbol": symbol, "name": "", "exchange": ""})
+    return list(assets.values())
+
+
+def quote(kind, asset):
+    """Make sure an asset has a stored quote, fetching it if it is new.
+
+    Returns:
+        quoted (bool): False if the symbol could not be quoted
+
+    Notes:
+        Symbols are only watched or held once they have been quoted, so an
+        unknown symbol cannot spoil the batched crypto requests of other
+        users.
+
+    """
+
+    quoted = Quote.objects.filter(kind=kind, symbol=asset["symbol"], data__isnull=False)
+    return quoted.exists() or bool(store(kind, fetch(kind, [asset])))
+
+
+def watch(user, kind, asset):
+    """Add an asset to a user's watchlist, quoting it first if it is new.
+
+    Args:
+        user : a request customuser
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        asset (dict): the symbol, name and exchange of the asset
+
+    Returns:
+        added (bool): False if the symbol could not be quoted
+
+    Notes:
+        A new symbol is only added once it has been quoted, see "quote".
+
+        A user's first change copies the defaults they were seeing into
+        their watchlist, so the page only gains the asset added.
+
+    """
+
+    if not quote(kind, asset):
+        return False
+
+    seed(user, kind)
+    WatchlistItem.objects.get_or_create(
+        user=user,
+        kind=kind,
+        symbol=asset["symbol"],
+        defaults={"name": asset["name"], "exchange": asset["exchange"]},
+    )
+    return True
+
+
+def unwatch(user, kind, symbol):
+    """Remove an asset from a user's watchlist.
+
+    Notes:
+        The asset's stored quote is kept, for the other users watching it,
+        and is no longer refreshed once nobody watches or holds it.
+
+    """
+
+    seed(user, kind)
+    WatchlistItem.objects.filter(user=user, kind=kind, symbol=symbol).delete()
+
+
+def seed(user, kind):
+    if WatchlistItem.objects.filter(user=user, kind=kind).exists():
+        return
+    WatchlistItem.objects.bulk_create(
+        [WatchlistItem(user=user, kind=kind, **asset) for asset in defaults(kind)]
+    )
+
+
+def fetch_crypto(assets):
+    """Fetch the quotes of crypto assets, many symbols per coinmarketcap request.
+
+    Returns:
+        records (list): the condensed record of each symbol quoted
+
+    Notes:
+        An unknown symbol fails the whole request it is sent in, so a failed
+        batch is split in two and each half retried, until the symbols that
+        cannot be quoted are left on their own. A bad symbol costs a few
+        extra requests, rather than the quotes of the rest of its batch.
+
+    """
+
+    symbols = [asset["symbol"] for asset in assets]
+    records = []
+    for i in range(0, len(symbols), CRYPTO_BATCH):
+        records.extend(fetch_crypto_batch(symbols[i : i + CRYPTO_BATCH]))
+    return records
+
+
+def fetch_crypto_batch(symbols):
+    data = crypto_data.collect(",".join(symbols))
+    if data:
+        return list(crypto_data.condense(data).values())
+    if len(symbols) == 1:
+        return []
+    half = len(symbols) // 2
+    return fetch_crypto_batch(symbols[:half]) + fetch_crypto_batch(symbols[half:])
+
+
+def fetch_securities(assets):
+    """Fetch the quotes of securities from finnhub, one request per symbol.
+
+    Returns:
+        records (list): the record of each security quoted, leaving out
+            those whose quote could not be fetched
+
+    Notes:
+        The requests run concurrently, paced to stay within finnhub's rate
+        limit, so a long list of symbols takes longer rather than failing.
+
+    """
+
+    records = securities_data.collect(assets, limiter=securities_data.limiter)
+    return [record for record in records if record["price"] is not None]
+
+
+def fetch(kind, assets):
+    if kind == Quote.CRYPTO:
+        return fetch_crypto(assets)
+    return fetch_securities(assets)
+
+
+def store(kind, records, now=None):
+    """Save the latest quotes, replacing any earlier quote of the same symbol.
+
+    Args:
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        records (list): the records from "fetch"
+        now (datetime): when the quotes were fetched, by default now
+
+    Returns:
+        count (int): the number of quotes saved
+
+    """
+
+    now = now or timezone.now()
+    quotes = [
+        Quote(kind=kind, symbol=record["symbol"], data=record, fetched=now)
+        for record in records
+    ]
+    Quote.objects.bulk_create(
+        quotes,
+        update_conflicts=True,
+        unique_fields=["kind", "symbol"],
+        update_fields=["data", "fetched"],
+    )
+    return len(quotes)
+
+
+def store_unquoted(kind, symbols, now=None):
+    """Record symbols that could not be quoted, unless they have a stored quote.
+
+    Notes:
+        The empty quote tells "load" the symbol has been tried, so page views
+        do not request it again; the refresher keeps trying it while it is
+        watched, and replaces the empty quote once it is quoted.
+
+    """
+
+    now = now or timezone.now()
+    Quote.objects.bulk_create(
+        [Quote(kind=kind, symbol=symbol, data=None, fetched=now) for symbol in symbols],
+        ignore_conflicts=True,
+    )
+
+
+def refresh(kinds=(Quote.CRYPTO, Quote.SECURITY)):
+    """Fetch and store the quotes of every symbol on any user's watchlist.
+
+    Args:
+        kinds (iterable): the kinds of quote to refresh
+
+    Returns:
+        counts (dict): the number of quotes saved, keyed by kind
+
+    Notes:
+        All watchlists are merged first, so each symbol is fetched once per
+        refresh, however many users watch it: crypto quotes take one
+        request per CRYPTO_BATCH symbols, and securities one per symbol.
+        A quote that cannot be fetched keeps its last stored value.
+
+        The prices are also appended to the symbols' price history.
+
+    """
+
+    counts = {}
+    for kind in kinds:
+        records = fetch(kind, watched(kind))
+        now = timezone.now()
+        counts[kind] = store(kind, records, now)
+        history.record(kind, records, now)
+    return counts
+
+
+def load(kind, assets):
+    """Read a user's share of the stored quotes, for the finance pages.
+
+    Args:
+        kind (str): Quote.CRYPTO or Quote.SECURITY
+        assets (list): the assets on the user's watchlist, from "watchlist"
+
+    Returns:
+        records (dict): the stored record of each asset quoted, with the
+            user's own name and exchange for it, if any, keyed by symbol
+        fetched (datetime): when the oldest of the quotes was fetched, or
+            None if none are stored
+
+    Notes:
+        Pages never wait for the upstream services, except for symbols with
+        no stored quote yet, e.g. defaults before the refresher's first run,
+        which are fetched once here. Symbols that cannot be quoted are
+        stored as such, so they are left to the refresher afterwards.
+
+    """
+
+    symbols = [asset["symbol"] for asset in assets]
+    quotes = Quote.objects.filter(kind=kind, symbol__in=symbols)
+    quotes = list(quotes.values_list("symbol", "data", "fetched"))
+
+    stored = {symbol for symbol, data, fetched in quotes}
+    missing = [asset for asset in assets if asset["symbol"] not in stored]
+    if missing:
+        fetched = fetch(kind, missing)
+        store(kind, fetched)
+        quoted = {record["symbol"] for record in fetched}
+        unquoted = [a["symbol"] for a in missing if a["symbol"] not in quoted]
+        store_unquoted(kind, unquoted)
+        quotes = Quote.objects.filter(kind=kind, symbol__in=symbols)
+        quotes = list(quotes.values_list("symbol", "data", "fetched"))
+
+    quotes = [quote for quote in quotes if quote[1] is not None]
+    records = {symbol: data for symbol, data, fetched in quotes}
+    for asset in assets:
+        record = records.get(asset["symbol"])
+        if record is not None:
+            record.update({k: asset[k] for k in ("name", "exchange") if asset[k]})
+
+    fetched = min((fetched for symbol, data, fetched in quotes), default=None)
+    return records, fetched
@@ -1,7 +1,35 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from config import settings_local
 
+QUOTE_URL = "https://finnhub.io/api/v1/quote"
+
+# seconds allowed to connect to the quote service, and to wait for a reply
+TIMEOUT = (3.05, 5)
+
+# the most quote requests in flight at once, which is also the number of
+# connections kept open to the quote service
+WORKERS = 10
+
+# finnhub's free tier allows this many quote requests a minute
+CALLS_PER_MINUTE = 60
+
+# the fields of a finnhub quote, keyed by the name used in an asset record
+QUOTE_FIELDS = {
+    "previous_close": "pc",
+    "open": "o",
+    "high": "h",
+    "low": "l",
+    "price": "c",
+    "change": "d",
+    "percent_change": "dp",
+}
+
 asset_list = [
     {
         "symbol": "GME",
@@ -51,45 +79,137 @@ asset_list = [
 ]
 
 
-def fetch(symbol):
+def make_session(workers=WORKERS):
+    """Build a session that keeps its connections to the quote service open.
+
+    Notes:
+        Requests made through the session reuse pooled keep-alive
+        connections, so only the first request to a host pays for the TCP
+        and TLS handshakes. The pool holds a connection per worker.
+
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RateLimiter:
+    """Spaces out calls shared between threads, as a token bucket.
+
+    Args:
+        calls (int): the calls allowed per period
+        period (float): the period, in seconds
+        burst (int): the most calls made at once after a quiet spell
+
+    Notes:
+        A call taken when the bucket is empty reserves the next free slot
+        and sleeps until it, so concurrent callers queue in arrival order.
+
+    """
+
+    def __init__(self, calls, period, burst=1):
+        self.interval = period / calls
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.updated
+            self.tokens = min(self.burst, self.tokens + elapsed / self.interval)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens * self.interval if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+session = make_session()
+executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="quotes")
+limiter = RateLimiter(CALLS_PER_MINUTE, 60, burst=WORKERS)
+
+
+def fetch(symbol, url=QUOTE_URL):
     """Fetch securities data for a specific symbol/asset.
 
+    Args:
+        symbol (str): the ticker symbol, e.g. "GME"
+        url (str): the quote endpoint, which benchmarks point at a stub
+
     Returns:
         quote (dict): a list of attributes for each asset
 
+    Raises:
+        requests.RequestException: if the request fails or times out
+
     """
 
-    url = "https://finnhub.io/api/v1/quote"
     params = {
         "symbol": symbol,
         "token": settings_local.FINNHUB_API_KEY,
     }
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
     quote = response.json()
     return quote
 
 
-def collect(assets):
+def record(asset, quote):
+    """Build a fresh asset record from an asset and its quote.
+
+    Args:
+        asset (dict): the symbol, exchange and name of the asset
+        quote (dict): the quote from "fetch", or None if it failed
+
+    Returns:
+        record (dict): a copy of the asset with the quote fields added, which
+            are None if the quote is missing
+
+    """
+
+    quote = quote or {}
+    return {
+        **asset,
+        **{field: quote.get(key) for field, key in QUOTE_FIELDS.items()},
+    }
+
+
+def collect(assets, url=QUOTE_URL, limiter=None):
     """Fetch securities data for a COLLECTION of symbols/assets.
 
+    Args:
+        assets (list): dicts with the symbol, exchange and name of each asset
+        url (str): the quote endpoint, as for "fetch"
+        limiter (RateLimiter): paces the requests, e.g. the module's
+            "limiter" for the real service, or None for no limit
+
     Returns:
         assets (list): a list of assets with the dict of attributes for each
 
     Notes:
-        Uses the "fetch" function, above to pull the data for each asset
+        Uses the "fetch" function, above to pull the data for each asset.
+        The requests run concurrently, so the page waits about as long as
+        the slowest quote rather than the sum of them all. The assets passed
+        in are not changed: each request gets its own new records, so
+        threads serving other requests never see a half-filled list.
 
     """
 
-    for asset in assets:
-        quote = fetch(asset["symbol"])
-        asset["previous_close"] = quote["pc"]
-        asset["open"] = quote["o"]
-        asset["high"] = quote["h"]
-        asset["low"] = quote["l"]
-        asset["price"] = quote["c"]
-        asset["change"] = quote["d"]
-        asset["percent_change"] = quote["dp"]
-    return assets
+    def quote(asset):
+        if limiter:
+            limiter.acquire()
+        try:
+            return fetch(asset["symbol"], url)
+        except (requests.RequestException, ValueError):
+            return None
+
+    quotes = executor.map(quote, assets)
+    return [record(asset, quote) for asset, quote in zip(assets, quotes)]
 
 
 def sort(data, ord):
@@ -108,5 +228,9 @@ def sort(data, ord):
         reverse = True
     else:
         reverse = False
-    sorted_data = sorted(data, key=lambda k: k[ord], reverse=reverse)
-    return sorted_data
+
+    # assets whose quote could not be fetched go last, in either order
+    present = [asset for asset in data if asset[ord] is not None]
+    missing = [asset for asset in data if asset[ord] is None]
+    sorted_data = sorted(present, key=lambda k: k[ord], reverse=reverse)
+    return sorted_data + missing
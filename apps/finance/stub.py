@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class QuoteHandler(BaseHTTPRequestHandler):
+    """Answers finnhub style quote requests with made up prices, after a delay."""
+
+    # keep connections open between requests, as finnhub does
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+            server.requests += 1
+
+        symbol = parse_qs(urlparse(self.path).query).get("symbol", [""])[0]
+        price = 10.0 + len(symbol)
+        quote = {
+            "c": price,
+            "d": 0.5,
+            "dp": 5.0,
+            "h": price + 1,
+            "l": price - 1,
+            "o": price - 0.5,
+            "pc": price - 0.5,
+            "t": int(time.time()),
+        }
+
+        body = json.dumps(quote).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QuoteServer:
+    """A local stand-in for the finnhub quote service, for tests and benchmarks.
+
+    Args:
+        delay (float): seconds each reply is held back, to simulate the
+            latency of the real service
+
+    Notes:
+        Used as a context manager, it serves from a background thread on a
+        free local port, and "url" is the quote endpoint to fetch from.
+
+        "peak" is the most requests that were being answered at once, which
+        shows whether they were made concurrently.
+
+    """
+
+    def __init__(self, delay=0.05):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), QuoteHandler)
+        self.server.daemon_threads = True
+        self.server.delay = delay
+        self.server.requests = 0
+        self.server.in_flight = 0
+        self.server.peak = 0
+        self.server.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/api/v1/quote"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    @property
+    def peak(self):
+        return self.server.peak
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -9,6 +9,15 @@ def test_fetch():
     assert data["MATIC"]["quote"]["USD"]["price"] > 0
 
 
+def test_fetch_timeout(monkeypatch):
+    def get(url, params=None, timeout=None):
+        assert timeout == crypto_data.TIMEOUT
+        raise crypto_data.Timeout()
+
+    monkeypatch.setattr(crypto_data.requests, "get", get)
+    assert crypto_data.collect("BTC") is None
+
+
 def test_condense(sample_crypto_data):
     condensed_data = crypto_data.condense(sample_crypto_data)
     assert "BTC" in condensed_data
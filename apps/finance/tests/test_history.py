@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from apps.finance import history
+from apps.finance.models import PriceChunk, Quote
+
+pytestmark = pytest.mark.django_db
+
+DAY = datetime(2026, 3, 2, tzinfo=timezone.utc)
+START = DAY + timedelta(hours=9, minutes=30)
+
+
+def quote(symbol, price):
+    return {"symbol": symbol, "price": price}
+
+
+def test_pack():
+    data = history.pack([1.5, 2.25], "d")
+    assert len(data) == 16
+    assert list(history.unpack(memoryview(data), "d")) == [1.5, 2.25]
+
+
+def test_record():
+    history.record(Quote.SECURITY, [quote("GME", 10.0), quote("TSLA", 20.0)], START)
+    history.record(Quote.SECURITY, [quote("GME", 11.0)], START + timedelta(seconds=20))
+    history.record(Quote.SECURITY, [quote("GME", 12.0)], START + timedelta(minutes=1))
+    history.record(Quote.SECURITY, [quote("GME", 13.0)], START + timedelta(hours=1))
+
+    # a chunk per symbol and resolution
+    assert PriceChunk.objects.filter(symbol="GME").count() == 3
+
+    end = START + timedelta(hours=2)
+    resolution, series = history.query(Quote.SECURITY, ["GME"], START, end, "1m")
+    times, prices = series["GME"]
+    assert list(prices) == [11.0, 12.0, 13.0]
+    assert times[0] == int(START.timestamp())
+
+    # the hourly series keeps the last price of each hour
+    resolution, series = history.query(Quote.SECURITY, ["GME"], DAY, end, "1h")
+    assert list(series["GME"][1]) == [12.0, 13.0]
+    resolution, series = history.query(Quote.SECURITY, ["GME"], DAY, end, "1d")
+    assert list(series["GME"][1]) == [13.0]
+
+
+def test_record_skips_missing_and_older_prices():
+    history.record(Quote.SECURITY, [quote("GME", 10.0)], START)
+    history.record(Quote.SECURITY, [quote("GME", 9.0)], START - timedelta(minutes=5))
+    history.record(Quote.SECURITY, [quote("GME", None)], START + timedelta(minutes=5))
+
+    end = START + timedelta(hours=1)
+    resolution, series = history.query(Quote.SECURITY, ["GME"], DAY, end, "1m")
+    assert list(series["GME"][1]) == [10.0]
+
+
+def test_backfill_and_query():
+    first = int(START.timestamp())
+    times = range(first, first + 10 * 86400, 60)
+    prices = [float(i) for i in range(len(times))]
+    history.backfill(Quote.CRYPTO, "BTC", times, prices)
+
+    # a day of minutes is within MAX_POINTS, ten days of hours too
+    resolution, series = history.query(
+        Quote.CRYPTO, ["BTC", "ETH"], START, START + timedelta(days=1)
+    )
+    assert resolution == "1m"
+    assert len(series["BTC"][0]) == 1440
+    assert "ETH" not in series
+
+    end = START + timedelta(days=10)
+    resolution, series = history.query(Quote.CRYPTO, ["BTC"], START, end)
+    assert resolution == "1h"
+    times, prices = series["BTC"]
+    assert all(b - a == 3600 for a, b in zip(times, times[1:]))
+    assert prices[-1] == len(range(first, first + 10 * 86400, 60)) - 1
+
+    resolution, series = history.query(
+        Quote.CRYPTO, ["BTC"], DAY, DAY + timedelta(days=1000)
+    )
+    assert resolution == "1d"
+    assert len(series["BTC"][0]) == 11
+
+    with pytest.raises(ValueError):
+        history.query(Quote.CRYPTO, ["BTC"], START, end, "5m")
+
+
+def test_prune():
+    history.record(Quote.CRYPTO, [quote("BTC", 1.0)], START)
+    later = START.timestamp() + history.RETENTION["1m"] + 2 * 86400
+    assert history.prune(later) == 1
+    assert set(PriceChunk.objects.values_list("resolution", flat=True)) == {"1h", "1d"}
+
+
+def test_view(client):
+    history.record(Quote.CRYPTO, [quote("BTC", 1.0)], START)
+    start = int(START.timestamp())
+
+    response = client.get(f"/prices/crypto/BTC?start={start}&end={start + 3600}")
+    assert response.json() == {
+        "status": "ok",
+        "symbol": "BTC",
+        "resolution": "1m",
+        "times": [start],
+        "prices": [1.0],
+    }
+
+    response = client.get("/prices/crypto/BTC?days=x")
+    assert response.status_code == 400
+    response = client.get("/prices/bonds/BTC")
+    assert response.status_code == 404
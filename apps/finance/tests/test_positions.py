@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import apps.finance.crypto_data as crypto_data
+import apps.finance.securities_data as securities_data
+from apps.finance import history, portfolio, quotes
+from apps.finance.models import Position, Quote
+
+pytestmark = pytest.mark.django_db
+
+NOW = datetime(2026, 3, 2, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Store quotes and a month of daily prices, and fail any upstream request."""
+
+    def unavailable(*args, **kwargs):
+        raise AssertionError("the upstream services were called")
+
+    monkeypatch.setattr(crypto_data, "collect", unavailable)
+    monkeypatch.setattr(securities_data, "collect", unavailable)
+
+    gme = {"symbol": "GME", "price": 12.0, "previous_close": 10.0}
+    btc = {"symbol": "BTC", "price": 110.0, "percent_change_24h": 10.0}
+    quotes.store(Quote.SECURITY, [gme])
+    quotes.store(Quote.CRYPTO, [btc])
+
+    first = int((NOW - timedelta(days=30)).timestamp())
+    times = range(first, int(NOW.timestamp()), 86400)
+    history.backfill(Quote.SECURITY, "GME", times, [10.0] * len(times))
+    history.backfill(Quote.CRYPTO, "BTC", times, [100.0] * len(times))
+
+
+def test_value(user, stored):
+    for kind, symbol, quantity, cost in [
+        ("security", "GME", 10, 50),
+        ("security", "GME", 5, 75),
+        ("crypto", "BTC", 1, 100),
+    ]:
+        Position.objects.create(
+            user=user, kind=kind, symbol=symbol, quantity=quantity, cost=cost
+        )
+
+    positions, valuation = portfolio.value(user, days=30, now=NOW)
+
+    assert [p["symbol"] for p in positions] == ["BTC", "GME", "GME"]
+    btc, gme, more_gme = positions
+    assert btc["market_value"] == 110.0
+    assert btc["daily_pnl"] == pytest.approx(10.0)
+    assert gme["gain"] == 70.0
+    assert more_gme["returns"] == -0.2
+    assert gme["daily_pnl"] == 20.0
+
+    totals = valuation.totals()
+    assert totals["market_value"] == 290.0
+    assert totals["cost_basis"] == 225.0
+
+    # 15 GME at 10 and 1 BTC at 100 on every day of the history
+    assert valuation.history[0] == 250.0
+    assert valuation.period_return(7) == 0.0
+
+
+def test_value_without_positions(user):
+    positions, valuation = portfolio.value(user)
+    assert positions == []
+    assert valuation.totals()["market_value"] == 0.0
+
+
+def test_views(client, user, stored):
+    response = client.post(
+        "/positions/add",
+        {"kind": "security", "symbol": "gme", "quantity": "10", "cost": "50"},
+    )
+    assert response.status_code == 302
+    position = Position.objects.get(user=user)
+    assert position.symbol == "GME"
+
+    response = client.get("/positions/")
+    assert response.status_code == 200
+    assert response.context["data"][0]["market_value"] == 120.0
+    assert response.context["totals"]["gain"] == 70.0
+
+    # invalid positions are not added
+    client.post(
+        "/positions/add",
+        {"kind": "security", "symbol": "GME", "quantity": "-1", "cost": "50"},
+    )
+    assert Position.objects.count() == 1
+
+    response = client.post(f"/positions/{position.id}/delete")
+    assert response.status_code == 302
+    assert not Position.objects.exists()
+    response = client.post(f"/positions/{position.id}/delete")
+    assert response.status_code == 404
@@ -0,0 +1,121 @@
+import pytest
+
+import apps.finance.crypto_data as crypto_data
+import apps.finance.securities_data as securities_data
+from apps.finance import quotes
+from apps.finance.models import Position, Quote
+
+pytestmark = pytest.mark.django_db
+
+
+def assets(symbols):
+    return [{"symbol": symbol, "name": "", "exchange": ""} for symbol in symbols]
+
+
+@pytest.fixture
+def upstream(monkeypatch, sample_crypto_data):
+    """Replace the upstream services, counting the requests made to them."""
+    calls = {"crypto": 0, "securities": 0}
+
+    def collect_crypto(symbols):
+        calls["crypto"] += 1
+        # like coinmarketcap, an unknown symbol fails the whole request
+        if set(symbols.split(",")) - set(sample_crypto_data):
+            return None
+        return {
+            symbol: data
+            for symbol, data in sample_crypto_data.items()
+            if symbol in symbols.split(",")
+        }
+
+    def collect_securities(assets, url=None, limiter=None):
+        calls["securities"] += 1
+        return [
+            securities_data.record(asset, {"c": 10.0 + i, "dp": 1.0 * i})
+            for i, asset in enumerate(assets)
+        ]
+
+    monkeypatch.setattr(crypto_data, "collect", collect_crypto)
+    monkeypatch.setattr(securities_data, "collect", collect_securities)
+    monkeypatch.setattr(quotes.settings_local, "CRYPTO_SYMBOLS", "BTC,ETH,IMX")
+    return calls
+
+
+def test_refresh(upstream):
+    counts = quotes.refresh()
+    assert counts == {"crypto": 3, "security": len(securities_data.asset_list)}
+    assert upstream == {"crypto": 1, "securities": 1}
+
+    # a second refresh replaces the quotes rather than adding more
+    quotes.refresh()
+    assert Quote.objects.filter(kind=Quote.CRYPTO).count() == 3
+
+
+def test_refresh_positions(user, upstream):
+    Position.objects.create(
+        user=user, kind=Quote.CRYPTO, symbol="MATIC", quantity=10, cost=5
+    )
+    quotes.store(Quote.CRYPTO, [{"symbol": "MATIC", "price": 0.5}])
+
+    # a symbol only held in a portfolio is refreshed like a watched one
+    counts = quotes.refresh([Quote.CRYPTO])
+    assert counts == {"crypto": 4}
+    matic = Quote.objects.get(kind=Quote.CRYPTO, symbol="MATIC")
+    assert matic.data["price"] != 0.5
+
+
+def test_refresh_keeps_failed_quotes(upstream, monkeypatch):
+    quotes.refresh()
+    monkeypatch.setattr(
+        securities_data,
+        "collect",
+        lambda assets, **kwargs: [
+            securities_data.record(asset, None) for asset in assets
+        ],
+    )
+    quotes.refresh()
+    records, fetched = quotes.load(Quote.SECURITY, assets(["GME"]))
+    assert records["GME"]["price"] == 10.0
+
+
+def test_load(upstream):
+    records, fetched = quotes.load(Quote.CRYPTO, assets(["BTC", "ETH"]))
+    assert set(records) == {"BTC", "ETH"}
+    assert fetched is not None
+
+    # the first load fetches the quotes missing from the store, later
+    # ones only read it
+    quotes.load(Quote.CRYPTO, assets(["BTC", "ETH"]))
+    assert upstream["crypto"] == 1
+
+
+def test_load_unquoted(upstream):
+    records, fetched = quotes.load(Quote.CRYPTO, assets(["BTC", "NOPE"]))
+    assert set(records) == {"BTC"}
+    calls = upstream["crypto"]
+
+    # a symbol upstream cannot quote is tried once, then left to the refresher
+    records, fetched = quotes.load(Quote.CRYPTO, assets(["BTC", "NOPE"]))
+    assert set(records) == {"BTC"}
+    assert upstream["crypto"] == calls
+
+    # and a stored quote is not spoiled by a later failure
+    quotes.store_unquoted(Quote.CRYPTO, ["BTC"])
+    assert Quote.objects.get(kind=Quote.CRYPTO, symbol="BTC").data is not None
+
+
+def test_views_sort_without_fetching(client, upstream):
+    quotes.refresh()
+
+    response = client.get("/crypto/")
+    assert response.context["data"][0]["symbol"] == "BTC"
+    response = client.get("/crypto/symbol")
+    assert response.context["data"][0]["symbol"] == "IMX"
+
+    response = client.get("/securities/percent_change")
+    data = response.context["data"]
+    assert data[0]["percent_change"] >= data[-1]["percent_change"]
+    response = client.get("/securities/")
+    assert response.context["data"][0]["name"] == "Gamestop"
+
+    assert upstream == {"crypto": 1, "securities": 1}
@@ -1,4 +1,5 @@
 import apps.finance.securities_data as securities_data
+from apps.finance.stub import QuoteServer
 
 
 def test_fetch():
@@ -28,3 +29,45 @@ def test_sort():
     sorted_data = securities_data.sort(data, "name")
     assert sorted_data[0]["name"] == "BBBY"
     assert sorted_data[-1]["name"] == "Vanguard Value"
+
+
+def test_collect_concurrently():
+    assets = securities_data.asset_list
+    with QuoteServer(delay=0.2) as server:
+        data = securities_data.collect(assets, server.url)
+        assert server.requests == len(assets)
+
+    # the requests overlap, rather than waiting on each other
+    assert server.peak > 1
+    assert [asset["symbol"] for asset in data] == [
+        asset["symbol"] for asset in assets
+    ]
+    assert data[0]["price"] == 10.0 + len(assets[0]["symbol"])
+
+
+def test_collect_leaves_assets_unchanged():
+    assets = [{"symbol": "GME", "exchange": "NYSE", "name": "Gamestop"}]
+    with QuoteServer(delay=0) as server:
+        data = securities_data.collect(assets, server.url)
+    assert "price" in data[0]
+    assert "price" not in assets[0]
+    assert data[0] is not assets[0]
+
+
+def test_collect_unreachable():
+    assets = [{"symbol": "GME", "exchange": "NYSE", "name": "Gamestop"}]
+    with QuoteServer(delay=0) as server:
+        url = server.url
+    data = securities_data.collect(assets, url)
+    assert data[0]["symbol"] == "GME"
+    assert data[0]["price"] is None
+
+
+def test_sort_missing_quotes_last():
+    data = [
+        {"name": "a", "percent_change": None},
+        {"name": "b", "percent_change": 1.0},
+        {"name": "c", "percent_change": 2.0},
+    ]
+    sorted_data = securities_data.sort(data, "percent_change")
+    assert [asset["name"] for asset in sorted_data] == ["c", "b", "a"]
@@ -0,0 +1,79 @@
+import array
+
+import numpy as np
+
+from apps.finance.valuation import DAY, Valuation, align, fill_forward
+
+
+def test_fill_forward():
+    nan = np.nan
+    matrix = np.array([[nan, 1.0], [2.0, nan], [nan, nan], [5.0, 6.0]])
+    filled = fill_forward(matrix)
+    assert np.isnan(filled[0, 0])
+    assert filled[1:, 0].tolist() == [2.0, 2.0, 5.0]
+    assert filled[:, 1].tolist() == [1.0, 1.0, 1.0, 6.0]
+
+
+def daily(days, prices):
+    return array.array("q", [day * DAY for day in days]), array.array("d", prices)
+
+
+def test_align():
+    series = {
+        "A": daily([2, 4, 9], [10, 12, 99]),
+        "B": daily([0, 1, 2], [6, 7, 8]),
+    }
+    days, prices = align(series, ["A", "B", "C"], 2 * DAY, 6 * DAY)
+    assert (days // DAY).tolist() == [2, 3, 4, 5]
+
+    # carried over missing days, and not past the end of the grid
+    assert prices[:, 0].tolist() == [10, 10, 12, 12]
+    # the price on the first day replaces those before it
+    assert prices[:, 1].tolist() == [8, 8, 8, 8]
+    assert np.isnan(prices[:, 2]).all()
+
+
+def test_valuation():
+    prices = np.array([[10.0, 4.0], [11.0, 5.0], [12.0, 8.0]])
+    valuation = Valuation(
+        quantities=np.array([1.0, 2.0, 3.0]),
+        costs=np.array([5.0, 30.0, 0.0]),
+        columns=np.array([0, 0, 1]),
+        latest=np.array([12.0, 8.0]),
+        previous=np.array([11.0, 5.0]),
+        prices=prices,
+    )
+
+    assert valuation.market_value.tolist() == [12.0, 24.0, 24.0]
+    assert valuation.gain.tolist() == [7.0, -6.0, 24.0]
+    assert valuation.returns[:2].tolist() == [1.4, -0.2]
+    assert np.isnan(valuation.returns[2])
+    assert valuation.daily_pnl.tolist() == [1.0, 2.0, 9.0]
+    assert valuation.weights.tolist() == [0.2, 0.4, 0.4]
+
+    # both positions in the first symbol add up, 3 units each day
+    assert valuation.history.tolist() == [42.0, 48.0, 60.0]
+    assert valuation.period_return(2) == 60 / 42 - 1
+    assert valuation.period_return(3) is None
+
+    assert valuation.totals() == {
+        "market_value": 60.0,
+        "cost_basis": 35.0,
+        "gain": 25.0,
+        "returns": 25 / 35,
+        "daily_pnl": 12.0,
+    }
+
+
+def test_valuation_without_prices():
+    valuation = Valuation(
+        quantities=np.array([1.0, 2.0]),
+        costs=np.array([5.0, 10.0]),
+        columns=np.array([0, 1]),
+        latest=np.array([6.0, np.nan]),
+        previous=np.array([5.0, np.nan]),
+    )
+    assert np.isnan(valuation.market_value[1])
+    assert valuation.weights[0] == 1.0
+    assert valuation.totals()["cost_basis"] == 5.0
+    assert valuation.history is None
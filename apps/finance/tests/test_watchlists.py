@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import apps.finance.crypto_data as crypto_data
+import apps.finance.securities_data as securities_data
+from accounts.models import CustomUser
+from apps.finance import quotes
+from apps.finance.models import Position, Quote, WatchlistItem
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Replace the upstream services with ones that quote any symbol but "BAD".
+
+    Like coinmarketcap, the crypto service fails a whole request that has
+    an unknown symbol in it.
+
+    """
+    calls = {"crypto": [], "securities": []}
+    lock = threading.Lock()
+
+    def collect_crypto(symbols):
+        calls["crypto"].append(symbols)
+        if "BAD" in symbols.split(","):
+            return None
+        return {
+            symbol: {
+                "name": symbol.title(),
+                "slug": symbol.lower(),
+                "quote": {"USD": {"price": 1.0, "market_cap": 1e9}},
+            }
+            for symbol in symbols.split(",")
+        }
+
+    def fetch(symbol, url=None):
+        with lock:
+            calls["securities"].append(symbol)
+        if symbol == "BAD":
+            raise requests.HTTPError
+        return {"c": 10.0, "d": 0.1, "dp": 1.0, "h": 11, "l": 9, "o": 10, "pc": 9.9}
+
+    monkeypatch.setattr(crypto_data, "collect", collect_crypto)
+    monkeypatch.setattr(securities_data, "fetch", fetch)
+    monkeypatch.setattr(securities_data, "limiter", None)
+    monkeypatch.setattr(quotes.settings_local, "CRYPTO_SYMBOLS", "BTC,ETH")
+    return calls
+
+
+def test_watch(user, upstream):
+    # a user starts with the default assets
+    symbols = [a["symbol"] for a in quotes.watchlist(user, Quote.CRYPTO)]
+    assert symbols == ["BTC", "ETH"]
+
+    asset = {"symbol": "ADA", "name": "", "exchange": ""}
+    assert quotes.watch(user, Quote.CRYPTO, asset)
+    symbols = [a["symbol"] for a in quotes.watchlist(user, Quote.CRYPTO)]
+    assert symbols == ["ADA", "BTC", "ETH"]
+    assert Quote.objects.filter(kind=Quote.CRYPTO, symbol="ADA").exists()
+
+    quotes.unwatch(user, Quote.CRYPTO, "BTC")
+    symbols = [a["symbol"] for a in quotes.watchlist(user, Quote.CRYPTO)]
+    assert symbols == ["ADA", "ETH"]
+
+
+def test_watch_unknown_symbol(user, upstream):
+    asset = {"symbol": "BAD", "name": "", "exchange": ""}
+    assert not quotes.watch(user, Quote.CRYPTO, asset)
+    assert not quotes.watch(user, Quote.SECURITY, asset)
+    assert not WatchlistItem.objects.exists()
+
+
+def test_position_unknown_symbol(client, user, upstream):
+    position = {"kind": "crypto", "symbol": "bad", "quantity": "1", "cost": "5"}
+    client.post("/positions/add", position)
+    assert not Position.objects.exists()
+
+    client.post("/positions/add", {**position, "symbol": "ada"})
+    assert Position.objects.get().symbol == "ADA"
+
+    # a position that was never quoted is left out of the refresh, once the
+    # positions page has found it cannot be quoted
+    Position.objects.create(user=user, kind="crypto", symbol="BAD", quantity=1, cost=5)
+    client.get("/positions/")
+    symbols = [asset["symbol"] for asset in quotes.watched(Quote.CRYPTO)]
+    assert symbols == ["BTC", "ETH", "ADA"]
+
+
+def test_views(client, upstream):
+    data = {"symbol": "aapl", "name": "Apple"}
+    response = client.post("/watchlist/security/add", data)
+    assert response.status_code == 302
+
+    response = client.get("/securities/")
+    symbols = [asset["symbol"] for asset in response.context["data"]]
+    assert "AAPL" in symbols
+    assert len(symbols) == len(securities_data.asset_list) + 1
+
+    client.post("/watchlist/security/AAPL/remove")
+    response = client.get("/securities/")
+    assert "AAPL" not in [asset["symbol"] for asset in response.context["data"]]
+
+    response = client.post("/watchlist/bonds/add", {"symbol": "X"})
+    assert response.status_code == 404
+    response = client.get("/watchlist/security/add")
+    assert response.status_code == 405
+
+
+def test_refresh_merges_watchlists(upstream):
+    users = CustomUser.objects.bulk_create(
+        [CustomUser(username=f"user{i}") for i in range(500)]
+    )
+    items = []
+    for i, user in enumerate(users):
+        for j in (0, 7, 13):
+            crypto = f"C{(i + j) % 150}"
+            security = f"S{(i + j) % 30}"
+            items.append(WatchlistItem(user=user, kind=Quote.CRYPTO, symbol=crypto))
+            items.append(WatchlistItem(user=user, kind=Quote.SECURITY, symbol=security))
+    WatchlistItem.objects.bulk_create(items)
+
+    counts = quotes.refresh()
+
+    # 150 watched and 2 default crypto symbols, in batches of 100
+    assert len(upstream["crypto"]) == 2
+    assert counts[Quote.CRYPTO] == 152
+
+    # one request per distinct security, defaults included
+    distinct = 30 + len(securities_data.asset_list)
+    assert sorted(upstream["securities"]) == sorted(set(upstream["securities"]))
+    assert len(upstream["securities"]) == distinct
+    assert counts[Quote.SECURITY] == distinct
+
+    # each user's page reads only their own symbols
+    watchlist = quotes.watchlist(users[0], Quote.SECURITY)
+    records, fetched = quotes.load(Quote.SECURITY, watchlist)
+    assert set(records) == {"S0", "S7", "S13"}
+
+
+def test_refresh_bad_symbol(user, upstream):
+    # e.g. symbols that were delisted after they were watched or bought
+    WatchlistItem.objects.create(user=user, kind=Quote.CRYPTO, symbol="BAD")
+    Position.objects.create(user=user, kind="crypto", symbol="BAD", quantity=1, cost=5)
+    Position.objects.create(user=user, kind="crypto", symbol="ADA", quantity=1, cost=5)
+
+    counts = quotes.refresh([Quote.CRYPTO])
+
+    # the failed batch is split until the bad symbol is on its own
+    assert counts == {"crypto": 3}
+    assert ["BAD"] in [batch.split(",") for batch in upstream["crypto"]]
+    stored = Quote.objects.filter(kind=Quote.CRYPTO).values_list("symbol", flat=True)
+    assert set(stored) == {"ADA", "BTC", "ETH"}
+
+
+def test_rate_limiter():
+    limiter = securities_data.RateLimiter(10, 1, burst=2)
+    start = time.monotonic()
+    for i in range(6):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    # two calls go at once, the other four are spaced a tenth of a second apart
+    assert 0.35 < elapsed < 0.6
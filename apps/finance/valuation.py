@@ -0,0 +1,161 @@
+import numpy as np
+
+# seconds in a day, the interval of the price grid
+DAY = 86400
+
+
+def fill_forward(matrix, axis=0):
+    """Replace each missing price with the last known price before it.
+
+    Args:
+        matrix (ndarray): prices, e.g. one row per day and one column per
+            symbol, with nan where a price is missing
+        axis (int): the axis along which time runs
+
+    Returns:
+        matrix (ndarray): a filled copy, still nan before a symbol's first price
+
+    """
+
+    shape = [1] * matrix.ndim
+    shape[axis] = -1
+    index = np.arange(matrix.shape[axis]).reshape(shape)
+    last = np.where(np.isnan(matrix), 0, index)
+    np.maximum.accumulate(last, axis=axis, out=last)
+    return np.take_along_axis(matrix, last, axis=axis)
+
+
+def align(series, symbols, start, end):
+    """Lay daily price series on a common grid, one column per symbol.
+
+    Args:
+        series (dict): (times, prices) arrays keyed by symbol, ascending, as
+            returned by history.query at the "1d" resolution
+        symbols (list): the symbols, in column order
+        start (int): the first day, in seconds since the epoch
+        end (int): the end of the grid, which is excluded
+
+    Returns:
+        days (ndarray): the start of each day, in seconds since the epoch
+        prices (ndarray): the price of each symbol on each day, carried
+            forward over days without one, e.g. weekends
+
+    """
+
+    days = np.arange(start - start % DAY, end, DAY, dtype=np.int64)
+
+    # filled a row per symbol, so that each symbol's prices are written to
+    # contiguous memory, and transposed at the end
+    grid = np.full((len(symbols), len(days)), np.nan)
+
+    found = [
+        (column, series[symbol])
+        for column, symbol in enumerate(symbols)
+        if symbol in series and len(series[symbol][0])
+    ]
+    if found and len(days):
+        counts = [len(times) for column, (times, values) in found]
+        columns = np.repeat([column for column, pair in found], counts)
+        times = np.concatenate([np.asarray(t, dtype=np.int64) for c, (t, v) in found])
+        values = np.concatenate([np.asarray(v, dtype=float) for c, (t, v) in found])
+
+        # prices before the grid land on its first day, and of several prices
+        # for one cell the last assigned, which is the latest, is kept
+        rows = np.maximum((times - days[0]) // DAY, 0)
+        inside = rows < len(days)
+        cells = columns[inside] * len(days) + rows[inside]
+        grid.ravel()[cells] = values[inside]
+
+    return days, fill_forward(grid, axis=1).T
+
+
+class Valuation:
+    """The value of a set of positions, computed for all of them at once.
+
+    Attributes:
+        market_value (ndarray): the value of each position at the latest price
+        cost_basis (ndarray): what was paid for each position
+        gain (ndarray): the unrealized gain of each position
+        returns (ndarray): the gain as a fraction of the cost basis
+        daily_pnl (ndarray): the change in value since the previous close
+        weights (ndarray): each position's share of the total market value
+        history (ndarray): the total value of the positions on each day of
+            the price grid, or None without price history
+        daily_returns (ndarray): the day over day return of that total
+
+    Notes:
+        Positions without a latest price have nan values, which the totals
+        leave out.
+
+    """
+
+    def __init__(self, quantities, costs, columns, latest, previous, prices=None):
+        """Value the positions.
+
+        Args:
+            quantities (ndarray): the units held in each position
+            costs (ndarray): the total cost of each position
+            columns (ndarray): the index of each position's symbol in the
+                price arrays
+            latest (ndarray): the latest price of each symbol
+            previous (ndarray): the previous close of each symbol
+            prices (ndarray): daily prices from "align", or None
+
+        """
+
+        price = latest[columns]
+        self.market_value = quantities * price
+        self.cost_basis = costs
+        self.gain = self.market_value - costs
+        self.daily_pnl = quantities * (price - previous[columns])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.returns = np.where(costs != 0, self.gain / costs, np.nan)
+            self.weights = self.market_value / np.nansum(self.market_value)
+
+        self.history = None
+        self.daily_returns = None
+        if prices is not None:
+            # the units held of each symbol, so that the history is one
+            # product of the price grid with a vector, however many
+            # positions share a symbol; a symbol adds nothing before its
+            # first price
+            held = np.bincount(columns, weights=quantities, minlength=prices.shape[1])
+            self.history = np.nan_to_num(prices) @ held
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.daily_returns = self.history[1:] / self.history[:-1] - 1
+
+    def totals(self):
+        """Sum the positions.
+
+        Returns:
+            totals (dict): the total market value, cost basis, gain and daily
+                P&L, and the total return
+
+        """
+
+        market_value = float(np.nansum(self.market_value))
+        priced = ~np.isnan(self.market_value)
+        cost_basis = float(self.cost_basis[priced].sum())
+        gain = market_value - cost_basis
+        return {
+            "market_value": market_value,
+            "cost_basis": cost_basis,
+            "gain": gain,
+            "returns": gain / cost_basis if cost_basis else None,
+            "daily_pnl": float(np.nansum(self.daily_pnl)),
+        }
+
+    def period_return(self, days):
+        """The return of the positions' total value over the last number of days.
+
+        Returns:
+            returns (float): the return, or None if the history is too short
+                or starts at zero
+
+        """
+
+        if self.history is None or len(self.history) <= days:
+            return None
+        start = self.history[-1 - days]
+        return float(self.history[-1] / start - 1) if start else None
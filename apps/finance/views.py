@@ -1,9 +1,18 @@
+from datetime import datetime, timezone
+
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
 
 import apps.finance.crypto_data as crypto_data
 import apps.finance.securities_data as securities_data
-from config import settings_local
+from apps.finance import history, portfolio, quotes
+from apps.finance.forms import PositionForm, WatchlistItemForm
+from apps.finance.models import Position, Quote
+
+# the page that shows each kind of asset
+PAGES = {Quote.CRYPTO: "crypto", Quote.SECURITY: "securities"}
 
 
 @login_required
@@ -13,16 +22,15 @@ def crypto(request, ord="market_cap"):
     Args:
     ord (str): the sort order for the list of assets,
 
-    """
-
-    # specify the list of assets to be viewed
-    symbols = settings_local.CRYPTO_SYMBOLS
+    Notes:
+        The quotes are read from the quote store, which the refresh_quotes
+        command keeps current, so re-sorting the page fetches nothing.
 
-    # collect data from remote service
-    data = crypto_data.collect(symbols)
+    """
 
-    # condense and sort the data
-    data = crypto_data.condense(data)
+    # read the condensed quotes of the assets on the user's watchlist
+    assets = quotes.watchlist(request.user, Quote.CRYPTO)
+    data, fetched = quotes.load(Quote.CRYPTO, assets)
 
     # sort the data according to the user indicated field
     # defaults to 'market cap', as specified above
@@ -32,6 +40,7 @@ def crypto(request, ord="market_cap"):
         "page": "crypto",
         "ord": ord,
         "data": data,
+        "fetched": fetched,
     }
     return render(request, "finance/crypto.html", context)
 
@@ -44,30 +53,160 @@ def securities(request, ord="name"):
         ord (int): the sort order for the list of assets,
             e.g. name, market cap, etc., with the default being name
 
+    Notes:
+        As with crypto, the quotes are read from the quote store.
+
     """
 
-    asset_list = securities_data.asset_list
-    data = securities_data.collect(asset_list)
-    data = securities_data.sort(data, ord)
+    assets = quotes.watchlist(request.user, Quote.SECURITY)
+    data, fetched = quotes.load(Quote.SECURITY, assets)
+    data = securities_data.sort(list(data.values()), ord)
 
     context = {
         "page": "securities",
         "ord": ord,
         "data": data,
+        "fetched": fetched,
     }
     return render(request, "finance/securities.html", context)
 
 
+@login_required
+@require_POST
+def watch(request, kind):
+    """Add an asset to the user's watchlist.
+
+    Args:
+        kind (str): "crypto" or "security"
+
+    """
+
+    if kind not in PAGES:
+        raise Http404("Record not found.")
+    form = WatchlistItemForm(request.POST)
+    if form.is_valid():
+        quotes.watch(request.user, kind, form.cleaned_data)
+    return redirect(PAGES[kind])
+
+
+@login_required
+@require_POST
+def unwatch(request, kind, symbol):
+    """Remove an asset from the user's watchlist.
+
+    Args:
+        kind (str): "crypto" or "security"
+        symbol (str): the asset's ticker symbol
+
+    """
+
+    if kind not in PAGES:
+        raise Http404("Record not found.")
+    quotes.unwatch(request.user, kind, symbol)
+    return redirect(PAGES[kind])
+
+
+@login_required
+def prices(request, kind, symbol):
+    """Return a symbol's price history as JSON, for charting.
+
+    Args:
+        kind (str): "crypto" or "security"
+        symbol (str): the asset's ticker symbol
+
+    Notes:
+        Takes the range as "start" and "end", in seconds since the epoch,
+        or as the number of "days" up to now, 30 by default, and optionally
+        a "resolution" of "1m", "1h" or "1d".
+
+    """
+
+    if kind not in PAGES:
+        raise Http404("Record not found.")
+
+    try:
+        now = datetime.now(timezone.utc)
+        end = int(request.GET.get("end") or now.timestamp())
+        start = request.GET.get("start")
+        if start:
+            start = int(start)
+        else:
+            start = end - int(float(request.GET.get("days") or 30) * 86400)
+        resolution, series = history.query(
+            kind,
+            [symbol],
+            datetime.fromtimestamp(start, timezone.utc),
+            datetime.fromtimestamp(end, timezone.utc),
+            request.GET.get("resolution") or None,
+        )
+    except (ValueError, OverflowError, OSError):
+        message = "Invalid range."
+        return JsonResponse({"status": "error", "message": message}, status=400)
+
+    times, prices = series.get(symbol, ([], []))
+    return JsonResponse(
+        {
+            "status": "ok",
+            "symbol": symbol,
+            "resolution": resolution,
+            "times": list(times),
+            "prices": list(prices),
+        }
+    )
+
+
 @login_required
 def positions(request):
-    """Retrieve and display positions in all assets.
+    """Display the user's positions, valued at the latest stored prices.
 
     Notes:
-        this function is currently unfinished and is not in active use
+        All positions are valued in one pass over arrays of quotes and daily
+        prices, see apps.finance.portfolio, so the page reads no quotes from
+        the upstream services per position.
 
     """
 
+    data, valuation = portfolio.value(request.user)
+
     context = {
         "page": "securities",
+        "data": data,
+        "totals": valuation.totals(),
+        "period_returns": [
+            (label, valuation.period_return(days))
+            for label, days in [("1 month", 30), ("1 year", 365), ("5 years", 1825)]
+        ],
+        "form": PositionForm(),
     }
     return render(request, "finance/positions.html", context)
+
+
+@login_required
+@require_POST
+def position_add(request):
+    """Add a position to the user's portfolio, if its symbol can be quoted."""
+
+    form = PositionForm(request.POST)
+    if form.is_valid():
+        position = form.save(commit=False)
+        asset = {"symbol": position.symbol, "name": "", "exchange": ""}
+        if quotes.quote(position.kind, asset):
+            position.user = request.user
+            position.save()
+    return redirect("positions")
+
+
+@login_required
+@require_POST
+def position_delete(request, id):
+    """Remove a position from the user's portfolio.
+
+    Args:
+        id (int): a Position instance id
+
+    """
+
+    deleted, by_model = Position.objects.filter(user=request.user, pk=id).delete()
+    if not deleted:
+        raise Http404("Record not found.")
+    return redirect("positions")
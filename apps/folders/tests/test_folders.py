@@ -3,6 +3,7 @@ from django.test.client import RequestFactory
 
 from apps.contacts.models import Folder
 from apps.folders.folders import get_task_folders
+from apps.home.movement import GAP
 
 pytestmark = pytest.mark.django_db
 
@@ -32,7 +33,8 @@ def test_home(client, folder):
     assert response.status_code == 302
     folder = Folder.objects.filter(pk=folder.id).get()
     assert folder.home_column == 5
-    assert folder.home_rank == 1
+    # the first folder in an empty column is ranked one gap from zero
+    assert folder.home_rank == GAP
 
 
 def test_select_folder(client, folders):
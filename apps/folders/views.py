@@ -4,6 +4,7 @@ from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 
 from apps.folders.models import Folder
+from apps.home.movement import insert_folder
 
 
 @login_required
@@ -104,31 +105,13 @@ def home(request, id, page):
 
     if not home_folder.home_column:
 
-        destination_column = 5
-
-        # sequence destination column
-        # make sure the folders are sequential and adjacent
-        folders = Folder.objects.filter(
-            user=user, home_column=destination_column)
-        folders = folders.order_by("home_rank")
-        count = 1
-        for folder in folders:
-            folder.home_rank = count
-            folder.save()
-            count += 1
-
-        # increment all up by one
-        for folder in folders:
-            folder.home_rank = folder.home_rank + 1
-            folder.save()
-
-        home_folder.home_column = destination_column
-        home_folder.home_rank = 1
+        # place the folder at the top of the last column
+        insert_folder(user, home_folder, 5)
 
     else:
 
         home_folder.home_rank = 0
         home_folder.home_column = 0
+        home_folder.save()
 
-    home_folder.save()
     return redirect(page)
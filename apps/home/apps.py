@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HomeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.home"
+
+    def ready(self):
+        import apps.home.checks  # noqa: F401
+        import apps.home.signals  # noqa: F401
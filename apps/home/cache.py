@@ -0,0 +1,137 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from apps.home.loader import get_columns, get_task_folders
+
+# rendered fragments are keyed by the user's data version, so they never need
+# to be deleted; a new version simply makes the old entries unreachable, in
+# every worker process as long as the default cache is shared by them, see
+# CACHES in config.settings
+TIMEOUT = 60 * 60 * 24
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def version_key(user_id):
+    return f"home:version:{user_id}"
+
+
+def fragment_key(user_id, name, version):
+    return f"home:{name}:{user_id}:{version}"
+
+
+def get_version(user_id):
+    """Get the user's home page data version.
+
+    Args:
+        user_id (int): a CustomUser instance id
+
+    Returns:
+        version (int): the current data version
+
+    Notes:
+        If the version has never been set, or has been evicted from the cache,
+        it is seeded with the current time, so that it can never collide with
+        a version under which older fragments were stored.
+
+    """
+
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate the user's cached home page fragments.
+
+    Args:
+        user_id (int): a CustomUser instance id
+
+    """
+
+    key = version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_fragment(user_id, name, build):
+    """Return a rendered fragment from the cache, rendering it if needed.
+
+    Args:
+        user_id (int): a CustomUser instance id
+        name (str): the name of the fragment, e.g. "favorites"
+        build (callable): renders the fragment on a cache miss
+
+    Returns:
+        html (str): the rendered fragment
+
+    """
+
+    key = fragment_key(user_id, name, get_version(user_id))
+    html = cache.get(key)
+
+    if html is None:
+        _count("misses")
+        html = build()
+        cache.set(key, html, TIMEOUT)
+    else:
+        _count("hits")
+
+    return mark_safe(html)
+
+
+def favorites_fragment(user):
+    """Render the favorites columns for the home page."""
+
+    def build():
+        context = {"columns": get_columns(user)}
+        return render_to_string("home/favorites.html", context)
+
+    return get_fragment(user.id, "favorites", build)
+
+
+def tasks_fragment(user):
+    """Render the pending tasks card for the home page.
+
+    Notes:
+        Renders an empty string if none of the user's home task folders
+        contain open tasks.
+
+    """
+
+    def build():
+        task_folders = get_task_folders(user)
+        if not task_folders:
+            return ""
+        context = {"task_folders": task_folders, "origin": "home"}
+        return render_to_string("home/tasks.html", context)
+
+    return get_fragment(user.id, "tasks", build)
+
+
+def stats():
+    """Report the fragment cache hit and miss counts for this process."""
+
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def _count(outcome):
+    with _lock:
+        _stats[outcome] += 1
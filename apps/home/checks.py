@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# backends that keep their entries in each worker process
+PER_PROCESS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(deploy=True)
+def shared_cache(app_configs, **kwargs):
+    """Warn if the default cache is not shared by the worker processes.
+
+    Notes:
+        Writes bump the user's data version in the default cache, see
+        apps.home.cache. With a per-process cache the other workers never
+        see the new version, and keep serving the old fragments.
+
+    """
+
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PER_PROCESS:
+        return []
+    return [
+        Warning(
+            f"The default cache, {backend}, is not shared by worker processes.",
+            hint="Name a shared backend in CACHES, e.g. a DatabaseCache.",
+            id="home.W001",
+        )
+    ]
@@ -1,31 +1,48 @@
-import json
+import logging
+import threading
+import time
 from datetime import date, datetime, timedelta
 
-import google.oauth2.credentials
-from apiclient.discovery import build
+import httplib2
+from apiclient.errors import HttpError
 from dateutil.parser import parse
+from django.core.cache import cache
+from django.db import connection
 from django.shortcuts import get_object_or_404
+from google.auth.exceptions import GoogleAuthError
 
+from accounts.google import services
 from accounts.models import CustomUser
 
+logger = logging.getLogger(__name__)
+
+# events are considered fresh for five minutes,
+# and the last good copy is kept for a week in case Google is unavailable
+EVENTS_TTL = 60 * 5
+EVENTS_KEEP = 60 * 60 * 24 * 7
+
+FETCH_ERRORS = (HttpError, GoogleAuthError, httplib2.HttpLib2Error, OSError)
+
 
 def build_service(user_id):
     user = get_object_or_404(CustomUser, pk=user_id)
-    credentials = user.google_credentials
+    return services.get("calendar", user)
 
-    if credentials:
-        credentials = json.loads(credentials)
-        credentials = google.oauth2.credentials.Credentials.from_authorized_user_info(
-            credentials
-        )
-        service = build("calendar", "v3", credentials=credentials)
-        return service
-    else:
-        return False
 
+def fetch_events(user_id):
+    """Fetch the user's upcoming events from Google Calendar.
+
+    Args:
+        user_id (int): a CustomUser instance id
+
+    Returns:
+        events (list): the simplified events, or None if there are none
+
+    """
 
-def get_events(user_id):
     service = build_service(user_id)
+    if not service:
+        return None
 
     now = datetime.utcnow().isoformat() + "Z"  # 'Z' indicates UTC time
     events_result = (
@@ -41,6 +58,20 @@ def get_events(user_id):
     )
     events = events_result.get("items", [])
 
+    return simplify(events)
+
+
+def simplify(events):
+    """Extract the dates, times and summaries needed for the home page.
+
+    Args:
+        events (list): events as returned by the Google Calendar API
+
+    Returns:
+        events_simplified (list): a list of dicts, or None if there are no events
+
+    """
+
     if events:
         events_simplified = []
 
@@ -80,3 +111,93 @@ def get_events(user_id):
 
     else:
         return None
+
+
+def events_key(user_id):
+    return f"home:events:{user_id}"
+
+
+def refresh_events(user_id):
+    """Fetch the user's events and store them in the cache.
+
+    Args:
+        user_id (int): a CustomUser instance id
+
+    Returns:
+        events (list): the simplified events, or None if there are none
+
+    Raises:
+        Any of FETCH_ERRORS if Google cannot be reached or rejects the request
+
+    """
+
+    events = fetch_events(user_id)
+    entry = {"events": events, "fetched": time.time()}
+    cache.set(events_key(user_id), entry, EVENTS_KEEP)
+    return events
+
+
+def refresh_in_background(user_id):
+    """Refresh the user's cached events on a separate thread.
+
+    Notes:
+        A short-lived lock in the cache ensures that only one refresh per user
+        is in flight at a time. The lock, like the events, is shared by the
+        worker processes only if the default cache is, see CACHES in
+        config.settings; with a per-process cache each worker may refresh
+        once. If the refresh fails, the previous copy of the events remains
+        in the cache.
+
+    """
+
+    lock = f"{events_key(user_id)}:refreshing"
+    if not cache.add(lock, 1, EVENTS_TTL):
+        return
+
+    def run():
+        try:
+            refresh_events(user_id)
+        except FETCH_ERRORS:
+            logger.warning("Unable to refresh events for user %s", user_id, exc_info=True)
+        finally:
+            cache.delete(lock)
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_events(user_id):
+    """Get the user's upcoming events, preferably from the cache.
+
+    Args:
+        user_id (int): a CustomUser instance id
+
+    Returns:
+        events (list): the simplified events, or None if there are none
+
+    Notes:
+        Events younger than EVENTS_TTL are served from the cache. Older events
+        are still served, while a fresh copy is fetched in the background.
+        Only when nothing is cached does the request wait for Google, and if
+        Google fails then, no events are shown rather than an error.
+
+    """
+
+    entry = cache.get(events_key(user_id))
+
+    if entry is None:
+        try:
+            return refresh_events(user_id)
+        except FETCH_ERRORS:
+            logger.warning("Unable to fetch events for user %s", user_id, exc_info=True)
+            return None
+
+    if time.time() - entry["fetched"] > EVENTS_TTL:
+        refresh_in_background(user_id)
+
+    return entry["events"]
+
+
+def clear_events(user_id):
+    """Discard the user's cached events, e.g. when their Google account changes."""
+    cache.delete(events_key(user_id))
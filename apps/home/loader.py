@@ -0,0 +1,70 @@
+from django.db.models import Prefetch
+
+from apps.favorites.models import Favorite
+from apps.folders.models import Folder
+from apps.tasks.models import Task
+
+
+def get_columns(user, numbers=range(1, 6)):
+    """Load the favorites columns for the home page.
+
+    Args:
+        user : a request customuser
+        numbers (iterable): the columns to load, by default all five
+
+    Returns:
+        columns (list): five lists of folders, one per home column, with each
+            folder's home favorites attached as "folder.favorites"; columns
+            that were not requested are left empty
+
+    Notes:
+        Runs two queries regardless of the number of folders: one for the
+        folders in the columns, and one for the favorites of those folders.
+
+    """
+
+    favorites = Favorite.objects.filter(home_rank__gt=0).order_by("home_rank")
+
+    folders = Folder.objects.filter(
+        user=user, page="favorites", home_column__in=list(numbers)
+    )
+    folders = folders.order_by("home_column", "home_rank")
+    folders = folders.prefetch_related(
+        Prefetch("favorite_set", queryset=favorites, to_attr="favorites")
+    )
+
+    columns = [[] for i in range(5)]
+    for folder in folders:
+        columns[folder.home_column - 1].append(folder)
+
+    return columns
+
+
+def get_task_folders(user):
+    """Load the task folders shown on the home page.
+
+    Args:
+        user : a request customuser
+
+    Returns:
+        task_folders (list): the user's home task folders that contain at
+            least one open task, with those tasks attached as "folder.tasks"
+
+    Notes:
+        Runs two queries regardless of the number of folders: one for the
+        folders and one for the open tasks within them.
+
+    """
+
+    tasks = Task.objects.exclude(status=1).order_by("status", "title")
+
+    folders = Folder.objects.filter(user=user, page="tasks", home_column__gt=1)
+    folders = folders.order_by("name")
+    folders = folders.prefetch_related(
+        Prefetch("task_set", queryset=tasks, to_attr="tasks")
+    )
+
+    # eliminate folders with no open tasks
+    task_folders = [folder for folder in folders if folder.tasks]
+
+    return task_folders
@@ -1,12 +1,282 @@
+from django.db import transaction
+from django.db.models import F
+
+from apps.favorites.models import Favorite
 from apps.folders.models import Folder
+from apps.home.cache import bump_version
+
+# Home ranks are sparse: compacted rows are spaced GAP apart, so a folder can
+# be placed above another one without renumbering the rest of its column.
+# Ranks only need to be ordered, never adjacent, and the smallest rank is 1.
+GAP = 1024
+
+
+def lock(queryset):
+    """Lock a set of rows until the end of the transaction and list them in rank order.
+
+    Notes:
+        Locking serializes concurrent moves in the same column or folder,
+        e.g. from two browser tabs, so they cannot produce duplicate ranks.
+
+    """
+    queryset = queryset.select_for_update()
+    return list(queryset.order_by(F("home_rank").asc(nulls_last=True), "id"))
+
+
+def exhausted(rows):
+    """Check whether a list of locked rows lacks distinct, ordered ranks."""
+    ranks = [row.home_rank for row in rows]
+    if None in ranks:
+        return True
+    return any(a >= b for a, b in zip(ranks, ranks[1:]))
+
+
+def compact(rows):
+    """Spread the ranks of a list of locked rows GAP apart, in one statement.
+
+    Notes:
+        This is the only operation that writes a whole column, and it runs
+        only once the gaps between ranks have been used up.
+
+    """
+    for i, row in enumerate(rows, 1):
+        row.home_rank = i * GAP
+    if rows:
+        type(rows[0]).objects.bulk_update(rows, ["home_rank"])
+
+
+def swap(rows, row, offset):
+    """Swap a row with a neighbour in a list of locked rows.
+
+    Args:
+        rows (list): rows as returned by lock
+        row (Model): the row to be moved, which is given its current rank
+        offset (int): -1 to move the row up, 1 to move it down
+
+    Returns:
+        displaced (Model): the neighbour that was swapped, or None if the
+            row is already at the top or bottom of the list, or not in it
+
+    Notes:
+        Writes two rows in one statement, unless the ranks must be compacted.
+
+    """
+
+    ids = [r.id for r in rows]
+    if row.id not in ids:
+        return None
+
+    if exhausted(rows):
+        compact(rows)
+
+    index = ids.index(row.id)
+    moved = rows[index]
+    row.home_rank = moved.home_rank
+
+    if not 0 <= index + offset < len(rows):
+        return None
+
+    displaced = rows[index + offset]
+    moved.home_rank, displaced.home_rank = displaced.home_rank, moved.home_rank
+    type(moved).objects.bulk_update([moved, displaced], ["home_rank"])
+    row.home_rank = moved.home_rank
+
+    return displaced
+
+
+def top_rank(rows):
+    """Find a rank above every row in a list of locked rows.
+
+    Args:
+        rows (list): rows as returned by lock, without the row being placed
+
+    Returns:
+        rank (int): the rank to be given to the new top row
+
+    Notes:
+        If the top row already has the smallest rank, it is moved down to the
+        middle of the gap below it, so at most one other row is written.
+        Only when that gap is used up as well is the list compacted.
+
+    """
+
+    if exhausted(rows):
+        compact(rows)
+
+    if not rows:
+        return GAP
+
+    top = rows[0]
+    if top.home_rank > 1:
+        return max(1, top.home_rank - GAP)
+
+    if len(rows) > 1:
+        below = rows[1].home_rank
+    else:
+        below = top.home_rank + 2 * GAP
+
+    if below - top.home_rank < 2:
+        compact(rows)
+        return max(1, top.home_rank - GAP)
+
+    top.home_rank = (top.home_rank + below) // 2
+    top.save(update_fields=["home_rank"])
+    return 1
+
+
+def home_folders(user, column, page="favorites"):
+    return Folder.objects.filter(user=user, page=page, home_column=column)
+
+
+@transaction.atomic
+def move_folder(user, folder, offset):
+    """Move a folder up or down within its home column.
+
+    Args:
+        user : a request customuser
+        folder (Folder): the folder to be moved
+        offset (int): -1 to move the folder up, 1 to move it down
+
+    Returns:
+        displaced (Folder): the folder it swapped places with, if any
+
+    """
+
+    if not folder.home_column:
+        return None
+
+    folders = lock(home_folders(user, folder.home_column, folder.page))
+    displaced = swap(folders, folder, offset)
+    changed(user)
+    return displaced
+
+
+@transaction.atomic
+def insert_folder(user, folder, column):
+    """Place a folder at the top of a home column.
+
+    Args:
+        user : a request customuser
+        folder (Folder): the folder to be placed, which is saved
+        column (int): the destination column
+
+    """
+
+    folders = lock(home_folders(user, column, folder.page).exclude(pk=folder.id))
+    folder.home_column = column
+    folder.home_rank = top_rank(folders)
+    folder.save(update_fields=["home_column", "home_rank"])
+    changed(user)
+
+
+@transaction.atomic
+def move_favorite(user, favorite, offset):
+    """Move a home favorite up or down within its folder.
+
+    Args:
+        user : a request customuser
+        favorite (Favorite): the favorite to be moved
+        offset (int): -1 to move the favorite up, 1 to move it down
+
+    Returns:
+        displaced (Favorite): the favorite it swapped places with, if any
+
+    """
+
+    favorites = Favorite.objects.filter(
+        user=user, folder_id=favorite.folder_id, home_rank__gt=0
+    )
+    displaced = swap(lock(favorites), favorite, offset)
+    changed(user)
+    return displaced
+
+
+@transaction.atomic
+def apply_layout(user, columns, favorites=None):
+    """Arrange all of a user's home folders, and optionally their favorites, at once.
+
+    Args:
+        user : a request customuser
+        columns (list): up to five lists of folder ids, one per home column,
+            each in top to bottom order
+        favorites (dict): lists of favorite ids in top to bottom order,
+            keyed by folder id
+
+    Returns:
+        written (int): the number of folders and favorites whose rank changed
+
+    Raises:
+        ValueError: if the layout does not list each of the user's home
+            folders exactly once, or a folder's home favorites exactly once
+
+    Notes:
+        Ranks are written compacted, GAP apart, with one statement
+        for the folders and one for the favorites.
+
+    """
+
+    if len(columns) > 5:
+        raise ValueError("The home page has five columns.")
 
-def sequence(user, column):
     folders = Folder.objects.filter(
-        user=user, page="favorites", home_column=column)
-    folders = folders.order_by("home_rank")
-    count = 1
-    for folder in folders:
-        folder.home_rank = count
-        folder.save()
-        count += 1
-    return folders
+        user=user, page="favorites", home_column__gte=1, home_column__lte=5
+    )
+    folders = {folder.id: folder for folder in lock(folders)}
+
+    ids = [id for column in columns for id in column]
+    if len(ids) != len(set(ids)) or set(ids) != set(folders):
+        raise ValueError("The layout must list each home folder once.")
+
+    written = []
+    for column, folder_ids in enumerate(columns, 1):
+        for rank, id in enumerate(folder_ids, 1):
+            folder = folders[id]
+            if (folder.home_column, folder.home_rank) != (column, rank * GAP):
+                folder.home_column = column
+                folder.home_rank = rank * GAP
+                written.append(folder)
+
+    if written:
+        Folder.objects.bulk_update(written, ["home_column", "home_rank"])
+
+    count = len(written)
+
+    if favorites:
+        if not set(favorites) <= set(folders):
+            raise ValueError("Favorites can only be arranged in home folders.")
+
+        rows = Favorite.objects.filter(
+            user=user, folder_id__in=list(favorites), home_rank__gt=0
+        )
+        rows = {favorite.id: favorite for favorite in lock(rows)}
+
+        written = []
+        for folder_id, favorite_ids in favorites.items():
+            listed = {id for id in rows if rows[id].folder_id == folder_id}
+            if len(favorite_ids) != len(listed) or set(favorite_ids) != listed:
+                raise ValueError("The layout must list each home favorite once.")
+
+            for rank, id in enumerate(favorite_ids, 1):
+                favorite = rows[id]
+                if favorite.home_rank != rank * GAP:
+                    favorite.home_rank = rank * GAP
+                    written.append(favorite)
+
+        if written:
+            Favorite.objects.bulk_update(written, ["home_rank"])
+
+        count += len(written)
+
+    changed(user)
+    return count
+
+
+def changed(user):
+    """Invalidate the user's cached home page once the transaction commits.
+
+    Notes:
+        Bulk updates do not send save signals, so the cache version
+        has to be bumped explicitly.
+
+    """
+    transaction.on_commit(lambda: bump_version(user.id))
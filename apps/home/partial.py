@@ -0,0 +1,75 @@
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+import apps.home.cache as home_cache
+import apps.home.google as google
+from apps.home.loader import get_columns
+from apps.home.toggle import show_section
+
+
+def is_partial(request):
+    """Check whether the client asked for a fragment rather than a redirect.
+
+    Notes:
+        Partial responses are requested with a "partial" query parameter,
+        or an "X-Partial" header.
+
+    """
+    return bool(request.GET.get("partial") or request.headers.get("X-Partial"))
+
+
+def columns_response(user, numbers, moved_folder=0):
+    """Render only the given home columns.
+
+    Args:
+        user : a request customuser
+        numbers (iterable): the columns to render
+        moved_folder (int): the folder whose controls are left visible
+
+    Returns:
+        response (HttpResponse): the columns, each with its "home-column-N" id,
+            so the client can swap them into the page
+
+    """
+
+    numbers = sorted({number for number in numbers if number in range(1, 6)})
+    columns = get_columns(user, numbers)
+
+    html = ""
+    for number in numbers:
+        context = {
+            "column": columns[number - 1],
+            "number": number,
+            "moved_folder": moved_folder,
+        }
+        html += render_to_string("home/column.html", context)
+
+    return HttpResponse(html)
+
+
+def section_response(user, section):
+    """Render a home page section after it has been toggled.
+
+    Args:
+        user : a request customuser
+        section (str): the toggled section, "events" or "tasks"
+
+    Returns:
+        response (HttpResponse): the section, or an empty response if the
+            section is now hidden or has nothing to show
+
+    """
+
+    if not show_section(user, section):
+        return HttpResponse("")
+
+    if section == "tasks":
+        return HttpResponse(home_cache.tasks_fragment(user))
+
+    if section == "events" and user.google_credentials:
+        events = google.get_events(user.id)
+        if events:
+            html = render_to_string("home/events.html", {"events": events})
+            return HttpResponse(html)
+
+    return HttpResponse("")
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.favorites.models import Favorite
+from apps.folders.models import Folder
+from apps.home.cache import bump_version
+from apps.tasks.models import Task
+
+
+@receiver(post_save, sender=Folder)
+@receiver(post_delete, sender=Folder)
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def item_changed(sender, instance, **kwargs):
+    """Invalidate the owner's cached home page when a folder or favorite changes."""
+    bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """Invalidate the cached home page of the task's author and folder owner.
+
+    Notes:
+        Task folders may be shared with editors, so the task's author
+        is not necessarily the user whose home page shows the task.
+
+    """
+    bump_version(instance.user_id)
+
+    if instance.folder_id:
+        owner_id = (
+            Folder.objects.filter(pk=instance.folder_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+        if owner_id and owner_id != instance.user_id:
+            bump_version(owner_id)
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from django.test import Client
 
 from accounts.models import CustomUser
@@ -6,6 +7,14 @@ from apps.favorites.models import Favorite
 from apps.folders.models import Folder
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # user ids are reused between tests, so cached fragments must not leak
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user():
     user = CustomUser.objects.create_user(
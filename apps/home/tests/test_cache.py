@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import apps.home.cache as home_cache
+from apps.favorites.models import Favorite
+from apps.folders.models import Folder
+from apps.home.checks import shared_cache
+from apps.tasks.models import Task
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+@pytest.fixture(autouse=True)
+def stats():
+    home_cache.reset_stats()
+
+
+def test_hit_after_miss(client, folders, favorites):
+    client.get("/home/")
+    assert home_cache.stats() == {"hits": 0, "misses": 2}
+    client.get("/home/")
+    assert home_cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_hit_skips_queries(client, folders, favorites):
+    client.get("/home/")
+    with CaptureQueriesContext(connection) as context:
+        client.get("/home/")
+    tables = ("app_folder", "app_favorite", "app_task")
+    for query in context.captured_queries:
+        assert not any(table in query["sql"] for table in tables)
+
+
+def test_favorite_save_invalidates(client, user, folders, favorites):
+    client.get("/home/")
+    Favorite.objects.create(user=user, folder=folders[0], name="Fresh", home_rank=6)
+    response = client.get("/home/")
+    assert b"Fresh" in response.content
+    # a write bumps the user's whole data version, so both fragments miss
+    assert home_cache.stats()["misses"] == 4
+
+
+def test_folder_delete_invalidates(client, folders, favorites):
+    response = client.get("/home/")
+    assert b"Swiss" in response.content
+    folders[17].delete()
+    response = client.get("/home/")
+    assert b"Swiss" not in response.content
+
+
+def test_task_save_invalidates(client, user):
+    folder = Folder.objects.create(user=user, name="Chores", home_column=2, page="tasks")
+    response = client.get("/home/")
+    assert not response.context["some_tasks"]
+    Task.objects.create(user=user, folder=folder, title="Laundry")
+    response = client.get("/home/")
+    assert response.context["some_tasks"]
+    assert b"Laundry" in response.content
+
+
+def test_other_users_unaffected(user, folders):
+    version = home_cache.get_version(user.id)
+    home_cache.bump_version(user.id + 1)
+    assert home_cache.get_version(user.id) == version
+    folders[0].save()
+    assert home_cache.get_version(user.id) == version + 1
+
+
+def test_shared_cache_check(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    assert [warning.id for warning in shared_cache(None)] == ["home.W001"]
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "app_cache",
+        }
+    }
+    assert shared_cache(None) == []
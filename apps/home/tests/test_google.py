@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+import apps.home.google as google
+
+events = [
+    {
+        "start": {"dateTime": "2030-01-02T09:30:00-05:00"},
+        "summary": "Dentist",
+    },
+    {
+        "start": {"date": "2030-01-03"},
+        "summary": "Change water fountain filter",
+    },
+]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the Google API call with a counter of simplified results."""
+    calls = []
+
+    def fetch_events(user_id):
+        calls.append(user_id)
+        return google.simplify(events)
+
+    monkeypatch.setattr(google, "fetch_events", fetch_events)
+    return calls
+
+
+@pytest.fixture
+def synchronous(monkeypatch):
+    """Run background refreshes inline so their effects can be asserted."""
+
+    def refresh_in_background(user_id):
+        try:
+            google.refresh_events(user_id)
+        except google.FETCH_ERRORS:
+            pass
+
+    monkeypatch.setattr(google, "refresh_in_background", refresh_in_background)
+
+
+def test_simplify():
+    simplified = google.simplify(events)
+    assert len(simplified) == 1
+    assert simplified[0]["summary"] == "Dentist"
+    assert simplified[0]["time"] == "09:30 AM"
+    assert simplified[0]["weekday"] == "Wednesday"
+    assert simplified[0]["soon"] == ""
+
+
+def test_simplify_empty():
+    assert google.simplify([]) is None
+
+
+def test_cached_within_ttl(calls):
+    first = google.get_events(1)
+    second = google.get_events(1)
+    assert first == second
+    assert calls == [1]
+
+
+def test_stale_served_while_refreshing(calls, monkeypatch):
+    google.get_events(1)
+    entry = cache.get(google.events_key(1))
+    entry["fetched"] = time.time() - google.EVENTS_TTL - 1
+    entry["events"] = [{"summary": "Stale"}]
+    cache.set(google.events_key(1), entry)
+
+    refreshed = []
+    monkeypatch.setattr(google, "refresh_in_background", refreshed.append)
+
+    assert google.get_events(1) == [{"summary": "Stale"}]
+    assert refreshed == [1]
+
+
+def test_error_keeps_last_good_copy(calls, synchronous, monkeypatch):
+    google.get_events(1)
+    entry = cache.get(google.events_key(1))
+    entry["fetched"] = time.time() - google.EVENTS_TTL - 1
+    cache.set(google.events_key(1), entry)
+
+    def fail(user_id):
+        raise OSError("unreachable")
+
+    monkeypatch.setattr(google, "fetch_events", fail)
+
+    assert google.get_events(1)[0]["summary"] == "Dentist"
+    assert google.get_events(1)[0]["summary"] == "Dentist"
+
+
+def test_error_without_copy(monkeypatch):
+    def fail(user_id):
+        raise OSError("unreachable")
+
+    monkeypatch.setattr(google, "fetch_events", fail)
+    assert google.get_events(1) is None
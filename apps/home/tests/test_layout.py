@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from apps.favorites.models import Favorite
+from apps.folders.models import Folder
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def post(client, data):
+    return client.post(
+        "/home/layout/", json.dumps(data), content_type="application/json"
+    )
+
+
+def names(column):
+    folders = Folder.objects.filter(home_column=column).order_by("home_rank")
+    return [folder.name for folder in folders]
+
+
+def layout(folders):
+    # reverse every column, and move the last column's folders to the first
+    columns = [[] for i in range(5)]
+    for folder in folders:
+        columns[folder.home_column - 1].insert(0, folder.id)
+    columns[0] = columns[4] + columns[0]
+    columns[4] = []
+    return columns
+
+
+def test_layout(client, folders, favorites):
+    data = {
+        "columns": layout(folders),
+        "favorites": {str(folders[0].id): [f.id for f in reversed(favorites)]},
+    }
+    response = post(client, data)
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+    assert names(1) == ["Swiss", "German", "Social", "Local", "Entertainment", "Main"]
+    assert names(3) == ["Math", "History", "Psych", "Philosophy"]
+    assert names(5) == []
+
+    ranked = Favorite.objects.filter(folder=folders[0]).order_by("home_rank")
+    assert [f.id for f in ranked] == [f.id for f in reversed(favorites)]
+
+
+def test_constant_queries(client, user, folders, django_assert_max_num_queries):
+    for i in range(60):
+        Folder.objects.create(
+            user=user, name=f"Extra {i}", home_column=i % 5 + 1,
+            home_rank=100 + i, page="favorites",
+        )
+    folders = Folder.objects.filter(page="favorites")
+
+    with django_assert_max_num_queries(10):
+        response = post(client, {"columns": layout(folders)})
+    assert response.json()["written"] == 78
+
+
+def test_incomplete_layout_rejected(client, folders):
+    columns = layout(folders)
+    columns[1].pop()
+    response = post(client, {"columns": columns})
+    assert response.status_code == 400
+    assert names(1) == ["Main", "Entertainment", "Local", "Social"]
+
+
+def test_unknown_folder_rejected(client, user, folders):
+    other = Folder.objects.create(user=user, name="Stranger", page="notes")
+    columns = layout(folders)
+    columns[0].append(other.id)
+    assert post(client, {"columns": columns}).status_code == 400
+
+
+def test_malformed(client, folders):
+    response = client.post("/home/layout/", "nonsense", content_type="application/json")
+    assert response.status_code == 400
+    assert client.get("/home/layout/").status_code == 405
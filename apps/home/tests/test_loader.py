@@ -0,0 +1,72 @@
+import pytest
+
+from apps.favorites.models import Favorite
+from apps.folders.models import Folder
+from apps.home.loader import get_columns, get_task_folders
+from apps.tasks.models import Task
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+@pytest.fixture
+def many_folders(user):
+    for i in range(40):
+        folder = Folder.objects.create(
+            user=user,
+            name=f"Folder {i}",
+            home_column=i % 5 + 1,
+            home_rank=i // 5 + 1,
+            page="favorites",
+        )
+        for j in range(1, 4):
+            Favorite.objects.create(
+                user=user, folder=folder, name=f"Favorite {i}.{j}", home_rank=j
+            )
+
+    for i in range(40):
+        folder = Folder.objects.create(
+            user=user, name=f"List {i}", home_column=2, page="tasks"
+        )
+        Task.objects.create(user=user, folder=folder, title=f"Task {i}", status=0)
+        Task.objects.create(user=user, folder=folder, title=f"Done {i}", status=1)
+
+
+def test_columns(user, folders, favorites):
+    columns = get_columns(user)
+    assert len(columns) == 5
+    assert [folder.name for folder in columns[0]] == [
+        "Main", "Entertainment", "Local", "Social"
+    ]
+    assert [favorite.home_rank for favorite in columns[0][0].favorites] == [
+        1, 2, 3, 4, 5
+    ]
+    assert columns[1][0].favorites == []
+
+
+def test_task_folders(user):
+    empty = Folder.objects.create(user=user, name="Empty", home_column=2, page="tasks")
+    full = Folder.objects.create(user=user, name="Full", home_column=2, page="tasks")
+    Task.objects.create(user=user, folder=empty, title="Done", status=1)
+    Task.objects.create(user=user, folder=full, title="Zebra", status=0)
+    Task.objects.create(user=user, folder=full, title="Apple", status=0)
+
+    task_folders = get_task_folders(user)
+    assert task_folders == [full]
+    assert [task.title for task in task_folders[0].tasks] == ["Apple", "Zebra"]
+
+
+def test_columns_query_count(user, many_folders, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        get_columns(user)
+
+
+def test_task_folders_query_count(user, many_folders, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        get_task_folders(user)
+
+
+def test_index_query_count(client, many_folders, django_assert_max_num_queries):
+    with django_assert_max_num_queries(12):
+        response = client.get("/home/")
+    assert response.context["some_tasks"]
+    assert response.content.count(b"task-list-title") == 40
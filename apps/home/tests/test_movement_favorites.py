@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from apps.favorites.models import Favorite
 
@@ -31,3 +33,13 @@ def test_favorite_down_from_top(client, favorites):
     assert favorite.home_rank == 2
     favorite = Favorite.objects.get(pk=favorites[1].id)
     assert favorite.home_rank == 1
+
+
+def test_favorite_up_single_update(client, favorites):
+    with CaptureQueriesContext(connection) as context:
+        client.get(f"/home/favorite/{favorites[4].id}/up/")
+    updates = [
+        query for query in context.captured_queries
+        if query["sql"].startswith("UPDATE") and "app_favorite" in query["sql"]
+    ]
+    assert len(updates) == 1
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from apps.folders.models import Folder
 
@@ -90,3 +92,74 @@ def test_right_from_far_right(client, folders):
     client.get(f"/home/folder/{folders[16].id}/right/")
     folder = Folder.objects.get(pk=folders[16].id)
     assert folder.home_column == 5
+
+
+def snapshot():
+    return {
+        folder.id: (folder.home_column, folder.home_rank)
+        for folder in Folder.objects.all()
+    }
+
+
+def rows_written(before):
+    after = snapshot()
+    return [id for id in after if after[id] != before[id]]
+
+
+def ranks(column):
+    folders = Folder.objects.filter(home_column=column).order_by("home_rank")
+    return [folder.name for folder in folders]
+
+
+def folder_updates(context):
+    return [
+        query for query in context.captured_queries
+        if query["sql"].startswith("UPDATE") and "app_folder" in query["sql"]
+    ]
+
+
+def test_up_single_update(client, folders):
+    before = snapshot()
+    with CaptureQueriesContext(connection) as context:
+        client.get(f"/home/folder/{folders[3].id}/up/")
+    assert len(folder_updates(context)) == 1
+    assert len(rows_written(before)) == 2
+
+
+def test_left_compacts_when_gaps_exhausted(client, folders):
+    # the fixture ranks are dense, so the destination column is compacted
+    client.get(f"/home/folder/{folders[5].id}/left/")
+    assert ranks(1) == ["Research", "Main", "Entertainment", "Local", "Social"]
+    assert ranks(2) == ["Dev", "Filing", "Food"]
+
+
+def test_left_writes_at_most_two_rows(client, folders):
+    client.get(f"/home/folder/{folders[5].id}/left/")
+    for folder in folders[6:8]:
+        before = snapshot()
+        client.get(f"/home/folder/{folder.id}/left/")
+        assert len(rows_written(before)) <= 2
+    assert ranks(1) == [
+        "Food", "Filing", "Research", "Main", "Entertainment", "Local", "Social"
+    ]
+
+
+def test_right_then_up_and_down(client, folders):
+    client.get(f"/home/folder/{folders[0].id}/right/")
+    client.get(f"/home/folder/{folders[1].id}/right/")
+    before = snapshot()
+    client.get(f"/home/folder/{folders[0].id}/up/")
+    assert len(rows_written(before)) == 2
+    before = snapshot()
+    client.get(f"/home/folder/{folders[0].id}/down/")
+    assert len(rows_written(before)) == 2
+    assert ranks(2) == ["Entertainment", "Main", "Dev", "Research", "Filing", "Food"]
+    assert ranks(1) == ["Local", "Social"]
+
+
+def test_many_moves_stay_ordered(client, folders):
+    for i in range(20):
+        client.get(f"/home/folder/{folders[4 + i % 4].id}/left/")
+        client.get(f"/home/folder/{folders[4 + i % 4].id}/right/")
+    ranks = [folder.home_rank for folder in Folder.objects.filter(home_column=2)]
+    assert len(set(ranks)) == len(ranks) == 4
@@ -0,0 +1,61 @@
+import pytest
+
+from apps.folders.models import Folder
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def test_folder_up_renders_column(client, folders):
+    response = client.get(f"/home/folder/{folders[3].id}/up/?partial=1")
+    assert response.status_code == 200
+    html = response.content.decode()
+    assert html.count('class="col home-column"') == 1
+    assert 'id="home-column-1"' in html
+    assert html.index("Social") < html.index("Local")
+    assert "Dev" not in html
+
+
+def test_folder_left_renders_both_columns(client, folders):
+    response = client.get(
+        f"/home/folder/{folders[5].id}/left/", HTTP_X_PARTIAL="1"
+    )
+    html = response.content.decode()
+    assert 'id="home-column-1"' in html
+    assert 'id="home-column-2"' in html
+    assert 'id="home-column-3"' not in html
+
+
+def test_moved_folder_highlighted(client, folders):
+    response = client.get(f"/home/folder/{folders[3].id}/up/?partial=1")
+    html = response.content.decode()
+    assert f'folder-{folders[3].id}"\n        style="display: flex;"' in html
+    assert f'folder-{folders[2].id}"\n        style="display: none;"' in html
+    assert not client.session.get("moved_folder")
+
+
+def test_favorite_renders_column(client, folders, favorites):
+    response = client.get(f"/home/favorite/{favorites[4].id}/up/?partial=1")
+    html = response.content.decode()
+    assert 'id="home-column-1"' in html
+    assert html.index("Favorite No. 5") < html.index("Favorite No. 4")
+
+
+def test_partial_skips_other_columns(client, folders):
+    Folder.objects.create(
+        user=folders[0].user, name="Elsewhere", home_column=4, home_rank=9,
+        page="favorites",
+    )
+    response = client.get(f"/home/folder/{folders[3].id}/up/?partial=1")
+    assert b"Elsewhere" not in response.content
+
+
+def test_toggle_hides_section(client):
+    response = client.get("/home/toggle/tasks?partial=1")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_full_redirect_unchanged(client, folders):
+    response = client.get(f"/home/folder/{folders[3].id}/up/")
+    assert response.status_code == 302
+    assert client.session["moved_folder"] == folders[3].id
@@ -1,14 +1,19 @@
+import json
 from datetime import date
 
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
+import apps.home.cache as home_cache
 import apps.home.google as google
 from apps.favorites.models import Favorite
 from apps.folders.models import Folder
-from apps.home.movement import sequence
+from apps.home.movement import apply_layout, insert_folder, move_favorite, move_folder
+from apps.home.partial import columns_response, is_partial, section_response
 from apps.home.toggle import show_section
-from apps.tasks.models import Task
 
 
 @login_required
@@ -49,31 +54,15 @@ def index(request):
     # check whether tasks are shown or hidden
     show_tasks = show_section(user, "tasks")
 
-    # if tasks are shown, check for task_folders
-    task_folders = Folder.objects.filter(user=user, page="tasks", home_column__gt=1).order_by("name")
-    if task_folders:
-
-        # eliminate folders with no tasks
-        for folder in task_folders:
-            tasks = Task.objects.filter(folder_id=folder.id).exclude(status=1)
-            if not tasks:
-                task_folders = task_folders.exclude(id=folder.id)
-
-        # attatch tasks to folders with tasks
-        for folder in task_folders:
-            tasks = Task.objects.filter(folder_id=folder.id).exclude(status=1)
-            tasks = tasks.order_by("status", "title")
-            folder.tasks = tasks
+    # if tasks are shown, load the rendered task folders that have open tasks
+    if show_tasks:
+        tasks = home_cache.tasks_fragment(user)
+    else:
+        tasks = ""
 
-    # check whether there are some tasks in any of the folders
-    # if so, flag as true
     # the purpose of this flag is to show the tasks area
     # only if there are at least some unchecked tasks to display
-    some_tasks = False
-    if task_folders:
-        for folder in task_folders:
-            if folder.tasks:
-                some_tasks = True
+    some_tasks = bool(tasks)
 
 
     # SEARCH
@@ -111,17 +100,8 @@ def index(request):
     # FAVORITES
     # ----------------
 
-    columns = []
-    for i in range(1, 6):
-        folders = Folder.objects.filter(
-            user=user, page="favorites", home_column=i)
-        folders = folders.order_by("home_rank")
-        for folder in folders:
-            favorites = Favorite.objects.filter(
-                folder_id=folder.id, home_rank__gt=0)
-            favorites = favorites.order_by("home_rank")
-            folder.favorites = favorites
-        columns.append(folders)
+    # rendered columns are cached until the user's folders or favorites change
+    favorites = home_cache.favorites_fragment(user)
 
     moved_folder = request.session.get("moved_folder", 0)
     if moved_folder:
@@ -133,11 +113,11 @@ def index(request):
         "engines": engines,
         "search_engine": search_engine,
         "show_tasks": show_tasks,
-        "task_folders": task_folders,
+        "tasks": tasks,
         "some_tasks": some_tasks,
         "events": events,
         "show_events": show_events,
-        "columns": columns,
+        "favorites": favorites,
         "moved_folder": moved_folder,
     }
 
@@ -169,6 +149,9 @@ def toggle(request, section):
 
     user.save()
 
+    if is_partial(request):
+        return section_response(user, section)
+
     return redirect("/home/")
 
 
@@ -184,78 +167,47 @@ def folder(request, id, direction):
         The home page has four columns. This function moves folders
         from one column to another, or up and down in an specific column.
 
+        Each move runs in a single transaction that locks the affected
+        column, and writes the moved folder and at most one other folder.
+
     """
 
     user = request.user
 
-    # if the stack order is being changed
-    if direction == "up" or direction == "down":
+    with transaction.atomic():
+
         # get the folder to be moved
         # identify the column to which it belongs
-        moved_folder = get_object_or_404(Folder, pk=id)
+        moved_folder = get_object_or_404(
+            Folder.objects.select_for_update(), pk=id, user=user
+        )
         origin_column = moved_folder.home_column
 
-        # make sure the folders are sequential and adjacent
-        sequence(user, origin_column)
-
-        # identify the origin rank as modified by the sequence operation
-        origin_rank = moved_folder.home_rank
-
-        # identify the destination rank
+        # if the stack order is being changed,
+        # swap the folder with the one above or below it, if there is one
         if direction == "up":
-            destination_rank = origin_rank - 1
+            move_folder(user, moved_folder, -1)
         if direction == "down":
-            destination_rank = origin_rank + 1
-
-        # identify the folder to be displaced
-        try:
-            displaced_folder = Folder.objects.filter(
-                user=user, page="favorites",
-                home_column=origin_column, home_rank=destination_rank
-            ).get()
-        except Folder.DoesNotExist:
-            displaced_folder = False
-
-        # if a folder is being displaced, move it and the original folder
-        if displaced_folder:
-            moved_folder.home_rank = destination_rank
-            moved_folder.save()
-            displaced_folder.home_rank = origin_rank
-            displaced_folder.save()
-
-    # if the column is being changed
-    if direction == "left" or direction == "right":
-        # get the folder to be moved, along with its column and rank
-        moved_folder = get_object_or_404(Folder, pk=id)
-        origin_column = moved_folder.home_column
-
-        if direction == "left" and origin_column > 1:
-            destination_column = origin_column - 1
-        elif direction == "right" and origin_column < 5:
-            destination_column = origin_column + 1
-        else:
-            destination_column = origin_column
+            move_folder(user, moved_folder, 1)
 
-        if destination_column != origin_column:
+        # if the column is being changed
+        if direction == "left" or direction == "right":
 
-            # sequence destination column
-            # make sure the folders are sequential and adjacent
-            folders = sequence(user, destination_column)
-
-            # increment all up by one if greater than or equal to moved_folder
-            for folder in folders:
-                if folder.home_rank >= moved_folder.home_rank:
-                    folder.home_rank = folder.home_rank + 1
-                    folder.save()
+            if direction == "left" and origin_column > 1:
+                destination_column = origin_column - 1
+            elif direction == "right" and origin_column < 5:
+                destination_column = origin_column + 1
+            else:
+                destination_column = origin_column
 
             # move over origin folder to destination column in first position
-            moved_folder.home_column = destination_column
-            moved_folder.home_rank = 1
-            moved_folder.save()
+            if destination_column != origin_column:
+                insert_folder(user, moved_folder, destination_column)
 
-        # resequence origin column
-        # make sure the folders are sequential and adjacent
-        sequence(user, origin_column)
+    # return only the columns that changed, with the moved folder highlighted
+    if is_partial(request):
+        numbers = [origin_column, moved_folder.home_column]
+        return columns_response(user, numbers, moved_folder.id)
 
     # save the id of the moved folder for the next page view
     request.session["moved_folder"] = moved_folder.id
@@ -275,51 +227,63 @@ def favorite(request, id, direction):
 
     user = request.user
 
-    # get the favorite to be moved
-    moved_favorite = get_object_or_404(Favorite, pk=id)
-    folder_id = moved_favorite.folder_id
+    with transaction.atomic():
 
-    # make sure the favorites are sequential and adjacent
-    favorites = Favorite.objects.filter(user=user, folder_id=folder_id, home_rank__gt=0)
-    favorites = favorites.order_by("home_rank")
+        # get the favorite to be moved
+        moved_favorite = get_object_or_404(Favorite, pk=id, user=user)
+        folder_id = moved_favorite.folder_id
 
-    count = 1
-    for favorite in favorites:
-        favorite.home_rank = count
-        favorite.save()
-        count += 1
+        # swap the favorite with the one above or below it, if there is one
+        offset = -1 if direction == "up" else 1
+        displaced_favorite = move_favorite(user, moved_favorite, offset)
 
-    favorites = Favorite.objects.filter(user=user, folder_id=folder_id, home_rank__gt=0)
-    favorites = favorites.order_by("home_rank")
+        # a favorite moved down from the bottom of the folder
+        # keeps its place at the end, one rank further down
+        if not displaced_favorite and direction == "down":
+            moved_favorite.home_rank += 1
+            moved_favorite.save(update_fields=["home_rank"])
 
-    # identify the origin rank as modified by the sequence operation
-    moved_favorite = get_object_or_404(Favorite, pk=id)
-    origin_rank = moved_favorite.home_rank
+    # return only the column of the favorite's folder, with the folder highlighted
+    if is_partial(request) and moved_favorite.folder:
+        number = moved_favorite.folder.home_column
+        return columns_response(user, [number], folder_id)
 
-    # identify the destination rank
-    if direction == "up":
-        destination_rank = origin_rank - 1
-    if direction == "down":
-        destination_rank = origin_rank + 1
+    # save the id of the moved folder for the next page view
+    request.session["moved_folder"] = folder_id
 
-    # identify the favorite to be displaced
-    displaced_favorite = Favorite.objects.filter(
-        user=user, folder_id=folder_id, home_rank=destination_rank
-    ).first()
+    return redirect("/home/")
 
-    # if a favorite is being displaced, move it and the original favorite
-    # otherwise, we are at the end of the column, make no changes
 
-    # make sure the top favorite doesn't move if the user attempts to move it up
-    if destination_rank > 0:
-        moved_favorite.home_rank = destination_rank
-        moved_favorite.save()
+@login_required
+@require_POST
+def layout(request):
+    """Save the arrangement of the home page in a single request.
 
-    if displaced_favorite:
-        displaced_favorite.home_rank = origin_rank
-        displaced_favorite.save()
+    Notes:
+        Accepts a JSON body of the form:
 
-    # save the id of the moved folder for the next page view
-    request.session["moved_folder"] = moved_favorite.folder.id
+            {
+                "columns": [[folder_id, ...], ...],
+                "favorites": {"folder_id": [favorite_id, ...], ...}
+            }
 
-    return redirect("/home/")
+        "columns" must list every home folder, column by column, from top to
+        bottom. "favorites" is optional, and may cover only some folders,
+        but must list every home favorite of each folder it covers.
+
+        Responds with a small JSON acknowledgement rather than a page.
+
+    """
+
+    try:
+        data = json.loads(request.body)
+        columns = [[int(id) for id in column] for column in data["columns"]]
+        favorites = {
+            int(folder_id): [int(id) for id in ids]
+            for folder_id, ids in data.get("favorites", {}).items()
+        }
+        written = apply_layout(request.user, columns, favorites)
+    except (ValueError, TypeError, KeyError, AttributeError) as error:
+        return JsonResponse({"status": "error", "message": str(error)}, status=400)
+
+    return JsonResponse({"status": "ok", "written": written})
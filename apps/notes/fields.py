@@ -0,0 +1,111 @@
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+def threshold():
+    """The size in bytes above which note bodies are stored compressed."""
+    return getattr(settings, "NOTE_COMPRESS_THRESHOLD", 64 * 1024)
+
+
+def is_large(text):
+    # a character is at most four bytes, so short text needs no encoding
+    if text is None or len(text) * 4 <= threshold():
+        return False
+    return len(text.encode()) > threshold()
+
+
+def compress(text):
+    return zlib.compress(text.encode(), 6)
+
+
+def decompress(data):
+    return zlib.decompress(data).decode()
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Reads a compressed text field, decompressing it on first access.
+
+    Notes:
+        A compressed row loads with None in the text field's own column.
+        Defining __set__ makes this a data descriptor, so that __get__ runs
+        even once that None is in the instance's __dict__.
+
+    """
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        value = super().__get__(instance, cls)
+        if value is None:
+            compressed = getattr(instance, self.field.compressed)
+            if compressed is not None:
+                value = decompress(compressed)
+                instance.__dict__[self.field.attname] = value
+
+        return value
+
+
+class CompressedTextField(models.TextField):
+    """A text field whose large values are stored compressed in a binary field.
+
+    Args:
+        compressed (str): the name of the BinaryField holding compressed values
+
+    Notes:
+        Values up to the threshold are stored in this field's own column, as
+        plain text. Larger values leave the column NULL and are stored in the
+        binary field, a CompressedBinaryField. Either way, the attribute reads
+        as text, and a compressed value is only decompressed when it is read.
+
+    """
+
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, compressed=None, **kwargs):
+        self.compressed = compressed
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["compressed"] = self.compressed
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        return None if is_large(value) else value
+
+
+class CompressedBinaryField(models.BinaryField):
+    """Holds the compressed form of a CompressedTextField's large values.
+
+    Args:
+        source (str): the name of the CompressedTextField
+
+    Notes:
+        The compressed value is taken from the text field whenever the row is
+        saved, including by bulk_create, so the two columns always agree.
+        Saving with update_fields must name both fields.
+
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["source"] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        text = getattr(model_instance, self.source)
+        value = compress(text) if is_large(text) else None
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,70 @@
+import statistics
+import time
+
+import markdown
+from django.core.management.base import BaseCommand
+
+from apps.notes.models import Note
+from apps.notes.rendering import source_hash
+
+PARAGRAPH = (
+    "## Section {i}\n\n"
+    "Some *emphasis*, some **strong text**, a [link](https://example.com/{i}) "
+    "and `inline code`.\n\n"
+    "- first item\n- second item\n- third item\n\n"
+    "> a quotation, to give the parser some block structure\n\n"
+)
+
+
+class Command(BaseCommand):
+    help = "Compare displaying a large note by rendering it and from stored html."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=1_000_000)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+
+        text = ""
+        i = 0
+        while len(text) < options["size"]:
+            text += PARAGRAPH.format(i=i)
+            i += 1
+
+        # the note is never saved, so the benchmark needs no database
+        note = Note(note=text)
+        note.refresh_html()
+
+        before = []
+        for i in range(rounds):
+            start = time.perf_counter()
+            markdown.markdown(note.note)
+            before.append(time.perf_counter() - start)
+
+        after = []
+        for i in range(rounds):
+            start = time.perf_counter()
+            note.rendered_html()
+            after.append(time.perf_counter() - start)
+
+        # a changed note is rendered once by a pooled renderer
+        changed = []
+        for i in range(rounds):
+            note.note = text + f"\n\nedit {i}"
+            start = time.perf_counter()
+            note.refresh_html()
+            changed.append(time.perf_counter() - start)
+
+        self.stdout.write(
+            f"{len(text) / 1e6:.1f} MB note, median of {rounds}:\n"
+            f"  rendered on every view: {statistics.median(before) * 1000:.1f} ms\n"
+            f"  stored html: {statistics.median(after) * 1000:.2f} ms "
+            f"(of which hashing the source {self.hash_time(text) * 1000:.2f} ms)\n"
+            f"  re-rendered after an edit: {statistics.median(changed) * 1000:.1f} ms"
+        )
+
+    def hash_time(self, text):
+        start = time.perf_counter()
+        source_hash(text)
+        return time.perf_counter() - start
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, Length
+
+from accounts.models import CustomUser
+from apps.notes.models import Note
+from apps.notes.revisions import SNAPSHOT_EVERY, reconstruct
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Measure storage and reconstruction time for a note with many revisions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--revisions", type=int, default=1000)
+        parser.add_argument("--lines", type=int, default=500)
+
+    def handle(self, *args, **options):
+        # the note is created in a transaction that is always rolled back
+        try:
+            with transaction.atomic():
+                self.run(options["revisions"], options["lines"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, count, size):
+        user = CustomUser.objects.create_user("bench_revisions", "bench@example.com")
+        generator = random.Random(0)
+
+        lines = [f"Line {i}: {'lorem ipsum ' * 6}\n" for i in range(size)]
+        note = Note.objects.create(user=user, subject="History", note="".join(lines))
+        texts = [note.note]
+
+        start = time.perf_counter()
+        for i in range(count - 1):
+            # each edit changes, adds or removes a few lines
+            for j in range(3):
+                k = generator.randrange(len(lines))
+                action = generator.choice(["change", "add", "remove"])
+                if action == "change":
+                    lines[k] = f"Edited {i}.{j}: {'dolor sit ' * 6}\n"
+                elif action == "add":
+                    lines.insert(k, f"Added {i}.{j}\n")
+                elif len(lines) > 1:
+                    del lines[k]
+            note.note = "".join(lines)
+            note.save()
+            texts.append(note.note)
+        saving = time.perf_counter() - start
+
+        revisions = note.revisions.all()
+        stored = revisions.aggregate(
+            size=Sum(Coalesce(Length("snapshot"), 0) + Coalesce(Length("delta"), 0))
+        )["size"]
+        full = sum(len(text.encode()) for text in texts)
+
+        timings = []
+        for number in range(1, count + 1):
+            start = time.perf_counter()
+            text = reconstruct(note, number)
+            timings.append(time.perf_counter() - start)
+            assert text == texts[number - 1]
+
+        self.stdout.write(
+            f"{revisions.count()} revisions of a {len(texts[-1]) / 1000:.0f} kB note\n"
+            f"  saving: {saving / count * 1000:.2f} ms per revision\n"
+            f"  stored: {stored / 1000:.0f} kB, against {full / 1000:.0f} kB of full copies\n"
+            f"  reconstructing: median {statistics.median(timings) * 1000:.2f} ms, "
+            f"worst {max(timings) * 1000:.2f} ms, "
+            f"at most {SNAPSHOT_EVERY - 1} deltas applied"
+        )
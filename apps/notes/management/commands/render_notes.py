@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from apps.notes.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the html of notes whose html is missing or out of date, "
+        "and index the text of those stored compressed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        size = options["batch_size"]
+        last = 0
+        checked = rendered = 0
+
+        # walk the notes by id, so each batch is a short indexed query,
+        # and only the changed notes are written
+        while True:
+            batch = list(
+                Note.objects.filter(pk__gt=last)
+                .order_by("pk")
+                .only("id", "note", "note_compressed", "html", "html_hash")[:size]
+            )
+            if not batch:
+                break
+
+            changed = [note for note in batch if note.refresh_html()]
+            if changed:
+                Note.objects.bulk_update(changed, ["html", "html_hash"])
+
+            # compressed notes written without save() are not yet searchable
+            for note in changed:
+                if note.note_compressed is not None:
+                    note.index_compressed()
+
+            checked += len(batch)
+            rendered += len(changed)
+            last = batch[-1].pk
+
+        self.stdout.write(f"checked {checked} notes, rendered {rendered}")
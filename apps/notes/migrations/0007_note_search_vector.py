@@ -0,0 +1,67 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:13
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The search vector is maintained by a trigger, so that it is kept current
+# by every write, including bulk updates.
+# A note too long for a single tsvector has the start of its text indexed instead.
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION app_note_search_vector() RETURNS trigger AS $$
+BEGIN
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A')
+            || setweight(to_tsvector('simple', app_search_text(NEW.note)), 'B');
+    EXCEPTION WHEN program_limit_exceeded THEN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A')
+            || setweight(to_tsvector('simple', app_search_text(left(NEW.note, 100000))), 'B');
+    END;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER app_note_search_vector
+    BEFORE INSERT OR UPDATE OF subject, note ON app_note
+    FOR EACH ROW EXECUTE FUNCTION app_note_search_vector();
+
+UPDATE app_note SET subject = subject;
+
+CREATE INDEX app_note_search_vector_idx ON app_note USING gin (search_vector);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS app_note_search_vector_idx;
+DROP TRIGGER IF EXISTS app_note_search_vector ON app_note;
+DROP FUNCTION IF EXISTS app_note_search_vector();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0001_search_text"),
+        ("notes", "0006_rename_user_id_note_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
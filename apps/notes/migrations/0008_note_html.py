@@ -0,0 +1,24 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0007_note_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="html",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="html_hash",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True
+            ),
+        ),
+    ]
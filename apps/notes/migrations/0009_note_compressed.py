@@ -0,0 +1,140 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:05
+
+import zlib
+
+import django.db.models.functions
+from django.db import migrations, transaction
+
+import apps.notes.fields
+from apps.notes.fields import is_large, threshold
+
+# Large notes are moved to note_compressed in batches, each committed on its
+# own, so the migration never holds more than a batch of notes in memory or
+# locks the whole table. This uses the threshold in settings at the time.
+
+BATCH_SIZE = 50
+
+# The search trigger cannot read compressed notes, so for those it keeps the
+# body's part of the existing search vector, and Note.index_compressed
+# indexes the body whenever it changes.
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION app_note_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF NEW.note IS NULL AND NEW.note_compressed IS NOT NULL THEN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A');
+        IF TG_OP = 'UPDATE' AND OLD.search_vector IS NOT NULL THEN
+            NEW.search_vector := NEW.search_vector || ts_filter(OLD.search_vector, '{b}');
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A')
+            || setweight(to_tsvector('simple', app_search_text(NEW.note)), 'B');
+    EXCEPTION WHEN program_limit_exceeded THEN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A')
+            || setweight(to_tsvector('simple', app_search_text(left(NEW.note, 100000))), 'B');
+    END;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_SQL = """
+CREATE OR REPLACE FUNCTION app_note_search_vector() RETURNS trigger AS $$
+BEGIN
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A')
+            || setweight(to_tsvector('simple', app_search_text(NEW.note)), 'B');
+    EXCEPTION WHEN program_limit_exceeded THEN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', app_search_text(NEW.subject)), 'A')
+            || setweight(to_tsvector('simple', app_search_text(left(NEW.note, 100000))), 'B');
+    END;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def update_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def restore_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+def batches(queryset):
+    last = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last).order_by("pk")[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1][0]
+
+
+def compress_notes(apps, schema_editor):
+    Note = apps.get_model("notes", "Note")
+    size = threshold()
+
+    # a note longer than the threshold in bytes has at least a quarter as
+    # many characters, which the database can check without reading bytes
+    queryset = Note.objects.annotate(length=django.db.models.functions.Length("note"))
+    queryset = queryset.filter(length__gt=size // 4).values_list("pk", "note")
+
+    for batch in batches(queryset):
+        with transaction.atomic():
+            for pk, note in batch:
+                if is_large(note):
+                    Note.objects.filter(pk=pk).update(
+                        note=None, note_compressed=zlib.compress(note.encode(), 6)
+                    )
+
+
+def decompress_notes(apps, schema_editor):
+    Note = apps.get_model("notes", "Note")
+    queryset = Note.objects.filter(note_compressed__isnull=False)
+    queryset = queryset.values_list("pk", "note_compressed")
+
+    for batch in batches(queryset):
+        with transaction.atomic():
+            for pk, compressed in batch:
+                Note.objects.filter(pk=pk).update(
+                    note=zlib.decompress(compressed).decode(), note_compressed=None
+                )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("notes", "0008_note_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="note_compressed",
+            field=apps.notes.fields.CompressedBinaryField(
+                editable=False, null=True, source="note"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="note",
+            name="note",
+            field=apps.notes.fields.CompressedTextField(
+                blank=True, compressed="note_compressed", null=True
+            ),
+        ),
+        migrations.RunPython(update_search_trigger, restore_search_trigger),
+        migrations.RunPython(compress_notes, decompress_notes),
+    ]
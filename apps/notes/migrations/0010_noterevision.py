@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-18 15:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0009_note_compressed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteRevision",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("number", models.IntegerField()),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("snapshot", models.BinaryField(null=True)),
+                ("delta", models.BinaryField(null=True)),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="notes.note",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "app_note_revision",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="noterevision",
+            constraint=models.UniqueConstraint(
+                fields=("note", "number"), name="app_note_revision_unique_number"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0010_noterevision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="version",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,7 +1,12 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import DataError, connection, models, transaction
+from django.utils.text import normalize_newlines
 
 from accounts.models import CustomUser
 from apps.folders.models import Folder
+from apps.notes.fields import CompressedBinaryField, CompressedTextField
+from apps.notes.rendering import render, source_hash
+from apps.notes.revisions import record
 
 
 class Note(models.Model):
@@ -12,19 +17,159 @@ class Note(models.Model):
         user (int): the user who created and owns the note
         folder (int): the folder to which the note belongs
         subject (str): the subject matter of the note
-        note (str): the content of the note
+        note (str): the content of the note, stored compressed in note_compressed
+            when it is large
         selected (int): whether the favorite has been selected to be displayed
+        search_vector (tsvector): the searchable text, maintained by a database trigger
+        html (str): the note rendered from markdown
+        html_hash (str): the hash of the source that html was rendered from
+        note_compressed (bytes): the content of a large note, compressed
+        version (int): counts the changes to the note's content, so that
+            concurrent edits can be detected
+        listed (list): the attributes shown in a folder's list of notes
     """
 
     id = models.BigAutoField(primary_key=True)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     folder = models.ForeignKey(Folder, on_delete=models.SET_NULL, blank=True, null=True)
     subject = models.CharField(max_length=50, null=True)
-    note = models.TextField(blank=True, null=True)
+    note = CompressedTextField(blank=True, null=True, compressed="note_compressed")
     selected = models.IntegerField(blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    html = models.TextField(blank=True, null=True, editable=False)
+    html_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
+    note_compressed = CompressedBinaryField(null=True, editable=False, source="note")
+    version = models.IntegerField(default=0, editable=False)
+
+    listed = ["id", "subject"]
 
     def __str__(self):
         return f"{self.subject}"
 
+    def save(self, *args, **kwargs):
+        # render the note only when its text has changed
+        changed = False
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "note" in update_fields:
+            # browsers post a textarea's line breaks as CRLF, but show scripts
+            # its text with LF, which autosave's patch offsets count in
+            if self.note:
+                self.note = normalize_newlines(self.note)
+            changed = self.refresh_html()
+            if changed:
+                self.version += 1
+            if update_fields is not None:
+                update_fields = {*update_fields, "note_compressed"}
+                if changed:
+                    update_fields |= {"html", "html_hash", "version"}
+                kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+        if changed and self.note_compressed is not None:
+            self.index_compressed()
+
+        # keep a revision whenever the text may have changed
+        if changed:
+            record(self)
+
+    def index_compressed(self):
+        """Index the text of a compressed note for full text search.
+
+        Notes:
+            The search trigger cannot read compressed text, so it keeps the
+            indexed text of a compressed note as it was, and the text is
+            indexed here whenever it changes. As with the trigger, a note too
+            long for a single tsvector has the start of its text indexed.
+
+        """
+
+        if connection.vendor != "postgresql":
+            return
+
+        sql = """
+            UPDATE app_note SET search_vector =
+                setweight(to_tsvector('simple', app_search_text(subject)), 'A')
+                || setweight(to_tsvector('simple', app_search_text(%s)), 'B')
+            WHERE id = %s
+        """
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [self.note, self.pk])
+        except DataError:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [self.note[:100000], self.pk])
+
+    def refresh_html(self):
+        """Render the note if its html is missing or out of date.
+
+        Returns:
+            changed (bool): whether the html was rendered
+
+        """
+
+        digest = source_hash(self.note)
+        if self.html_hash == digest and self.html is not None:
+            return False
+        self.html = render(self.note)
+        self.html_hash = digest
+        return True
+
+    def rendered_html(self):
+        """Get the note's html, rendering and storing it if it is out of date.
+
+        Notes:
+            Notes written without save(), e.g. by queryset updates, are
+            rendered the first time they are displayed.
+
+            Compressed notes are only written by save(), so their html is
+            always current, and is shown without decompressing the note.
+
+        """
+
+        if self.note_compressed is not None and self.html is not None:
+            return self.html
+
+        if self.refresh_html() and self.pk:
+            Note.objects.filter(pk=self.pk).update(
+                html=self.html, html_hash=self.html_hash
+            )
+        return self.html
+
     class Meta:
         db_table = "app_note"
+
+
+class NoteRevision(models.Model):
+    """A saved version of a note's text.
+
+    Attributes:
+        id (int): the unique identifier for the revision
+        note (int): the note the revision belongs to
+        number (int): the revision's number, counting from 1 for each note
+        created (datetime): when the revision was saved
+        snapshot (bytes): the compressed full text, for snapshot revisions
+        delta (bytes): the compressed changes from the previous revision,
+            for the others
+
+    Notes:
+        See apps.notes.revisions for how revisions are stored and rebuilt.
+
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="revisions")
+    number = models.IntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+    snapshot = models.BinaryField(null=True)
+    delta = models.BinaryField(null=True)
+
+    def __str__(self):
+        return f"{self.note_id} : {self.number}"
+
+    class Meta:
+        db_table = "app_note_revision"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "number"], name="app_note_revision_unique_number"
+            ),
+        ]
@@ -0,0 +1,44 @@
+def apply_patches(text, patches):
+    """Apply a set of replacements to a text.
+
+    Args:
+        text (str): the text to be patched
+        patches (list): dicts with "start", "end" and "text", each replacing
+            the characters from start up to end of the original text;
+            offsets count Unicode code points
+
+    Returns:
+        text (str): the patched text
+
+    Raises:
+        ValueError: if a patch is malformed, out of range, or overlaps
+            another one
+
+    """
+
+    ranges = []
+    for patch in patches:
+        start, end, replacement = patch["start"], patch["end"], patch["text"]
+        if not (isinstance(start, int) and isinstance(end, int)):
+            raise ValueError("Patch offsets must be integers.")
+        if not isinstance(replacement, str):
+            raise ValueError("Patch text must be a string.")
+        if not 0 <= start <= end <= len(text):
+            raise ValueError("Patch is out of range.")
+        ranges.append((start, end, replacement))
+
+    ranges.sort(key=lambda patch: patch[:2])
+    for a, b in zip(ranges, ranges[1:]):
+        if a[1] > b[0]:
+            raise ValueError("Patches overlap.")
+
+    # build the result in one pass, rather than splicing the text repeatedly
+    parts = []
+    position = 0
+    for start, end, replacement in ranges:
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+
+    return "".join(parts)
@@ -0,0 +1,52 @@
+import hashlib
+import queue
+
+import markdown
+
+# the most idle renderers kept; more are created under load, and dropped after
+RENDERERS_KEPT = 8
+
+
+def source_hash(text):
+    """Identify a note's markdown source, to tell whether its html is current."""
+    return hashlib.sha256((text or "").encode()).hexdigest()
+
+
+class RendererPool:
+    """A process-wide pool of reusable Markdown renderers.
+
+    Notes:
+        Building a Markdown instance loads its extensions and compiles its
+        patterns, which markdown.markdown() repeats on every call. A renderer
+        is not thread safe, so each one is taken from the pool for a single
+        conversion, reset, and returned.
+
+    """
+
+    def __init__(self, maxsize=RENDERERS_KEPT):
+        self._idle = queue.LifoQueue(maxsize=maxsize)
+        self.created = 0
+
+    def render(self, text):
+        """Convert markdown to html."""
+
+        try:
+            renderer = self._idle.get_nowait()
+        except queue.Empty:
+            renderer = markdown.Markdown()
+            self.created += 1
+
+        try:
+            return renderer.reset().convert(text or "")
+        finally:
+            try:
+                self._idle.put_nowait(renderer)
+            except queue.Full:
+                pass
+
+
+renderers = RendererPool()
+
+
+def render(text):
+    return renderers.render(text)
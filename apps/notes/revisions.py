@@ -0,0 +1,117 @@
+import difflib
+import json
+import zlib
+
+from django.db import transaction
+
+# every SNAPSHOT_EVERY-th revision stores the full text, so reconstructing
+# any revision applies fewer than SNAPSHOT_EVERY deltas
+SNAPSHOT_EVERY = 20
+
+
+def pack(value):
+    return zlib.compress(json.dumps(value).encode(), 6)
+
+
+def unpack(data):
+    return json.loads(zlib.decompress(data))
+
+
+def make_delta(old, new):
+    """Describe how to turn one text into another, line by line.
+
+    Returns:
+        delta (list): [start, end, text] replacements of lines of the old
+            text, in order
+
+    """
+
+    a = (old or "").splitlines(keepends=True)
+    b = (new or "").splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [
+        [i1, i2, "".join(b[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(old, delta):
+    """Apply a delta made by make_delta to the old text."""
+
+    lines = (old or "").splitlines(keepends=True)
+    # replacements are applied from the end, so earlier line numbers still hold
+    for start, end, text in reversed(delta):
+        lines[start:end] = text.splitlines(keepends=True)
+    return "".join(lines)
+
+
+def reconstruct(note, number):
+    """Rebuild the text of a revision of a note.
+
+    Args:
+        note (Note): the note
+        number (int): the revision number
+
+    Returns:
+        text (str): the note's text at that revision
+
+    Raises:
+        NoteRevision.DoesNotExist: if the note has no such revision
+
+    Notes:
+        Loads the nearest snapshot at or before the revision, and the deltas
+        after it, so it applies fewer than SNAPSHOT_EVERY deltas.
+
+    """
+
+    revisions = note.revisions.filter(number__lte=number)
+    snapshot = revisions.filter(snapshot__isnull=False).order_by("-number").first()
+    if snapshot is None or not revisions.filter(number=number).exists():
+        raise note.revisions.model.DoesNotExist("Revision not found.")
+
+    text = unpack(snapshot.snapshot)
+    # only the deltas are read, as values rather than model instances, which
+    # the related manager would give each a query to load its deferred note_id
+    deltas = revisions.filter(number__gt=snapshot.number).order_by("number")
+    for delta in deltas.values_list("delta", flat=True):
+        text = apply_delta(text, unpack(delta))
+    return text
+
+
+def record(note):
+    """Store the note's current text as its next revision, if it has changed.
+
+    Returns:
+        revision (NoteRevision): the new revision, or None if the text is
+            the same as the latest revision's
+
+    Notes:
+        A revision stores a delta against the one before it, unless it is due
+        a snapshot, or the delta would be larger than a snapshot. The note
+        is locked, so concurrent saves cannot claim the same number.
+
+    """
+
+    text = note.note or ""
+
+    with transaction.atomic():
+        type(note).objects.select_for_update().filter(pk=note.pk).exists()
+
+        latest = note.revisions.order_by("-number").values_list("number", flat=True)
+        latest = latest.first()
+        if latest is None:
+            return note.revisions.create(number=1, snapshot=pack(text))
+
+        previous = reconstruct(note, latest)
+        if previous == text:
+            return None
+
+        number = latest + 1
+        snapshot = pack(text)
+        if (number - 1) % SNAPSHOT_EVERY != 0:
+            delta = pack(make_delta(previous, text))
+            if len(delta) < len(snapshot):
+                return note.revisions.create(number=number, delta=delta)
+
+        return note.revisions.create(number=number, snapshot=snapshot)
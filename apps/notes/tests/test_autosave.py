@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from apps.notes.models import Note
+from apps.notes.patches import apply_patches
+
+pytestmark = pytest.mark.django_db
+
+
+def post(client, note, data):
+    return client.post(
+        f"/notes/{note.id}/autosave", json.dumps(data), content_type="application/json"
+    )
+
+
+def test_apply_patches():
+    text = "The quick brown fox"
+    patches = [
+        {"start": 16, "end": 19, "text": "cat"},
+        {"start": 4, "end": 9, "text": "slow"},
+    ]
+    assert apply_patches(text, patches) == "The slow brown cat"
+    assert apply_patches(text, []) == text
+    assert apply_patches("", [{"start": 0, "end": 0, "text": "new"}]) == "new"
+
+
+@pytest.mark.parametrize(
+    "patches",
+    [
+        [{"start": 5, "end": 2, "text": ""}],
+        [{"start": 0, "end": 99, "text": ""}],
+        [{"start": 0, "end": 3, "text": ""}, {"start": 2, "end": 4, "text": ""}],
+        [{"start": "0", "end": 1, "text": ""}],
+    ],
+)
+def test_apply_patches_rejects(patches):
+    with pytest.raises(ValueError):
+        apply_patches("0123456789", patches)
+
+
+def test_autosave(client, note):
+    version = note.version
+    data = {
+        "version": version,
+        "patches": [{"start": 0, "end": 9, "text": "Chocolate"}],
+    }
+
+    response = post(client, note, data)
+    assert response.json() == {"status": "ok", "version": version + 1}
+
+    note = Note.objects.get(pk=note.pk)
+    assert note.note == "Chocolate and cookies are nice"
+    assert note.html == "<p>Chocolate and cookies are nice</p>"
+    assert note.revisions.count() == 2
+
+
+def test_autosave_crlf(client, note, folder1):
+    # a form post keeps the browser's CRLF line breaks only until saved
+    client.post(
+        f"/notes/{note.id}/edit",
+        {"folder": folder1.id, "subject": "Lines", "note": "one\r\ntwo\r\nthree"},
+    )
+    note = Note.objects.get(pk=note.pk)
+    assert note.note == "one\ntwo\nthree"
+
+    # a note stored with CRLF before then is patched by its LF offsets
+    Note.objects.filter(pk=note.pk).update(note="one\r\ntwo\r\nthree")
+    data = {"version": note.version, "patches": [{"start": 8, "end": 13, "text": "3"}]}
+    response = post(client, note, data)
+    assert response.status_code == 200
+    assert Note.objects.get(pk=note.pk).note == "one\ntwo\n3"
+
+
+def test_autosave_conflict(client, note, django_assert_max_num_queries):
+    data = {"version": note.version - 1, "patches": []}
+
+    with django_assert_max_num_queries(8) as queries:
+        response = post(client, note, data)
+
+    assert response.status_code == 409
+    assert response.json()["version"] == note.version
+    # the note's content is never selected
+    assert not any('"app_note"."note"' in q["sql"] for q in queries.captured_queries)
+
+
+def test_autosave_errors(client, note, user):
+    assert post(client, note, {"patches": []}).status_code == 400
+
+    data = {"version": note.version, "patches": [{"start": 0, "end": 999, "text": ""}]}
+    assert post(client, note, data).status_code == 400
+
+    other = Note.objects.create(user=user, subject="Other", note="")
+    other.user = user.__class__.objects.create_user("Other", "o@example.com", "x")
+    other.save()
+    assert post(client, other, {"version": other.version, "patches": []}).status_code == 404
@@ -0,0 +1,66 @@
+import pytest
+
+from apps.notes.fields import is_large
+from apps.notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+LARGE = "A line of a long log file.\n" * 5000
+
+
+def stored(note):
+    return Note.objects.filter(pk=note.pk).values_list("note", "note_compressed").get()
+
+
+def test_is_large(settings):
+    settings.NOTE_COMPRESS_THRESHOLD = 10
+    assert not is_large(None)
+    assert not is_large("0123456789")
+    assert is_large("01234567890")
+    assert is_large("éééééé")
+
+
+def test_small_note_stays_plain(user):
+    note = Note.objects.create(user=user, subject="Small", note="short")
+    assert stored(note) == ("short", None)
+
+
+def test_large_note_compressed(user):
+    note = Note.objects.create(user=user, subject="Log", note=LARGE)
+
+    text, compressed = stored(note)
+    assert text is None
+    assert len(compressed) < len(LARGE) / 10
+
+    note = Note.objects.get(pk=note.pk)
+    assert note.__dict__["note"] is None
+    assert note.note == LARGE
+
+
+def test_opening_does_not_decompress(user):
+    note = Note.objects.create(user=user, subject="Log", note=LARGE)
+
+    note = Note.objects.get(pk=note.pk)
+    assert note.rendered_html().startswith("<p>A line")
+    assert note.__dict__["note"] is None
+
+
+def test_edit_compressed_note(user):
+    note = Note.objects.create(user=user, subject="Log", note=LARGE)
+
+    note = Note.objects.get(pk=note.pk)
+    note.note = note.note + "One more line."
+    note.save(update_fields=["note"])
+    assert Note.objects.get(pk=note.pk).note.endswith("One more line.")
+
+    note.note = "cleared"
+    note.save()
+    assert stored(note) == ("cleared", None)
+    assert Note.objects.get(pk=note.pk).html == "<p>cleared</p>"
+
+
+def test_bulk_create_compresses(user):
+    Note.objects.bulk_create([Note(user=user, subject="Log", note=LARGE)])
+    note = Note.objects.get()
+    assert stored(note)[0] is None
+    assert note.note == LARGE
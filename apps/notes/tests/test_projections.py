@@ -0,0 +1,50 @@
+import tracemalloc
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+BODY = "All work and no play makes Jack a dull boy. " * 2000
+
+
+@pytest.fixture
+def large_notes(user, folder1):
+    Note.objects.bulk_create(
+        Note(user=user, folder=folder1, subject=f"Note {i:03}", note=BODY)
+        for i in range(300)
+    )
+    selected = Note.objects.create(user=user, folder=folder1, subject="Selected", note="# Hi")
+
+    user.notes_folder = folder1.id
+    user.notes_note = selected.id
+    user.save()
+
+
+def test_list_does_not_load_bodies(client, large_notes):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/notes/")
+
+    assert response.status_code == 200
+    assert len(response.context["notes"]) == 301
+    assert b"Note 299" in response.content
+
+    selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT")]
+    loaded = [sql for sql in selects if '"app_note"."note"' in sql]
+
+    # only the selected note is loaded in full
+    assert len(loaded) == 1
+    assert 'WHERE "app_note"."id" = ' in loaded[0]
+
+
+def test_list_memory(client, large_notes):
+    # the bodies add up to about 26 MB
+    tracemalloc.start()
+    client.get("/notes/")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < len(BODY) * 300 / 10
@@ -0,0 +1,76 @@
+import pytest
+from django.core.management import call_command
+
+import apps.notes.models
+from apps.notes.models import Note
+from apps.notes.rendering import RendererPool, source_hash
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    calls = []
+    render = apps.notes.models.render
+
+    def counting(text):
+        calls.append(text)
+        return render(text)
+
+    monkeypatch.setattr(apps.notes.models, "render", counting)
+    return calls
+
+
+def test_pool_reuses_renderers():
+    pool = RendererPool(maxsize=2)
+    assert pool.render("*a*") == "<p><em>a</em></p>"
+    assert pool.render("# b") == "<h1>b</h1>"
+    assert pool.created == 1
+
+
+def test_save_renders_html(user, renders):
+    note = Note.objects.create(user=user, subject="Plan", note="# Plan")
+    assert note.html == "<h1>Plan</h1>"
+    assert note.html_hash == source_hash("# Plan")
+
+    note.subject = "Renamed"
+    note.save()
+    assert len(renders) == 1
+
+    note.note = "*new*"
+    note.save(update_fields=["note"])
+    assert len(renders) == 2
+    assert Note.objects.get(pk=note.pk).html == "<p><em>new</em></p>"
+
+
+def test_rendered_html_repairs_stale(user, renders):
+    note = Note.objects.create(user=user, subject="Plan", note="# Plan")
+    Note.objects.filter(pk=note.pk).update(note="# Changed")
+
+    note = Note.objects.get(pk=note.pk)
+    assert note.rendered_html() == "<h1>Changed</h1>"
+    assert Note.objects.get(pk=note.pk).html_hash == source_hash("# Changed")
+
+    note.rendered_html()
+    assert len(renders) == 2
+
+
+def test_index_shows_stored_html(client, user, note, renders):
+    user.notes_note = note.id
+    user.save()
+
+    response = client.get("/notes/")
+    assert b"Ice cream and cookies are nice</p>" in response.content
+    assert len(renders) == 0
+
+
+def test_backfill(user):
+    for i in range(5):
+        Note.objects.create(user=user, subject=f"Note {i}", note=f"*{i}*")
+    Note.objects.update(html=None, html_hash=None)
+
+    call_command("render_notes", batch_size=2)
+
+    assert [note.html for note in Note.objects.order_by("pk")] == [
+        f"<p><em>{i}</em></p>" for i in range(5)
+    ]
@@ -0,0 +1,78 @@
+import pytest
+
+from apps.notes.models import Note, NoteRevision
+from apps.notes.revisions import SNAPSHOT_EVERY, apply_delta, make_delta, reconstruct
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("", "a\nb\n"),
+        ("a\nb\n", ""),
+        ("a\nb", "a\nc"),
+        ("a\nb\nc\nd\n", "a\nx\nc\ny\nz\n"),
+        ("same\n", "same\n"),
+    ],
+)
+def test_delta_round_trip(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_save_records_revisions(user):
+    note = Note.objects.create(user=user, subject="Plan", note="one\n")
+    note.note = "one\ntwo\n"
+    note.save()
+    note.subject = "Renamed"
+    note.save()
+
+    assert note.revisions.count() == 2
+    assert reconstruct(note, 1) == "one\n"
+    assert reconstruct(note, 2) == "one\ntwo\n"
+
+
+def test_snapshots_bound_reconstruction(user, django_assert_max_num_queries):
+    base = "".join(f"base line {j} of the log\n" for j in range(50))
+    note = Note.objects.create(user=user, subject="Log", note=base)
+    texts = [base]
+    for i in range(1, 45):
+        note.note = base + "".join(f"line {j}\n" for j in range(i))
+        note.save()
+        texts.append(note.note)
+
+    snapshots = note.revisions.filter(snapshot__isnull=False)
+    assert list(snapshots.values_list("number", flat=True)) == [1, 21, 41]
+    assert note.revisions.filter(delta__isnull=False).count() == 42
+
+    for number in range(1, 46):
+        with django_assert_max_num_queries(4):
+            assert reconstruct(note, number) == texts[number - 1]
+
+    assert SNAPSHOT_EVERY == 20
+
+
+def test_missing_revision(user):
+    note = Note.objects.create(user=user, subject="Plan", note="one\n")
+    with pytest.raises(NoteRevision.DoesNotExist):
+        reconstruct(note, 2)
+
+
+def test_list_and_restore(client, user):
+    note = Note.objects.create(user=user, subject="Plan", note="first\n")
+    note.note = "second\n"
+    note.save()
+
+    response = client.get(f"/notes/{note.id}/revisions")
+    assert [r["number"] for r in response.json()["revisions"]] == [2, 1]
+
+    response = client.get(f"/notes/{note.id}/revisions/1")
+    assert response.json()["note"] == "first\n"
+
+    response = client.post(f"/notes/{note.id}/revisions/1/restore")
+    assert response.status_code == 302
+    assert Note.objects.get(pk=note.id).note == "first\n"
+    assert note.revisions.count() == 3
+
+    assert client.get(f"/notes/{note.id}/revisions/9").status_code == 404
+    assert client.get(f"/notes/{note.id}/revisions/1/restore").status_code == 405
@@ -1,13 +1,19 @@
-import markdown
+import json
+
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import Http404
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.text import normalize_newlines
+from django.views.decorators.http import require_POST
 
 from apps.folders.folders import select_folder
 from apps.folders.models import Folder
 from apps.notes.forms import NoteForm
-from apps.notes.models import Note
+from apps.notes.models import Note, NoteRevision
+from apps.notes.patches import apply_patches
+from apps.notes.revisions import reconstruct
 
 
 @login_required
@@ -33,7 +39,8 @@ def index(request):
     else:
         notes = Note.objects.filter(user=user, folder_id__isnull=True)
 
-    notes = notes.order_by("subject")
+    # the list only shows subjects, so note bodies are not loaded
+    notes = notes.order_by("subject").values(*Note.listed)
 
     selected_note_id = request.user.notes_note
 
@@ -43,7 +50,7 @@ def index(request):
         selected_note = None
 
     if selected_note:
-        selected_note.note = markdown.markdown(selected_note.note)
+        selected_note.rendered_html()
 
     context = {
         "page": page,
@@ -211,3 +218,125 @@ def delete(request, id):
         raise Http404("Record not found.")
     note.delete()
     return redirect("notes")
+
+
+@login_required
+def revisions(request, id):
+    """List the revisions of a note, newest first, as JSON.
+
+    Args:
+        id (int): a Note instance id
+
+    """
+
+    note = get_object_or_404(Note.objects.only("id"), user=request.user, pk=id)
+    rows = note.revisions.order_by("-number").values_list("number", "created")
+
+    return JsonResponse(
+        {
+            "revisions": [
+                {"number": number, "created": created.isoformat()}
+                for number, created in rows
+            ]
+        }
+    )
+
+
+@login_required
+def revision(request, id, number):
+    """Show the text of a revision of a note, as JSON.
+
+    Args:
+        id (int): a Note instance id
+        number (int): a revision number
+
+    """
+
+    note = get_object_or_404(Note.objects.only("id"), user=request.user, pk=id)
+    try:
+        text = reconstruct(note, number)
+    except NoteRevision.DoesNotExist:
+        raise Http404("Revision not found.")
+
+    return JsonResponse({"number": number, "note": text})
+
+
+@login_required
+@require_POST
+def restore(request, id, number):
+    """Restore a note to one of its revisions, redirect to index.
+
+    Args:
+        id (int): a Note instance id
+        number (int): a revision number
+
+    Notes:
+        Restoring saves the old text as a new revision, so it can be undone.
+
+    """
+
+    note = get_object_or_404(Note, user=request.user, pk=id)
+    try:
+        note.note = reconstruct(note, number)
+    except NoteRevision.DoesNotExist:
+        raise Http404("Revision not found.")
+    note.save()
+
+    return redirect("notes")
+
+
+@login_required
+@require_POST
+def autosave(request, id):
+    """Apply an edit to a note's content without posting the whole form.
+
+    Args:
+        id (int): a Note instance id
+
+    Notes:
+        Accepts a JSON body of the form:
+
+            {
+                "version": 7,
+                "patches": [{"start": 10, "end": 12, "text": "new"}, ...]
+            }
+
+        "version" is the version of the note the patches were made against,
+        and offsets refer to that version's text. If the note has changed
+        since, the edit is rejected with status 409 and the current version,
+        before the note's content is loaded.
+
+        Responds with the note's new version.
+
+    """
+
+    try:
+        data = json.loads(request.body)
+        version = int(data["version"])
+        patches = list(data["patches"])
+    except (ValueError, TypeError, KeyError) as error:
+        return JsonResponse({"status": "error", "message": str(error)}, status=400)
+
+    with transaction.atomic():
+        # lock the row and check the version, reading only the version column
+        current = (
+            Note.objects.select_for_update()
+            .filter(user=request.user, pk=id)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if current is None:
+            raise Http404("Record not found.")
+        if current != version:
+            return JsonResponse({"status": "conflict", "version": current}, status=409)
+
+        # the offsets count LF line breaks, as the browser shows the text,
+        # even in notes saved with CRLF before those were normalized
+        note = Note.objects.get(pk=id)
+        try:
+            note.note = apply_patches(normalize_newlines(note.note or ""), patches)
+        except (ValueError, TypeError, KeyError) as error:
+            return JsonResponse({"status": "error", "message": str(error)}, status=400)
+        note.save(update_fields=["note"])
+
+    return JsonResponse({"status": "ok", "version": note.version})
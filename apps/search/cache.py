@@ -0,0 +1,84 @@
+import threading
+
+from cachetools import TTLCache
+
+from apps.search.engines import SECTIONS
+from apps.search.version import get_version
+
+# the number of result pages kept per process
+PAGES_KEPT = 1024
+
+# the longest a page is served from the cache, in seconds
+PAGE_TTL = 60
+
+# pages are keyed by the user's search content version, so a write only
+# makes that user's pages unreachable, and they age out of the LRU cache;
+# the version is only shared by the worker processes if the default cache
+# is, see CACHES in config.settings, so pages also expire, which bounds how
+# long another worker can serve results from before a write
+_pages = TTLCache(maxsize=PAGES_KEPT, ttl=PAGE_TTL)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def normalize(text):
+    """Normalize search text, so trivially different searches share results."""
+    return " ".join((text or "").lower().split())
+
+
+def get_page(user, name, text, after=None, mode="text"):
+    """Return a page of search results from the cache, searching if needed.
+
+    Args:
+        user : a request customuser
+        name (str): the section searched, a key of SECTIONS
+        text (str): the search text, as entered
+        after (tuple): the position of the last row of the previous page
+        mode (str): "text" or "fuzzy"
+
+    Returns:
+        rows (list): the rows in the page
+        cursor (str): the cursor of the next page, or None
+
+    """
+
+    text = normalize(text)
+    key = (user.id, get_version(user.id), name, mode, text, after)
+
+    with _lock:
+        page = _pages.get(key)
+
+    if page is None:
+        _count("misses")
+        page = SECTIONS[name].page(user, text, after, mode=mode)
+        with _lock:
+            _pages[key] = page
+    else:
+        _count("hits")
+
+    return page
+
+
+def clear():
+    with _lock:
+        _pages.clear()
+
+
+def stats():
+    """Report the result cache hit and miss counts, and hit rate, for this process."""
+
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        rate = _stats["hits"] / lookups if lookups else 0.0
+        return {**_stats, "size": len(_pages), "hit_rate": rate}
+
+
+def reset_stats():
+    with _lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def _count(outcome):
+    with _lock:
+        _stats[outcome] += 1
@@ -0,0 +1,379 @@
+import base64
+import json
+import re
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connection, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from apps.contacts.models import Contact
+from apps.favorites.models import Favorite
+from apps.notes.fields import decompress
+from apps.notes.models import Note
+from apps.search.snippets import (
+    excerpt,
+    headline,
+    highlight_markers,
+    highlight_words,
+    window,
+)
+from apps.search.trigrams import TrigramIndex
+from apps.tasks.models import Task
+
+# the number of results shown per section, per page
+PAGE_SIZE = 20
+
+
+def words(text):
+    """Split search text into lower case words, the way search vectors are built.
+
+    Notes:
+        Punctuation separates words, matching app_search_text in the search
+        migrations, so "james@example.com" is searched as three words.
+
+    """
+    return re.findall(r"[^\W_]+", (text or "").lower())
+
+
+def full_text_query(text):
+    """Build a tsquery matching rows that contain every word, or a word starting with it.
+
+    Returns:
+        query (SearchQuery): the query, or None if the text has no words
+
+    """
+
+    terms = words(text)
+    if not terms:
+        return None
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, config="simple", search_type="raw")
+
+
+def fuzzy_threshold():
+    return getattr(settings, "SEARCH_FUZZY_THRESHOLD", 0.3)
+
+
+def encode_cursor(row):
+    """Encode the sort position of a result, so the next page can start after it."""
+    values = [row.rank, row.sort_key, row.id]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor made by encode_cursor.
+
+    Returns:
+        position (tuple): the rank, sort key and id of the last row shown
+
+    Raises:
+        ValueError: if the cursor is malformed
+
+    """
+
+    try:
+        rank, sort_key, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), str(sort_key), int(id)
+    except (TypeError, ValueError, UnicodeError) as error:
+        raise ValueError("Invalid cursor.") from error
+
+
+class Section:
+    """One kind of searchable item, e.g. the user's notes.
+
+    Attributes:
+        model (Model): the model searched
+        fields (list): the text fields searched by the substring fallback,
+            or none if the section is only searched in fuzzy mode
+        order (str): the field that orders results of equal rank
+        snippet (str): a long text field that results show a short
+            highlighted passage of, instead of loading the whole field
+        fuzzy_fields (list): the short text fields, e.g. names, compared
+            by trigram similarity in fuzzy mode
+        deferred (list): large fields that results never show, which are
+            left unloaded
+
+    Notes:
+        On PostgreSQL, rows are matched against their search_vector column,
+        which a trigger keeps current and a GIN index covers, and are ranked
+        by relevance. Elsewhere, e.g. for SQLite test runs, each field is
+        matched with icontains, as the search page always did.
+
+        A snippet field stored compressed, e.g. a large note, is NULL in its
+        own column, so the database can neither match nor slice it. Its
+        snippets are taken from the decompressed text instead, and on SQLite
+        the substring fallback decompresses the user's compressed rows to
+        match them. On PostgreSQL they are matched by their search_vector.
+
+        In fuzzy mode, rows are ranked by the trigram word similarity of the
+        search text to their fuzzy fields, so misspelled or partial names
+        still match. PostgreSQL uses pg_trgm and its GIN indexes; elsewhere
+        the user's rows are scored by an in-memory trigram index.
+
+        Results are ordered by rank, then by the order field, then by id, so
+        a page can be fetched by keyset, starting after the last row shown,
+        without counting or skipping the rows before it.
+
+    """
+
+    def __init__(
+        self, model, fields, order, snippet=None, fuzzy_fields=(), deferred=()
+    ):
+        self.model = model
+        self.fields = fields
+        self.order = order
+        self.snippet = snippet
+        self.fuzzy_fields = fuzzy_fields
+        self.deferred = deferred
+
+    def search(self, user, text, mode="text"):
+        """Find the user's rows that match the search text.
+
+        Args:
+            user : a request customuser
+            text (str): the search text entered by the user
+            mode (str): "text" to match words, or "fuzzy" to match similar names
+
+        Returns:
+            queryset (QuerySet): the matching rows, each annotated with "rank"
+                and "sort_key", best matches first
+
+        """
+
+        if mode == "fuzzy":
+            queryset = self.fuzzy(user, text, fuzzy_threshold())
+        elif connection.vendor == "postgresql":
+            queryset = self.full_text(user, text)
+        else:
+            queryset = self.substring(user, text)
+
+        queryset = queryset.annotate(sort_key=Coalesce(self.order, Value("")))
+        return queryset.order_by("-rank", "sort_key", "id")
+
+    def page(self, user, text, after=None, limit=PAGE_SIZE, mode="text"):
+        """Fetch one page of matching rows, with their folders, in one query.
+
+        Args:
+            user : a request customuser
+            text (str): the search text entered by the user
+            after (tuple): the position returned by decode_cursor, to start
+                after it, or None for the first page
+            limit (int): the number of rows in a page
+            mode (str): "text" or "fuzzy", as for search
+
+        Returns:
+            rows (list): the rows in the page, each with its folder loaded,
+                and, if the section has a snippet field, the highlighted
+                passage as "snippet"
+            cursor (str): the cursor of the next page, or None if this is
+                the last page
+
+        """
+
+        # the fuzzy threshold is set for the transaction only, see similar,
+        # so the search is built and run in one
+        with transaction.atomic():
+            queryset = self.search(user, text, mode).select_related("folder")
+            if self.deferred:
+                queryset = queryset.defer(*self.deferred)
+
+            if after is not None:
+                rank, sort_key, id = after
+                queryset = queryset.filter(
+                    Q(rank__lt=rank)
+                    | Q(rank=rank, sort_key__gt=sort_key)
+                    | Q(rank=rank, sort_key=sort_key, id__gt=id)
+                )
+
+            # one extra row tells whether there is another page
+            rows = list(queryset[: limit + 1])
+        cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            cursor = encode_cursor(rows[-1])
+
+        if self.snippet:
+            bodies = self.decompressed([row.pk for row in rows if row.snippet is None])
+            terms = words(text)
+            for row in rows:
+                if row.pk in bodies:
+                    snippet = excerpt(bodies[row.pk], terms)
+                    row.snippet = highlight_words(snippet, terms)
+                else:
+                    row.snippet = self.highlight(row.snippet, text, mode)
+
+        return rows, cursor
+
+    def compressed(self):
+        """The field that holds the snippet field's compressed values, if any."""
+        if not self.snippet:
+            return None
+        return getattr(self.model._meta.get_field(self.snippet), "compressed", None)
+
+    def decompressed(self, ids):
+        """Read the snippet field of the rows stored compressed.
+
+        Returns:
+            bodies (dict): the decompressed text of each compressed row, by id
+
+        """
+
+        compressed = self.compressed()
+        if not compressed or not ids:
+            return {}
+        stored = self.model.objects.filter(pk__in=ids).exclude(**{compressed: None})
+        stored = stored.values_list("pk", compressed)
+        return {pk: decompress(data) for pk, data in stored}
+
+    def highlight(self, snippet, text, mode):
+        if mode == "text" and connection.vendor == "postgresql":
+            return highlight_markers(snippet)
+        return highlight_words(snippet, words(text))
+
+    def nothing(self):
+        return self.model.objects.none().annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+    def full_text(self, user, text):
+        query = full_text_query(text)
+        if query is None or not self.fields:
+            return self.nothing()
+
+        # ts_rank is a real, which is widened so that a rank read back from a
+        # cursor compares equal to the rank in the database
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        queryset = self.model.objects.filter(user=user, search_vector=query)
+        queryset = queryset.annotate(rank=rank)
+
+        # ts_headline is costly enough that PostgreSQL only evaluates it
+        # for the rows that survive the LIMIT
+        if self.snippet:
+            queryset = queryset.annotate(snippet=headline(self.snippet, query))
+
+        return queryset
+
+    def substring(self, user, text):
+        if not text or not self.fields:
+            return self.nothing()
+
+        matches = reduce(or_, (Q(**{f"{field}__icontains": text}) for field in self.fields))
+        if self.compressed() and self.snippet in self.fields:
+            matches |= Q(pk__in=self.compressed_matches(user, text))
+        queryset = self.model.objects.filter(matches, user=user)
+        queryset = queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+        if self.snippet:
+            queryset = queryset.annotate(snippet=window(self.snippet, text))
+
+        return queryset
+
+    def compressed_matches(self, user, text):
+        """Find the user's compressed rows whose snippet field contains the text."""
+        compressed = self.compressed()
+        stored = self.model.objects.filter(user=user).exclude(**{compressed: None})
+        stored = stored.values_list("pk", compressed)
+        text = text.lower()
+        return [
+            pk for pk, data in stored.iterator() if text in decompress(data).lower()
+        ]
+
+    def fuzzy(self, user, text, threshold):
+        if not words(text) or not self.fuzzy_fields:
+            return self.nothing()
+
+        if connection.vendor == "postgresql":
+            queryset = self.similar(user, text, threshold)
+        else:
+            queryset = self.similar_in_memory(user, text, threshold)
+
+        # the search text is unlikely to appear verbatim, so the snippet
+        # is usually the start of the field
+        if self.snippet:
+            queryset = queryset.annotate(snippet=window(self.snippet, text))
+
+        return queryset
+
+    def similar(self, user, text, threshold):
+        # the %> operator, which the trigram indexes serve, compares against
+        # this threshold rather than taking one as an argument; it is set for
+        # the current transaction only, so it does not carry over to other
+        # requests on the same connection, and the queryset must be run in
+        # that transaction
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                [str(threshold)],
+            )
+
+        matches = reduce(
+            or_,
+            (Q(**{f"{field}__trigram_word_similar": text}) for field in self.fuzzy_fields),
+        )
+        scores = [TrigramWordSimilarity(text, field) for field in self.fuzzy_fields]
+        rank = Greatest(*scores) if len(scores) > 1 else scores[0]
+
+        queryset = self.model.objects.filter(matches, user=user)
+        return queryset.annotate(rank=Cast(rank, FloatField()))
+
+    def similar_in_memory(self, user, text, threshold):
+        index = TrigramIndex()
+        rows = self.model.objects.filter(user=user).values_list("id", *self.fuzzy_fields)
+        for id, *texts in rows.iterator():
+            index.add(id, *texts)
+
+        matches = index.search(text, threshold)
+        if not matches:
+            return self.nothing()
+
+        rank = Case(
+            *[When(pk=id, then=Value(score)) for id, score in matches.items()],
+            output_field=FloatField(),
+        )
+        queryset = self.model.objects.filter(user=user, pk__in=list(matches))
+        return queryset.annotate(rank=rank)
+
+
+SECTIONS = {
+    "favorites": Section(
+        Favorite,
+        ["name", "url", "description"],
+        "name",
+        fuzzy_fields=["name", "url"],
+        deferred=["search_vector"],
+    ),
+    "contacts": Section(
+        Contact,
+        [
+            "name",
+            "company",
+            "address",
+            "phone1",
+            "phone2",
+            "phone3",
+            "email",
+            "website",
+            "notes",
+        ],
+        "name",
+        fuzzy_fields=["name"],
+        deferred=["search_vector"],
+    ),
+    "notes": Section(
+        Note,
+        ["subject", "note"],
+        "subject",
+        snippet="note",
+        fuzzy_fields=["subject"],
+        deferred=["note", "note_compressed", "html", "search_vector"],
+    ),
+    "tasks": Section(Task, [], "title", fuzzy_fields=["title"]),
+}
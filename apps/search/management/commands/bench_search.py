@@ -0,0 +1,83 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.models import CustomUser
+from apps.notes.models import Note
+from apps.search.engines import SECTIONS, fuzzy_threshold
+
+WORDS = (
+    "garden invoice meeting recipe travel budget project python django "
+    "holiday reminder birthday insurance mortgage doctor school piano "
+    "library camera bicycle kitchen weekend release server backup"
+).split()
+
+QUERIES = ["invoice", "pian", "budget weekend", "zebra", "invocie"]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare full text, substring and fuzzy search over a large set of notes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=100_000)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Full text search needs PostgreSQL.")
+
+        # the notes are created in a transaction that is always rolled back
+        try:
+            with transaction.atomic():
+                self.run(options["notes"], options["rounds"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, count, rounds):
+        user = CustomUser.objects.create_user("bench_search", "bench@example.com")
+        generator = random.Random(0)
+
+        start = time.perf_counter()
+        notes = (
+            Note(
+                user=user,
+                subject=" ".join(generator.choices(WORDS, k=3)),
+                note=" ".join(generator.choices(WORDS, k=120)) + f" note{i}",
+            )
+            for i in range(count)
+        )
+        while True:
+            batch = [note for note, i in zip(notes, range(5000))]
+            if not batch:
+                break
+            Note.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE app_note")
+        self.stdout.write(f"created {count} notes in {time.perf_counter() - start:.1f} s")
+
+        section = SECTIONS["notes"]
+        threshold = fuzzy_threshold()
+        for text in QUERIES:
+            for name, search in [
+                ("full text", section.full_text),
+                ("substring", section.substring),
+                ("fuzzy", lambda user, text: section.fuzzy(user, text, threshold)),
+            ]:
+                timings = []
+                for i in range(rounds):
+                    start = time.perf_counter()
+                    queryset = search(user, text).order_by("-rank", "subject", "id")
+                    found = len(queryset[:50])
+                    timings.append(time.perf_counter() - start)
+                self.stdout.write(
+                    f"{text!r} {name}: {statistics.median(timings) * 1000:.1f} ms, "
+                    f"{found} shown (median of {rounds})"
+                )
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:10
+
+from django.db import migrations
+
+# Search vectors are built from text with punctuation replaced by spaces,
+# so that urls, emails and phone numbers are split into searchable words,
+# the same way search queries are split by apps.search.engines.
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION app_search_text(value text) RETURNS text AS $$
+    SELECT regexp_replace(coalesce(value, ''), '[^[:alnum:]]+', ' ', 'g');
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+DROP_SQL = """
+DROP FUNCTION IF EXISTS app_search_text(text);
+"""
+
+
+def create_search_text(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_text(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = []
+
+    operations = [
+        migrations.RunPython(create_search_text, drop_search_text),
+    ]
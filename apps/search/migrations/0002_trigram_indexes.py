@@ -0,0 +1,47 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:02
+
+from django.db import migrations
+
+# Fuzzy search compares trigrams of names, subjects, urls and task titles,
+# see apps.search.engines. GIN trigram indexes let PostgreSQL find similar
+# values without comparing every row.
+
+INDEXES = [
+    ("app_favorite", "name"),
+    ("app_favorite", "url"),
+    ("app_contact", "name"),
+    ("app_note", "subject"),
+    ("app_task", "title"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for table, column in INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx "
+            f"ON {table} USING gin ({column} gin_trgm_ops);"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, column in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm_idx;")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0001_search_text"),
+        ("contacts", "0006_contact_search_vector"),
+        ("favorites", "0009_favorite_search_vector"),
+        ("notes", "0007_note_search_vector"),
+        ("tasks", "0007_alter_task_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
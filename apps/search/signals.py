@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.contacts.models import Contact
+from apps.favorites.models import Favorite
+from apps.folders.models import Folder
+from apps.notes.models import Note
+from apps.search.version import bump_version
+from apps.tasks.models import Task
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Folder)
+@receiver(post_delete, sender=Folder)
+def item_changed(sender, instance, **kwargs):
+    """Invalidate the owner's search indexes and results when an item changes.
+
+    Notes:
+        Folders are included because results show each item's folder.
+
+    """
+    bump_version(instance.user_id)
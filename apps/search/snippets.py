@@ -0,0 +1,117 @@
+import re
+
+from django.contrib.postgres.search import SearchHeadline
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Lower, StrIndex, Substr
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# the longest snippet taken from the substring fallback, in characters, and
+# how much of it comes before the match
+SNIPPET_CHARS = 240
+SNIPPET_LEAD = 60
+
+# PostgreSQL marks matches with control characters, which are replaced by
+# <mark> tags once the rest of the snippet has been escaped
+START = "\x02"
+STOP = "\x03"
+
+
+def headline(field, query):
+    """Build an expression for a short passage of a field around its matches.
+
+    Args:
+        field (str): the text field the snippet is taken from
+        query (SearchQuery): the full text query
+
+    Notes:
+        ts_headline reads the whole field, but only for the rows in a page,
+        and sends back at most two fragments of about 30 words.
+
+    """
+
+    return SearchHeadline(
+        field,
+        query,
+        config="simple",
+        start_sel=START,
+        stop_sel=STOP,
+        max_words=30,
+        min_words=10,
+        max_fragments=2,
+        fragment_delimiter=" … ",
+    )
+
+
+def window(field, text):
+    """Build an expression for a bounded slice of a field around the search text.
+
+    Notes:
+        The slice starts shortly before the first case-insensitive occurrence
+        of the text, or at the start of the field if the text only matched
+        another field.
+
+    """
+
+    position = StrIndex(Lower(F(field)), Lower(Value(text)))
+    return Substr(field, Greatest(position - SNIPPET_LEAD, 1), SNIPPET_CHARS)
+
+
+def excerpt(text, words):
+    """Take a bounded slice of a text around the search words, as window does.
+
+    Args:
+        text (str): the full text, e.g. a decompressed note
+        words (list): the lower case search words
+
+    Returns:
+        snippet (str): SNIPPET_CHARS characters of the text, starting shortly
+            before the first occurrence of a word, or at the start of the text
+
+    """
+
+    lowered = text.lower()
+    positions = [lowered.find(word) for word in words]
+    position = min((p for p in positions if p >= 0), default=0)
+    start = max(position - SNIPPET_LEAD, 0)
+    return text[start : start + SNIPPET_CHARS]
+
+
+def highlight_markers(snippet):
+    """Escape a snippet from ts_headline and mark its matches."""
+    html = escape(snippet or "").replace(START, "<mark>").replace(STOP, "</mark>")
+    return mark_safe(html)
+
+
+def highlight_words(snippet, words):
+    """Escape a snippet and mark every occurrence of the search words.
+
+    Args:
+        snippet (str): the snippet, as taken by window
+        words (list): the lower case search words
+
+    Returns:
+        html (str): the escaped snippet with matches wrapped in <mark> tags
+
+    Notes:
+        The words are matched in a single pass over the snippet, longest
+        first, so a word inside a longer one is not marked twice.
+
+    """
+
+    snippet = snippet or ""
+    if not words:
+        return escape(snippet)
+
+    words = sorted(set(words), key=len, reverse=True)
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+
+    html = []
+    end = 0
+    for match in pattern.finditer(snippet):
+        html.append(escape(snippet[end : match.start()]))
+        html.append(f"<mark>{escape(match.group())}</mark>")
+        end = match.end()
+    html.append(escape(snippet[end:]))
+
+    return mark_safe("".join(html))
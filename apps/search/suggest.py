@@ -0,0 +1,234 @@
+import bisect
+import threading
+import time
+
+from cachetools import LRUCache
+from django.core.cache import cache
+
+from apps.contacts.models import Contact
+from apps.favorites.models import Favorite
+from apps.notes.models import Note
+from apps.search.engines import words
+from apps.search.version import get_version
+
+# the number of users whose prefix index is kept in memory
+INDEXES_KEPT = 128
+
+# the number of suggestions returned per section
+SUGGESTIONS = 5
+
+# the time a suggestion request may spend before returning what it has
+BUDGET = 0.05
+
+# the items suggested, with the fields that are indexed and the one shown
+SOURCES = {
+    "favorites": (Favorite, ["name", "url"], "name"),
+    "contacts": (Contact, ["name", "company"], "name"),
+    "notes": (Note, ["subject"], "subject"),
+}
+
+
+class Superseded(Exception):
+    """A newer suggestion request from the same user has arrived."""
+
+
+class PrefixIndex:
+    """A sorted array of the words of a user's names and subjects.
+
+    Notes:
+        Each word is stored with the item it came from, and the whole
+        label is stored too, so "jam" and "james cr" both find "James Craig".
+        A prefix lookup is a binary search followed by a scan of the words
+        that share the prefix.
+
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.keys = []
+        self.items = []
+
+    def build(self, entries):
+        """Fill the index from (key, item) pairs."""
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self.keys = [key for key, item in entries]
+        self.items = [item for key, item in entries]
+
+    def lookup(self, prefix, limit, deadline=None):
+        """Find the items with a word, or label, starting with the prefix.
+
+        Args:
+            prefix (str): the lower case text typed so far
+            limit (int): the most items returned per section
+            deadline (float): a time.monotonic() value after which the scan
+                stops and returns the items found so far
+
+        Returns:
+            found (dict): lists of (section, id, label, link) items,
+                keyed by section
+            complete (bool): False if the scan stopped at the deadline
+
+        """
+
+        found = {section: [] for section in SOURCES}
+        seen = set()
+        start = bisect.bisect_left(self.keys, prefix)
+
+        for i in range(start, len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                break
+            if deadline and i % 256 == 0 and time.monotonic() > deadline:
+                return found, False
+
+            item = self.items[i]
+            section = found[item[0]]
+            if item[:2] in seen or len(section) >= limit:
+                continue
+            seen.add(item[:2])
+            section.append(item)
+            if len(seen) == limit * len(found):
+                break
+
+        return found, True
+
+
+def link(section, row):
+    if section == "favorites":
+        return row["url"] or ""
+    return f"/{section}/{row['id']}"
+
+
+def entries(user, check=None):
+    """Generate the (key, item) pairs of a user's prefix index.
+
+    Args:
+        user : a request customuser
+        check (callable): called between sections, and may raise Superseded
+            to stop the build
+
+    """
+
+    for section, (model, fields, label) in SOURCES.items():
+        if check:
+            check()
+        rows = model.objects.filter(user=user).values("id", *fields)
+        for row in rows.iterator():
+            text = (row[label] or "").strip()
+            if not text:
+                continue
+            item = (section, row["id"], text, link(section, row))
+            keys = {" ".join(words(text))}
+            for field in fields:
+                keys.update(words(row[field]))
+            for key in keys:
+                yield key, item
+
+
+class SuggestionIndexes:
+    """Keeps a prefix index per user, rebuilt when the user's content changes.
+
+    Notes:
+        Indexes are kept per process, in an LRU cache. An index is rebuilt
+        lazily, by the first suggestion request after the user's search
+        content version changes.
+
+    """
+
+    def __init__(self, maxsize=INDEXES_KEPT):
+        self._indexes = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, user, check=None):
+        version = get_version(user.id)
+        with self._lock:
+            index = self._indexes.get(user.id)
+        if index is not None and index.version == version:
+            return index
+
+        index = PrefixIndex(version)
+        index.build(entries(user, check))
+        with self._lock:
+            self._indexes[user.id] = index
+            self.builds += 1
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+indexes = SuggestionIndexes()
+
+
+def sequence_key(user_id):
+    return f"search:suggest:sequence:{user_id}"
+
+
+def claim(user_id, sequence):
+    """Record a user's latest suggestion request.
+
+    Returns:
+        check (callable): raises Superseded once a request with a higher
+            sequence number has been claimed for the same user
+
+    Notes:
+        Browsers send a sequence number that increases with every keystroke,
+        and abort the previous request. The server cannot see the abort, so
+        an abandoned request instead stops when it notices a newer one.
+
+    """
+
+    key = sequence_key(user_id)
+    if sequence is None:
+        return lambda: None
+
+    latest = cache.get(key)
+    if latest is not None and latest > sequence:
+        raise Superseded
+    cache.set(key, sequence, 60)
+
+    def check():
+        latest = cache.get(key)
+        if latest is not None and latest > sequence:
+            raise Superseded
+
+    return check
+
+
+def suggest(user, text, sequence=None, limit=SUGGESTIONS, budget=BUDGET):
+    """Suggest the user's favorites, contacts and notes whose names start with the text.
+
+    Args:
+        user : a request customuser
+        text (str): the text typed so far
+        sequence (int): the client's request number, if it sends one
+        limit (int): the most suggestions per section
+        budget (float): seconds the lookup may take, not counting a rebuild
+
+    Returns:
+        found (dict): lists of suggestions, keyed by section, each a dict
+            with "id", "label" and "url"
+        complete (bool): False if the lookup ran out of time
+
+    Raises:
+        Superseded: if a newer request from the same user arrives first
+
+    """
+
+    check = claim(user.id, sequence)
+    prefix = " ".join(words(text))
+    if not prefix:
+        return {section: [] for section in SOURCES}, True
+
+    index = indexes.get(user, check)
+    check()
+
+    found, complete = index.lookup(prefix, limit, time.monotonic() + budget)
+    found = {
+        section: [
+            {"id": id, "label": label, "url": url} for section, id, label, url in items
+        ]
+        for section, items in found.items()
+    }
+    return found, complete
@@ -1,7 +1,21 @@
 import pytest
+from django.core.cache import cache
 from django.test import Client
 
 from accounts.models import CustomUser
+import apps.search.cache as search_cache
+from apps.search.suggest import indexes
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    indexes.clear()
+    search_cache.clear()
+    search_cache.reset_stats()
+    yield
+    cache.clear()
+    indexes.clear()
 
 
 @pytest.fixture
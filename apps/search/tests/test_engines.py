@@ -0,0 +1,50 @@
+import pytest
+
+from apps.contacts.models import Contact
+from apps.favorites.models import Favorite
+from apps.notes.models import Note
+from apps.search.engines import SECTIONS, full_text_query, words
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def test_words():
+    assert words("James.Craig@Gmail.com") == ["james", "craig", "gmail", "com"]
+    assert words("  --  ") == []
+    assert words(None) == []
+
+
+def test_full_text_query():
+    assert full_text_query("!!") is None
+    assert full_text_query("Tasks for") is not None
+
+
+def test_search(user):
+    Note.objects.create(user=user, subject="Zebra", note="about james")
+    Note.objects.create(user=user, subject="James", note="more text")
+    Note.objects.create(user=user, subject="Other", note="nothing here")
+
+    notes = SECTIONS["notes"].search(user, "James")
+    assert sorted(note.subject for note in notes) == ["James", "Zebra"]
+    # the subject is weighted above the body, and the fallback orders by subject,
+    # so either way the subject match comes first
+    assert notes[0].subject == "James"
+
+
+def test_search_prefix(user):
+    Favorite.objects.create(user=user, name="Google", url="https://www.google.com/")
+    Contact.objects.create(user=user, name="James Craig", email="james@example.com")
+
+    assert [f.name for f in SECTIONS["favorites"].search(user, "goo")] == ["Google"]
+    assert [c.name for c in SECTIONS["contacts"].search(user, "exam")] == ["James Craig"]
+
+
+def test_search_own_rows(user):
+    other = user.__class__.objects.create_user("Other", "other@gmail.com", "secret")
+    Note.objects.create(user=other, subject="James", note="")
+    assert list(SECTIONS["notes"].search(user, "James")) == []
+
+
+def test_search_empty(user):
+    Note.objects.create(user=user, subject="James", note="")
+    assert list(SECTIONS["notes"].search(user, "")) == []
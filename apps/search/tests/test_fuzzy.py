@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+
+from apps.contacts.models import Contact
+from apps.favorites.models import Favorite
+from apps.search.engines import SECTIONS
+from apps.search.trigrams import TrigramIndex, trigrams, word_similarity, word_trigrams
+from apps.tasks.models import Task
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def test_trigrams():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert word_trigrams("Cat-Dog") == trigrams("cat") | trigrams("dog")
+
+
+def test_word_similarity():
+    name = word_trigrams("James Craig")
+    assert word_similarity(word_trigrams("james"), name) == 1.0
+    assert word_similarity(word_trigrams("jmes"), name) > 0.5
+    assert word_similarity(word_trigrams("zebra"), name) < 0.3
+
+
+def test_index():
+    index = TrigramIndex()
+    index.add(1, "James Craig", "https://example.com/")
+    index.add(2, "Ollie")
+    matches = index.search("jaems", 0.3)
+    assert list(matches) == [1]
+
+
+def test_fuzzy_contacts(user):
+    Contact.objects.create(user=user, name="James Craig")
+    Contact.objects.create(user=user, name="Ollie Cat")
+
+    rows, cursor = SECTIONS["contacts"].page(user, "Jmes Criag", mode="fuzzy")
+    assert [row.name for row in rows] == ["James Craig"]
+
+
+def test_fuzzy_ranking(user):
+    Favorite.objects.create(user=user, name="Google Maps", url="https://maps.google.com/")
+    Favorite.objects.create(user=user, name="Gogle", url="https://example.com/")
+
+    rows, cursor = SECTIONS["favorites"].page(user, "gogle", mode="fuzzy")
+    assert [row.name for row in rows][0] == "Gogle"
+
+
+def test_fuzzy_threshold(user, settings):
+    Task.objects.create(user=user, title="Renew passport")
+
+    settings.SEARCH_FUZZY_THRESHOLD = 0.3
+    assert len(SECTIONS["tasks"].page(user, "pasport", mode="fuzzy")[0]) == 1
+
+    settings.SEARCH_FUZZY_THRESHOLD = 0.99
+    assert len(SECTIONS["tasks"].page(user, "pasport", mode="fuzzy")[0]) == 0
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="needs pg_trgm")
+def test_fuzzy_threshold_not_kept(user, settings):
+    settings.SEARCH_FUZZY_THRESHOLD = 0.99
+    SECTIONS["tasks"].page(user, "pasport", mode="fuzzy")
+
+    # the threshold was set for the search's transaction only
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT current_setting('pg_trgm.word_similarity_threshold')")
+        assert float(cursor.fetchone()[0]) != 0.99
+
+
+def test_fuzzy_results(user, client):
+    Task.objects.create(user=user, title="Renew passport")
+
+    response = client.get("/search/results", {"q": "pasport", "mode": "fuzzy"})
+    assert [task.title for task in response.context["tasks"]] == ["Renew passport"]
+
+    response = client.get("/search/results", {"q": "pasport"})
+    assert "tasks" not in response.context
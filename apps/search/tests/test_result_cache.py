@@ -0,0 +1,80 @@
+import pytest
+from cachetools import TTLCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import apps.search.cache as search_cache
+from accounts.models import CustomUser
+from apps.notes.models import Note
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def test_normalize():
+    assert search_cache.normalize("  Tax \t Return ") == "tax return"
+    assert search_cache.normalize(None) == ""
+
+
+def test_repeated_search(user):
+    Note.objects.create(user=user, subject="Tax return", note="")
+
+    rows, cursor = search_cache.get_page(user, "notes", "tax")
+    assert [row.subject for row in rows] == ["Tax return"]
+
+    rows, cursor = search_cache.get_page(user, "notes", " TAX ")
+    assert [row.subject for row in rows] == ["Tax return"]
+    assert search_cache.stats()["hits"] == 1
+    assert search_cache.stats()["misses"] == 1
+    assert search_cache.stats()["hit_rate"] == 0.5
+
+
+def test_write_invalidates_own_entries(user):
+    other = CustomUser.objects.create_user("Other", "other@gmail.com", "secret")
+    search_cache.get_page(user, "notes", "dentist")
+    search_cache.get_page(other, "notes", "dentist")
+
+    Note.objects.create(user=user, subject="Dentist", note="")
+
+    rows, cursor = search_cache.get_page(user, "notes", "dentist")
+    assert [row.subject for row in rows] == ["Dentist"]
+    search_cache.get_page(other, "notes", "dentist")
+    assert search_cache.stats()["hits"] == 1
+
+
+def test_eviction(user, monkeypatch):
+    monkeypatch.setattr(search_cache, "_pages", TTLCache(maxsize=2, ttl=60))
+
+    search_cache.get_page(user, "notes", "a")
+    search_cache.get_page(user, "notes", "b")
+    search_cache.get_page(user, "notes", "a")
+    search_cache.get_page(user, "notes", "c")
+    search_cache.get_page(user, "notes", "a")
+    search_cache.get_page(user, "notes", "b")
+
+    assert search_cache.stats()["size"] == 2
+    assert search_cache.stats()["hits"] == 2
+    assert search_cache.stats()["misses"] == 4
+
+
+def test_results_cached(client, user):
+    Note.objects.create(user=user, subject="Tax return", note="")
+    client.get("/search/results", {"q": "tax"})
+
+    # only the session and user are loaded, and the session saved
+    with CaptureQueriesContext(connection) as context:
+        response = client.get("/search/results", {"q": "Tax"})
+    tables = ("app_favorite", "app_contact", "app_note")
+    for query in context.captured_queries:
+        assert not any(table in query["sql"] for table in tables)
+    assert [note.subject for note in response.context["notes"]] == ["Tax return"]
+
+
+def test_pages_expire(user, monkeypatch):
+    now = [0.0]
+    pages = TTLCache(maxsize=2, ttl=search_cache.PAGE_TTL, timer=lambda: now[0])
+    monkeypatch.setattr(search_cache, "_pages", pages)
+
+    search_cache.get_page(user, "notes", "a")
+    now[0] += search_cache.PAGE_TTL + 1
+    search_cache.get_page(user, "notes", "a")
+    assert search_cache.stats()["misses"] == 2
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytest_django.asserts import assertTemplateUsed
 
@@ -6,6 +8,7 @@ from apps.contacts.models import Contact
 from apps.favorites.models import Favorite
 from apps.folders.models import Folder
 from apps.notes.models import Note
+from apps.search.engines import PAGE_SIZE
 
 pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
 
@@ -47,23 +50,87 @@ def test_results(user, client):
         folder=contact_folder,
     )
 
-    data = {
-        "search_text": "James",
-    }
-
-    response = client.post("/search/results", data)
+    response = client.get("/search/results", {"q": "James"})
     assert response.status_code == 200
     assertTemplateUsed(response, "search/content.html")
     assertTemplateUsed(response, "search/results.html")
 
     favorites = response.context["favorites"]
-    favorite = favorites.filter(name="Google").get()
+    favorite = [favorite for favorite in favorites if favorite.name == "Google"][0]
     assert favorite.name == "Google"
+    assert favorite.folder == favorite_folder
 
-    note = response.context["notes"]
-    note = note.filter(pk=1).get()
+    note = [note for note in response.context["notes"] if note.pk == 1][0]
     assert note.subject == "Tasks for James"
 
     contact = response.context["contacts"]
-    contact = contact.filter(name="James Craig").get()
+    contact = [contact for contact in contact if contact.name == "James Craig"][0]
     assert contact.name == "James Craig"
+
+
+def test_results_post_redirects(user, client):
+    response = client.post("/search/results", {"search_text": "James Craig"})
+    assert response.status_code == 302
+    assert response.url == "/search/results?q=James+Craig"
+
+
+@pytest.fixture
+def many_rows(user):
+    folder = Folder.objects.create(user=user, name="Folder", page="notes")
+    Favorite.objects.bulk_create(
+        Favorite(user=user, folder=folder, name=f"Alpha {i}") for i in range(1000)
+    )
+    Contact.objects.bulk_create(
+        Contact(user=user, folder=folder, name=f"Alpha {i}") for i in range(1000)
+    )
+    Note.objects.bulk_create(
+        Note(user=user, folder=folder, subject=f"Alpha {i}", note="text")
+        for i in range(1000)
+    )
+
+
+def test_results_query_count(client, many_rows):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get("/search/results", {"q": "alpha"})
+
+    # one query per section, with its folders joined, besides the queries
+    # that load the user and load and save the session; without PostgreSQL,
+    # compressed notes are read to match them too
+    tables = ('FROM "app_favorite"', 'FROM "app_contact"', 'FROM "app_note"')
+    searches = [
+        query
+        for query in context.captured_queries
+        if any(table in query["sql"] for table in tables)
+    ]
+    assert len(searches) == (3 if connection.vendor == "postgresql" else 4)
+    assert len(response.context["notes"]) == PAGE_SIZE
+    assert response.context["notes"][0].folder.name == "Folder"
+    assert response.context["notes_next"]
+
+
+def test_results_pages(client, many_rows):
+    seen = []
+    after = None
+    while True:
+        data = {"q": "alpha", "section": "contacts"}
+        if after:
+            data["after"] = after
+        response = client.get("/search/results", data)
+        assert "notes" not in response.context
+        seen += [contact.name for contact in response.context["contacts"]]
+        after = response.context["contacts_next"]
+        if not after:
+            break
+
+    assert len(seen) == len(set(seen)) == 1000
+
+
+def test_results_bad_request(client):
+    response = client.get("/search/results", {"q": "a", "section": "bogus"})
+    assert response.status_code == 404
+    response = client.get("/search/results", {"q": "a", "after": "!!"})
+    assert response.status_code == 400
+    response = client.get(
+        "/search/results", {"q": "a", "section": "notes", "after": "!!"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+import pytest
+
+from apps.notes.models import Note
+from apps.search.engines import SECTIONS
+from apps.search.snippets import SNIPPET_CHARS, highlight_markers, highlight_words
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def test_highlight_markers():
+    html = highlight_markers("see \x02James\x03 <b>now</b>")
+    assert html == "see <mark>James</mark> &lt;b&gt;now&lt;/b&gt;"
+
+
+def test_highlight_words():
+    html = highlight_words("Jam & James <i>", ["james", "jam"])
+    assert html == "<mark>Jam</mark> &amp; <mark>James</mark> &lt;i&gt;"
+    assert highlight_words("<b>", []) == "&lt;b&gt;"
+
+
+def test_note_snippet(user):
+    body = "filler " * 5000 + "the secret word " + "filler " * 5000
+    Note.objects.create(user=user, subject="Long", note=body)
+
+    rows, cursor = SECTIONS["notes"].page(user, "secret")
+    snippet = rows[0].snippet
+    assert "<mark>secret</mark>" in snippet
+    assert len(snippet) < SNIPPET_CHARS + 100
+
+
+def test_results_snippet(user, client):
+    body = "# Heading\n\n" + "words " * 20000 + "needle"
+    Note.objects.create(user=user, subject="Haystack", note=body)
+
+    response = client.get("/search/results", {"q": "needle"})
+    snippet = response.context["notes"][0].snippet
+    assert "<mark>needle</mark>" in snippet
+    assert "<h1>" not in snippet
+    assert f'<td class="note">{snippet}'.encode() in response.content
+    assert len(response.content) < len(body)
@@ -0,0 +1,85 @@
+import pytest
+
+from apps.contacts.models import Contact
+from apps.favorites.models import Favorite
+from apps.notes.models import Note
+from apps.search.suggest import PrefixIndex, Superseded, indexes, suggest
+
+pytestmark = pytest.mark.django_db(transaction=True, reset_sequences=True)
+
+
+def labels(found, section):
+    return [item["label"] for item in found[section]]
+
+
+def test_prefix_index():
+    index = PrefixIndex(1)
+    item = ("contacts", 1, "James Craig", "/contacts/1")
+    index.build([("james craig", item), ("james", item), ("craig", item)])
+
+    found, complete = index.lookup("cra", 5)
+    assert complete
+    assert found["contacts"] == [item]
+
+    found, complete = index.lookup("james c", 5)
+    assert found["contacts"] == [item]
+
+    found, complete = index.lookup("x", 5)
+    assert found["contacts"] == []
+
+
+def test_suggest(user):
+    Favorite.objects.create(user=user, name="Google", url="https://google.com/")
+    Contact.objects.create(user=user, name="James Craig", company="Goodyear")
+    Note.objects.create(user=user, subject="Gold prices", note="")
+    Note.objects.create(user=user, subject="Silver", note="")
+
+    found, complete = suggest(user, "go")
+    assert complete
+    assert labels(found, "favorites") == ["Google"]
+    assert labels(found, "contacts") == ["James Craig"]
+    assert labels(found, "notes") == ["Gold prices"]
+    assert found["favorites"][0]["url"] == "https://google.com/"
+    assert found["notes"][0]["url"] == "/notes/1"
+
+
+def test_suggest_limit(user):
+    for i in range(20):
+        Note.objects.create(user=user, subject=f"Tax {i}", note="")
+
+    found, complete = suggest(user, "tax", limit=3)
+    assert len(found["notes"]) == 3
+
+
+def test_rebuild_on_change(user, django_assert_num_queries):
+    Note.objects.create(user=user, subject="Dentist", note="")
+    suggest(user, "den")
+    builds = indexes.builds
+
+    with django_assert_num_queries(0):
+        suggest(user, "dent")
+    assert indexes.builds == builds
+
+    Note.objects.create(user=user, subject="Denver trip", note="")
+    found, complete = suggest(user, "den")
+    assert indexes.builds == builds + 1
+    assert labels(found, "notes") == ["Dentist", "Denver trip"]
+
+
+def test_superseded(user):
+    suggest(user, "a", sequence=5)
+    with pytest.raises(Superseded):
+        suggest(user, "ab", sequence=4)
+
+
+def test_suggest_view(client):
+    response = client.get("/search/suggest", {"q": "x", "seq": "10"})
+    assert response.status_code == 200
+    assert response.json()["seq"] == 10
+    assert response.json()["results"]["notes"] == []
+
+    response = client.get("/search/suggest", {"q": "x", "seq": "9"})
+    assert response.status_code == 409
+
+    response = client.get("/search/suggest", {"q": "x", "seq": "nine"})
+    assert response.status_code == 400
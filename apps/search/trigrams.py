@@ -0,0 +1,84 @@
+import re
+from collections import defaultdict
+
+
+def trigrams(word):
+    """List the trigrams of a word the way pg_trgm does.
+
+    Notes:
+        The word is padded with two spaces in front and one behind, so
+        "cat" has the trigrams "  c", " ca", "cat" and "at ".
+
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def word_trigrams(text):
+    """Collect the trigrams of every word in a text, lower cased."""
+    grams = set()
+    for word in re.findall(r"[^\W_]+", (text or "").lower()):
+        grams |= trigrams(word)
+    return grams
+
+
+def word_similarity(query, grams):
+    """Measure how much of the query's trigrams a text contains, from 0 to 1.
+
+    Notes:
+        This approximates pg_trgm's word_similarity: a short query scores
+        well against a long name that contains it, or a misspelling of it.
+
+    """
+    if not query:
+        return 0.0
+    return len(query & grams) / len(query)
+
+
+class TrigramIndex:
+    """An in-memory trigram index over short texts, for fuzzy matching.
+
+    Notes:
+        Serves fuzzy search where PostgreSQL's pg_trgm is not available.
+        The inverted index narrows the candidates to texts sharing at least
+        one trigram with the query, so only those are scored.
+
+    """
+
+    def __init__(self):
+        self.grams = {}
+        self.postings = defaultdict(set)
+
+    def add(self, key, *texts):
+        """Index the texts of an item, e.g. a contact's name, under its key."""
+        grams = set()
+        for text in texts:
+            grams |= word_trigrams(text)
+        self.grams[key] = grams
+        for gram in grams:
+            self.postings[gram].add(key)
+
+    def search(self, text, threshold):
+        """Find the items similar to a text.
+
+        Args:
+            text (str): the search text
+            threshold (float): the least similarity reported
+
+        Returns:
+            matches (dict): similarity, keyed by item key
+
+        """
+
+        query = word_trigrams(text)
+        candidates = set()
+        for gram in query:
+            candidates |= self.postings.get(gram, set())
+
+        matches = {}
+        for key in candidates:
+            score = word_similarity(query, self.grams[key])
+            if score >= threshold:
+                matches[key] = score
+
+        return matches
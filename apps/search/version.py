@@ -0,0 +1,40 @@
+import time
+
+from django.core.cache import cache
+
+
+def version_key(user_id):
+    return f"search:version:{user_id}"
+
+
+def get_version(user_id):
+    """Get the version of the user's searchable content.
+
+    Args:
+        user_id (int): a CustomUser instance id
+
+    Returns:
+        version (int): the current content version
+
+    Notes:
+        As with the home page version, a missing version is seeded with the
+        current time, so it never repeats a version seen before eviction.
+
+    """
+
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate everything derived from the user's searchable content."""
+
+    key = version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
@@ -1,12 +1,13 @@
-import markdown
+from urllib.parse import urlencode
+
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.shortcuts import render
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
 
-from apps.contacts.models import Contact
-from apps.favorites.models import Favorite
-from apps.folders.models import Folder
-from apps.notes.models import Note
+import apps.search.cache as search_cache
+import apps.search.suggest as suggestions
+from apps.search.engines import SECTIONS, decode_cursor
 
 
 @login_required
@@ -23,50 +24,93 @@ def index(request):
 
 @login_required
 def results(request):
-    """Run the search query and display the results."""
+    """Run the search query and display the results.
+
+    Notes:
+        The query is sent as "q" in the query string, so results can be
+        bookmarked. Each section shows one page of results, with a link to its
+        next page, which is requested with "section" and "after", the cursor
+        of the last row shown.
+
+        With "mode=fuzzy", names, subjects, urls and task titles are matched
+        by similarity instead, so misspelled or half-remembered names match.
+
+        Notes are shown as short highlighted snippets around the matches;
+        the full note is only rendered when it is opened.
+
+        Pages are cached per user until the user's searchable content changes,
+        for at most a minute.
+
+        Searches posted by older forms are redirected to the same query.
+
+    """
+
+    if request.method == "POST":
+        query = urlencode({"q": request.POST.get("search_text", "")})
+        return redirect(f"{reverse('search-results')}?{query}")
 
     user = request.user
-    text = request.POST.get("search_text")
-
-    favorites = Favorite.objects.filter(user=user)
-    favorites = favorites.filter(
-        Q(name__icontains=text)
-        | Q(url__icontains=text)
-        | Q(description__icontains=text)
-    ).order_by("name")
-    for favorite in favorites:
-        favorite.folder = Folder.objects.filter(pk=favorite.folder_id).first()
-
-    contacts = Contact.objects.filter(user=user)
-    contacts = contacts.filter(
-        Q(name__contains=text)
-        | Q(company__icontains=text)
-        | Q(address__icontains=text)
-        | Q(phone1__icontains=text)
-        | Q(phone2__icontains=text)
-        | Q(phone3__icontains=text)
-        | Q(email__icontains=text)
-        | Q(website__icontains=text)
-        | Q(notes__icontains=text)
-    ).order_by("name")
-    for contact in contacts:
-        contact.folder = Folder.objects.filter(pk=contact.folder_id).first()
-
-    notes = Note.objects.filter(user=user)
-    notes = notes.filter(Q(subject__icontains=text) | Q(note__icontains=text)).order_by(
-        "subject"
-    )
-    for note in notes:
-        note.folder = Folder.objects.filter(pk=note.folder_id).first()
-        note.note = markdown.markdown(note.note)
+    text = request.GET.get("q", "")
+    section = request.GET.get("section")
+    mode = "fuzzy" if request.GET.get("mode") == "fuzzy" else "text"
+
+    if section is not None and section not in SECTIONS:
+        raise Http404("Unknown search section.")
+
+    # a malformed cursor is rejected with or without a section, though only
+    # the page of a single section starts after it
+    after = None
+    if request.GET.get("after"):
+        try:
+            after = decode_cursor(request.GET["after"])
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor.")
+        if not section:
+            after = None
 
     context = {
         "page": "search",
         "action": "/search/results",
         "results": True,
-        "favorites": favorites,
-        "contacts": contacts,
-        "notes": notes,
+        "text": text,
+        "section": section,
+        "mode": mode,
     }
 
+    names = [section] if section else SECTIONS
+    for name in names:
+        if mode == "text" and not SECTIONS[name].fields:
+            continue
+        rows, cursor = search_cache.get_page(user, name, text, after, mode)
+        context[name] = rows
+        context[f"{name}_next"] = cursor
+
     return render(request, "search/content.html", context)
+
+
+@login_required
+def suggest(request):
+    """Suggest items as the user types, as JSON.
+
+    Notes:
+        Takes the text typed so far as "q" and, optionally, an increasing
+        "seq" number per keystroke. A request overtaken by a newer one from
+        the same user is answered with status 409 and no suggestions.
+
+    """
+
+    try:
+        sequence = int(request.GET["seq"]) if request.GET.get("seq") else None
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid seq."}, status=400)
+
+    try:
+        found, complete = suggestions.suggest(
+            request.user, request.GET.get("q", ""), sequence
+        )
+    except suggestions.Superseded:
+        return JsonResponse({"status": "superseded", "seq": sequence}, status=409)
+
+    return JsonResponse(
+        {"status": "ok", "seq": sequence, "complete": complete, "results": found}
+    )
@@ -1,12 +1,12 @@
-import json
-
-import google.oauth2.credentials
 import google_auth_oauthlib.flow
 import requests
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 
+from accounts.google import SCOPES, client_config, credential_manager, load_credentials
+from apps.home.google import clear_events
+
 
 @login_required
 def index(request):
@@ -43,12 +43,9 @@ def google_login(request):
     redirect_uri = "https://" + request.get_host() + "/settings/google/store"
 
     # builds the url to go to in order to obtain the authorization code
-    flow = google_auth_oauthlib.flow.Flow.from_client_secrets_file(
-        "/home/james/.google/cp.json",
-        scopes=[
-            "https://www.googleapis.com/auth/calendar",
-            "https://www.googleapis.com/auth/contacts",
-        ],
+    flow = google_auth_oauthlib.flow.Flow.from_client_config(
+        client_config(),
+        scopes=SCOPES,
     )
     flow.redirect_uri = redirect_uri
 
@@ -80,12 +77,9 @@ def google_store(request):
     pwd = settings.BASE_DIR
 
     state = request.session["state"]
-    flow = google_auth_oauthlib.flow.Flow.from_client_secrets_file(
-        "/home/james/.google/cp.json",
-        scopes=[
-            "https://www.googleapis.com/auth/calendar",
-            "https://www.googleapis.com/auth/contacts",
-        ],
+    flow = google_auth_oauthlib.flow.Flow.from_client_config(
+        client_config(),
+        scopes=SCOPES,
         state=state,
     )
     flow.redirect_uri = redirect_uri
@@ -102,6 +96,10 @@ def google_store(request):
     user.google_credentials = google_credentials_json
     user.save()
 
+    # discard any credentials and events kept for a previously linked account
+    credential_manager.forget(user.id)
+    clear_events(user.id)
+
     return redirect("/settings")
 
 
@@ -114,13 +112,9 @@ def google_logout(request):
         Then deletes the user's code from the database.
     """
 
-    # get / build the user credentials
+    # get the user credentials, without refreshing a token about to be revoked
     user = request.user
-    credentials = user.google_credentials
-    credentials = json.loads(credentials)
-    credentials = google.oauth2.credentials.Credentials.from_authorized_user_info(
-        credentials
-    )
+    credentials = load_credentials(user.google_credentials)
 
     # use the credentials to revoke access
     requests.post(
@@ -132,6 +126,8 @@ def google_logout(request):
     # delete the credentials from the database
     user.google_credentials = None
     user.save()
+    credential_manager.forget(user.id)
+    clear_events(user.id)
 
     return redirect("/settings")
 
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.humanize",
+    "django.contrib.postgres",
     "mathfilters",
     "crispy_forms",
     "crispy_bootstrap5",
@@ -54,6 +55,7 @@ INSTALLED_APPS = [
     "apps.contacts",
     "apps.lab",
     "apps.notes",
+    "apps.finance",
     "apps.search",
     "apps.settings",
 ]
@@ -186,10 +188,34 @@ SESSION_COOKIE_AGE = 1209600 * 4
 SESSION_SAVE_EVERY_REQUEST = True
 
 
+# the cached home page fragments, and the data versions that invalidate them,
+# must be shared by every worker process, so production names a shared
+# backend in settings_local, e.g. a DatabaseCache made with
+# "manage.py createcachetable" or a RedisCache; the per-process default is
+# only for development, see apps.home.checks
+CACHES = getattr(
+    settings_local,
+    "CACHES",
+    {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# fuzzy search only shows items at least this similar to the search text,
+# from 0 to 1, see apps.search.engines
+SEARCH_FUZZY_THRESHOLD = 0.3
+
+# note bodies larger than this, in bytes, are stored compressed,
+# see apps.notes.fields
+NOTE_COMPRESS_THRESHOLD = 64 * 1024
+
+# the refresh_quotes command fetches the finance quotes this often, in seconds,
+# see apps.finance.quotes
+QUOTE_REFRESH_SECONDS = 60
+
 LOGGING = {
 
     # The version number of our log
@@ -32,6 +32,7 @@ urlpatterns = [
         "home/favorite/<int:id>/<str:direction>/", home.favorite, name="home-favorite"
     ),
     path("home/toggle/<str:section>", home.toggle, name="home-toggle"),
+    path("home/layout/", home.layout, name="home-layout"),
     # favorites
     path("favorites/", favorites.index, name="favorites"),
     path("favorites/add", favorites.add, name="favorites-add"),
@@ -65,6 +66,10 @@ urlpatterns = [
     path("notes/add", notes.add, name="notes-add"),
     path("notes/<int:id>/edit", notes.edit, name="notes-edit"),
     path("notes/<int:id>/delete", notes.delete, name="notes-delete"),
+    path("notes/<int:id>/autosave", notes.autosave, name="notes-autosave"),
+    path("notes/<int:id>/revisions", notes.revisions, name="notes-revisions"),
+    path("notes/<int:id>/revisions/<int:number>", notes.revision, name="notes-revision"),
+    path("notes/<int:id>/revisions/<int:number>/restore", notes.restore, name="notes-restore"),
     # weather
     path("weather/", weather.index, name="weather"),
     path("weather/zip", weather.zip, name="weather-zip"),
@@ -74,9 +79,15 @@ urlpatterns = [
     path("securities/", finance.securities, name="securities"),
     path("securities/<str:ord>", finance.securities, name="securities"),
     path("positions/", finance.positions, name="positions"),
+    path("positions/add", finance.position_add, name="positions-add"),
+    path("positions/<int:id>/delete", finance.position_delete, name="positions-delete"),
+    path("prices/<str:kind>/<str:symbol>", finance.prices, name="prices"),
+    path("watchlist/<str:kind>/add", finance.watch, name="watchlist-add"),
+    path("watchlist/<str:kind>/<str:symbol>/remove", finance.unwatch, name="watchlist-remove"),
     # search
     path("search/", search.index, name="search"),
     path("search/results", search.results, name="search-results"),
+    path("search/suggest", search.suggest, name="search-suggest"),
     # settings
     path("settings/", settings.index, name="settings"),
     path("settings/google/login", settings.google_login, name="settings-google-login"),
@@ -58,3 +58,56 @@ function hideEditFolderForm(folderId){
 
     }, 1000);
 }
+
+
+function homeMove(link)
+{
+    // move a folder or favorite, and swap in only the columns that changed
+    fetch(link.href + '?partial=1')
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (html) {
+            var template = document.createElement('template');
+            template.innerHTML = html;
+            var columns = template.content.querySelectorAll('.home-column');
+            for (var i = 0; i < columns.length; i++) {
+                var current = document.getElementById(columns[i].id);
+                if (current) {
+                    current.replaceWith(columns[i]);
+                }
+            }
+        })
+        .catch(function () {
+            window.location = link.href;
+        });
+    return false;
+}
+
+
+function homeToggle(link, sectionId)
+{
+    // toggle a home page section, and swap in its new state
+    fetch(link.href + '?partial=1')
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (html) {
+            var section = document.getElementById(sectionId);
+            if (html.trim()) {
+                section.outerHTML = html;
+            } else {
+                section.remove();
+            }
+        })
+        .catch(function () {
+            window.location = link.href;
+        });
+    return false;
+}
@@ -0,0 +1,71 @@
+// autosave for the note edit form, which is marked with data-autosave
+
+var AUTOSAVE_INTERVAL = 3000;
+
+function notePatch(saved, text)
+{
+    // a single replacement covering everything between the common prefix
+    // and the common suffix of the saved and the current text
+    var saved_chars = Array.from(saved);
+    var chars = Array.from(text);
+    var start = 0;
+    while (start < saved_chars.length && start < chars.length &&
+           saved_chars[start] === chars[start]) {
+        start++;
+    }
+    var end = 0;
+    while (end < saved_chars.length - start && end < chars.length - start &&
+           saved_chars[saved_chars.length - 1 - end] === chars[chars.length - 1 - end]) {
+        end++;
+    }
+    return {
+        start: start,
+        end: saved_chars.length - end,
+        text: chars.slice(start, chars.length - end).join('')
+    };
+}
+
+function noteAutosave(form)
+{
+    var textarea = form.querySelector('textarea[name="note"]');
+    var token = form.querySelector('input[name="csrfmiddlewaretoken"]').value;
+    var saved = textarea.value;
+    var version = parseInt(form.dataset.version, 10);
+    var saving = false;
+
+    var timer = setInterval(function () {
+        var text = textarea.value;
+        if (saving || text === saved) {
+            return;
+        }
+        saving = true;
+
+        fetch(form.dataset.autosave, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json', 'X-CSRFToken': token},
+            body: JSON.stringify({version: version, patches: [notePatch(saved, text)]})
+        })
+            .then(function (response) {
+                return response.json().then(function (data) {
+                    if (response.status === 409) {
+                        // someone else saved the note; stop, and let the
+                        // form post decide
+                        clearInterval(timer);
+                        alert('This note was changed elsewhere. Autosave is off.');
+                    } else if (response.ok) {
+                        saved = text;
+                        version = data.version;
+                        form.dataset.version = version;
+                    }
+                });
+            })
+            .catch(function () {})
+            .finally(function () {
+                saving = false;
+            });
+    }, AUTOSAVE_INTERVAL);
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('form[data-autosave]').forEach(noteAutosave);
+});
@@ -0,0 +1,60 @@
+// suggestions for search boxes marked with a data-suggest attribute
+
+var suggestRequest = null;
+
+function suggestUrl(text, sequence)
+{
+    return '/search/suggest?q=' + encodeURIComponent(text) + '&seq=' + sequence;
+}
+
+function showSuggestions(input, data)
+{
+    var list = input.parentNode.querySelector('.search-suggestions');
+    if (!list) {
+        list = document.createElement('div');
+        list.className = 'search-suggestions list-group';
+        input.insertAdjacentElement('afterend', list);
+    }
+    list.innerHTML = '';
+
+    Object.keys(data.results).forEach(function (section) {
+        data.results[section].forEach(function (item) {
+            var link = document.createElement('a');
+            link.className = 'list-group-item list-group-item-action';
+            link.href = item.url;
+            link.textContent = item.label;
+            link.dataset.section = section;
+            list.appendChild(link);
+        });
+    });
+}
+
+function suggest(input)
+{
+    // abort the previous request, and number this one, so the server can
+    // stop work on any request it has already started
+    if (suggestRequest) {
+        suggestRequest.abort();
+    }
+    suggestRequest = new AbortController();
+
+    fetch(suggestUrl(input.value, Date.now()), {signal: suggestRequest.signal})
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        })
+        .then(function (data) {
+            showSuggestions(input, data);
+        })
+        .catch(function () {});
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('input[data-suggest]').forEach(function (input) {
+        input.addEventListener('input', function () {
+            suggest(input);
+        });
+    });
+});